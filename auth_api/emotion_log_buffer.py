@@ -0,0 +1,151 @@
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import EmotionLog
+
+# Flush when this many rows are pending...
+BUFFER_SIZE = getattr(settings, 'EMOTION_LOG_BUFFER_SIZE', 50)
+# ...or when the oldest pending row is this many seconds old
+FLUSH_INTERVAL = getattr(settings, 'EMOTION_LOG_FLUSH_INTERVAL', 5.0)
+# Do the INSERTs on a daemon thread instead of the request that crossed the threshold
+BACKGROUND_FLUSH = getattr(settings, 'EMOTION_LOG_BACKGROUND_FLUSH', True)
+# Hard cap on pending rows if the DB is down (oldest rows are dropped past this)
+MAX_PENDING = BUFFER_SIZE * 20
+
+
+class EmotionLogBuffer:
+    """
+    Collects EmotionLog rows in-process and writes them with bulk_create.
+    Timestamps are taken at add() time, so buffering never shifts when a prediction happened.
+    """
+
+    def __init__(self, max_size=BUFFER_SIZE, flush_interval=FLUSH_INTERVAL, background=BACKGROUND_FLUSH):
+        self.max_size = max(1, max_size)
+        self.flush_interval = flush_interval
+        self.background = background
+
+        self._rows = []
+        self._oldest = None  # monotonic time of the first pending row
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One bulk_create at a time
+        self._wakeup = threading.Event()
+        self._worker = None
+
+        self.flushed_rows = 0
+        self.flush_count = 0
+        self.dropped_rows = 0
+
+        # Worker shutdown: write whatever is still pending
+        atexit.register(self.flush)
+
+    def add(self, modality, emotion, confidence, user_id=None):
+        row = EmotionLog(
+            modality=modality,
+            emotion=emotion,
+            confidence=confidence,
+            timestamp=timezone.now(),
+        )
+        if user_id is not None:
+            row.user_id = str(user_id)
+
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            due = len(self._rows) >= self.max_size or self._is_stale()
+
+        if not due:
+            if self.background:
+                self._ensure_worker()  # Worker enforces the time threshold even if traffic stops
+            return
+
+        if self.background:
+            self._ensure_worker()
+            self._wakeup.set()
+        else:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all pending rows. Safe to call from any thread.
+        Returns the number of rows written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                self._oldest = None
+
+            if not rows:
+                return 0
+
+            try:
+                EmotionLog.objects.bulk_create(rows, batch_size=self.max_size)
+            except Exception as e:
+                print(f"❌ EmotionLog flush failed ({len(rows)} rows): {e}")
+                self._requeue(rows)
+                return 0
+
+            with self._lock:
+                self.flushed_rows += len(rows)
+                self.flush_count += 1
+            return len(rows)
+
+    def pending(self):
+        with self._lock:
+            return len(self._rows)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._rows),
+                "flushed_rows": self.flushed_rows,
+                "flush_count": self.flush_count,
+                "dropped_rows": self.dropped_rows,
+            }
+
+    def _is_stale(self):
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+
+    def _requeue(self, rows):
+        # Keep failed rows for the next attempt, but never grow without bound
+        with self._lock:
+            self._rows = rows + self._rows
+            overflow = len(self._rows) - MAX_PENDING
+            if overflow > 0:
+                self._rows = self._rows[overflow:]
+                self.dropped_rows += overflow
+                print(f"⚠️ EmotionLog buffer full, dropped {overflow} oldest rows")
+            if self._rows and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="emotion-log-flusher", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._oldest is None:
+                    timeout = self.flush_interval
+                else:
+                    timeout = self.flush_interval - (time.monotonic() - self._oldest)
+            self._wakeup.wait(timeout=max(timeout, 0.05))
+            self._wakeup.clear()
+            with self._lock:
+                due = len(self._rows) >= self.max_size or self._is_stale()
+            if due:
+                close_old_connections()
+                self.flush()
+
+
+emotion_log_buffer = EmotionLogBuffer()
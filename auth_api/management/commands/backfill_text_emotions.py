@@ -0,0 +1,153 @@
+import json
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from auth_api.models import CBTSession, EmotionJournal, EmotionLog, MoodLog
+from chatbot.models import ChatMessage
+from mental_health_backend.services.ml_client import ml_client
+
+# source name -> (model, text field, timestamp field, user id lookup, extra filters)
+SOURCES = {
+    'chat': (ChatMessage, 'content', 'timestamp', 'session__user_id', {'sender': 'user'}),
+    'mood': (MoodLog, 'note', 'date_time', 'user_id', {}),
+    'journal': (EmotionJournal, 'text', 'created_at', 'user_id', {}),
+    'cbt': (CBTSession, 'automatic_thought', 'created_at', 'user_id', {}),
+}
+
+DEFAULT_CHECKPOINT = settings.BASE_DIR / '.backfill_text_emotions.json'
+
+
+class Command(BaseCommand):
+    help = 'Backfill text emotions (EmotionLog) for historical chat, mood, journal and CBT text using the batch ML endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', required=True, help='Start date (YYYY-MM-DD, inclusive)')
+        parser.add_argument('--until', help='End date (YYYY-MM-DD, inclusive). Defaults to today.')
+        parser.add_argument('--sources', default=','.join(SOURCES),
+                            help=f'Comma-separated subset of: {", ".join(SOURCES)}')
+        parser.add_argument('--batch-size', type=int, default=64, help='Rows scored and written per batch')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip rows already processed by a previous run over the same date range')
+        parser.add_argument('--checkpoint', default=str(DEFAULT_CHECKPOINT), help='Checkpoint file used by --resume')
+
+    def handle(self, *args, **options):
+        since = parse_date(options['since'])
+        until = parse_date(options['until']) if options['until'] else timezone.localdate()
+        if not since or not until:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+        if since > until:
+            raise CommandError('--since must be on or before --until')
+
+        sources = [s.strip() for s in options['sources'].split(',') if s.strip()]
+        unknown = [s for s in sources if s not in SOURCES]
+        if unknown:
+            raise CommandError(f'Unknown source(s): {", ".join(unknown)}')
+
+        start = timezone.make_aware(datetime.combine(since, time.min))
+        end = timezone.make_aware(datetime.combine(until + timedelta(days=1), time.min))
+
+        checkpoint_path = options['checkpoint']
+        checkpoints = self._load_checkpoints(checkpoint_path)
+
+        for source in sources:
+            key = f'{source}:{since.isoformat()}:{until.isoformat()}'
+            last_pk = checkpoints.get(key, 0) if options['resume'] else 0
+            scored = self._backfill_source(source, start, end, last_pk, options['batch_size'],
+                                           checkpoints, key, checkpoint_path)
+            self.stdout.write(self.style.SUCCESS(f'✅ [{source}] {scored} rows scored'))
+
+        self.stdout.write(self.style.SUCCESS('🎉 Backfill complete'))
+
+    def _backfill_source(self, source, start, end, last_pk, batch_size, checkpoints, key, checkpoint_path):
+        model, text_field, time_field, user_field, extra = SOURCES[source]
+
+        qs = (
+            model.objects
+            .filter(**{f'{time_field}__gte': start, f'{time_field}__lt': end, 'pk__gt': last_pk}, **extra)
+            .exclude(**{f'{text_field}__isnull': True})
+            .exclude(**{text_field: ''})
+            .order_by('pk')
+        )
+        total = qs.count()
+        if last_pk:
+            self.stdout.write(f'⏩ [{source}] Resuming after pk={last_pk}')
+        self.stdout.write(f'🔍 [{source}] {total} rows to score')
+
+        rows = qs.values_list('pk', text_field, time_field, user_field).iterator(chunk_size=batch_size)
+        done = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            predictions = list(ml_client.predict_text_batch([row[1] for row in batch], chunk_size=batch_size))
+            # Only the rows before the first failure are written, so the checkpoint never passes an unscored row
+            failed_at = next((i for i, prediction in enumerate(predictions) if prediction is None), None)
+            scored = batch if failed_at is None else batch[:failed_at]
+
+            already_logged = self._already_logged(scored)
+            logs = []
+            journal_updates = []
+            for (pk, _text, ts, user_id), (emotion, confidence) in zip(scored, predictions):
+                log_user = str(user_id) if user_id is not None else 'anonymous'
+                if (log_user, ts) in already_logged:
+                    # Written by an earlier run (re-running without --resume must not duplicate rows)
+                    continue
+                logs.append(EmotionLog(
+                    user_id=log_user,
+                    modality='text',
+                    emotion=emotion,
+                    confidence=confidence,
+                    timestamp=ts,
+                ))
+                if source == 'journal':
+                    journal_updates.append(EmotionJournal(pk=pk, text_emotion=emotion))
+
+            EmotionLog.objects.bulk_create(logs)
+            if journal_updates:
+                EmotionJournal.objects.bulk_update(journal_updates, ['text_emotion'])
+
+            done += len(scored)
+            if scored:
+                checkpoints[key] = scored[-1][0]
+                self._save_checkpoints(checkpoint_path, checkpoints)
+            self.stdout.write(f'   [{source}] {done}/{total}')
+
+            if failed_at is not None:
+                raise CommandError(
+                    f'❌ [{source}] ML server could not score pk={batch[failed_at][0]}; '
+                    f'{done} rows saved. Re-run with --resume to continue from there.'
+                )
+
+        return done
+
+    @staticmethod
+    def _already_logged(rows):
+        """
+        (user id, timestamp) pairs among rows that already have a text EmotionLog.
+        """
+        if not rows:
+            return set()
+        return set(
+            EmotionLog.objects
+            .filter(modality='text', timestamp__in={ts for _, _, ts, _ in rows})
+            .values_list('user_id', 'timestamp')
+        )
+
+    @staticmethod
+    def _load_checkpoints(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _save_checkpoints(path, checkpoints):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoints, f, indent=2)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0012_userprofile_last_activity_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emotionlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
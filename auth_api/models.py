@@ -323,7 +323,7 @@ class EmotionLog(models.Model):
     modality = models.CharField(max_length=10)  # voice/text/face
     emotion = models.CharField(max_length=30)
     confidence = models.FloatField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Settable so backfills keep the source time
 
     def __str__(self):
         return f"{self.modality.upper()}: {self.emotion} ({self.confidence:.2f})"
@@ -1 +1,88 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+
+from auth_api.emotion_log_buffer import EmotionLogBuffer
+from auth_api.models import EmotionLog, MoodLog
+
+
+class BackfillTextEmotionsTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('backfill', password='x')
+        self.logs = [
+            MoodLog.objects.create(user=user, mood_emoji='🙂', mood_label='Calm', note=f'note {i}')
+            for i in range(4)
+        ]
+        fd, self.checkpoint = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(self.checkpoint)
+        self.addCleanup(lambda: os.path.exists(self.checkpoint) and os.remove(self.checkpoint))
+
+    def backfill(self, predictions, *extra):
+        with mock.patch('auth_api.management.commands.backfill_text_emotions.ml_client') as client:
+            client.predict_text_batch.side_effect = lambda texts, chunk_size: iter(predictions[:len(texts)])
+            call_command('backfill_text_emotions', '--since', '2000-01-01', '--sources', 'mood',
+                         '--checkpoint', self.checkpoint, *extra, stdout=io.StringIO())
+
+    def test_failed_prediction_is_not_stored_and_stops_checkpoint(self):
+        with self.assertRaises(CommandError):
+            self.backfill([('sad', 0.9), None, ('happy', 0.8), ('sad', 0.7)])
+        self.assertEqual(list(EmotionLog.objects.values_list('emotion', flat=True)), ['sad'])
+
+        # --resume picks up at the row that failed, not after it
+        self.backfill([('angry', 0.9), ('happy', 0.8), ('sad', 0.7)], '--resume')
+        self.assertEqual(list(EmotionLog.objects.order_by('pk').values_list('emotion', flat=True)),
+                         ['sad', 'angry', 'happy', 'sad'])
+
+    def test_rerun_without_resume_does_not_duplicate(self):
+        self.backfill([('sad', 0.9)] * 4)
+        self.backfill([('sad', 0.9)] * 4)
+        self.assertEqual(EmotionLog.objects.count(), len(self.logs))
+
+
+class EmotionLogBufferTests(TestCase):
+    def buffer(self, **kwargs):
+        return EmotionLogBuffer(**{'max_size': 3, 'flush_interval': 60.0, 'background': False, **kwargs})
+
+    def add(self, buffer, count, emotion='sad'):
+        for _ in range(count):
+            buffer.add(modality='text', emotion=emotion, confidence=0.9)
+
+    def test_flushes_at_size_threshold(self):
+        buffer = self.buffer()
+        self.add(buffer, 2)
+        self.assertEqual((EmotionLog.objects.count(), buffer.pending()), (0, 2))
+        self.add(buffer, 1)
+        self.assertEqual((EmotionLog.objects.count(), buffer.pending()), (3, 0))
+        self.assertEqual(buffer.stats()['flush_count'], 1)
+
+    def test_flushes_when_oldest_row_is_due(self):
+        buffer = self.buffer(flush_interval=5.0)
+        now = [100.0]
+        with mock.patch('auth_api.emotion_log_buffer.time.monotonic', lambda: now[0]):
+            self.add(buffer, 1)
+            now[0] += 4.0
+            self.add(buffer, 1)
+            self.assertEqual(EmotionLog.objects.count(), 0)
+            now[0] += 1.0
+            self.add(buffer, 1, emotion='happy')
+        self.assertEqual(EmotionLog.objects.count(), 3)
+
+    def test_failed_flush_requeues_and_drops_oldest_past_cap(self):
+        buffer = self.buffer()
+        with mock.patch('auth_api.emotion_log_buffer.MAX_PENDING', 4), \
+                mock.patch.object(EmotionLog.objects, 'bulk_create', side_effect=Exception('db down')), \
+                mock.patch('builtins.print'):
+            self.add(buffer, 3)
+            self.assertEqual(buffer.pending(), 3)
+            self.add(buffer, 3, emotion='happy')
+        self.assertEqual(buffer.stats(), {'pending': 4, 'flushed_rows': 0, 'flush_count': 0, 'dropped_rows': 2})
+
+        self.assertEqual(buffer.flush(), 4)
+        self.assertEqual(sorted(EmotionLog.objects.values_list('emotion', flat=True)), ['happy', 'happy', 'happy', 'sad'])
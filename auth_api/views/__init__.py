@@ -0,0 +1,25 @@
+"""
+auth_api views, one module per feature. Heavy dependencies (speech recognition, pydub, Groq)
+are imported inside the views that use them, so importing the URLconf stays cheap;
+check_import_budget.py guards that.
+"""
+from .accounts import LoginView, RegisterView, ResetPasswordView, ResetPasswordConfirmView
+from .profile import UserProfileView, GuardianView, CategoryView
+from .media import (
+    MeditationListView, MeditationDetailView, YogaListView, YogaDetailView,
+    UploadAudioView, UserPreferencesView, BackgroundMusicView,
+    MusicCategoryView, MusicTracksView, MusicSessionView,
+)
+from .sessions import CalmingSessionView, GroundingSessionView, PanicSessionView, StressBusterSessionView
+from .sos import SOSView
+from .mood import MoodLogView, MoodSummaryView
+from .affirmations import (
+    AffirmationCategoryView, GenericAffirmationsView, CustomAffirmationView, GenerateAIAffirmationsView,
+    RandomCustomAffirmationView, RandomAffirmationView, AffirmationTemplatesView,
+)
+from .cbt import (
+    CBTTopicView, CBTSessionView,
+    DisorderListView, DisorderDetailView, ArticleListView, CopingMethodListView, RoadmapView,
+)
+from .emotion import VoiceEmotionView, TextEmotionView, FaceEmotionView, TriModalJournalView
+from .therapy import TherapySessionListView, TherapySessionDetailView, TherapyRecordCreateView
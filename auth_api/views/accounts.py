@@ -0,0 +1,203 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.encoding import force_bytes, force_str
+from ..models import UserProfile, Guardian
+
+# ---------------------------
+# Authentication Views
+# ---------------------------
+
+class LoginView(APIView):
+    def post(self, request):
+        email = request.data.get('email')
+        password = request.data.get('password')
+        
+        if not email or not password:
+            return Response({'error': 'Email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user = User.objects.get(email=email)
+        except User.DoesNotExist:
+            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        user = authenticate(username=user.username, password=password)
+        if user:
+            refresh = RefreshToken.for_user(user)
+            return Response({
+                'access_token': str(refresh.access_token),
+                'refresh_token': str(refresh),
+                'user_id': user.id,
+                'username': user.username,
+                'email': user.email
+            }, status=status.HTTP_200_OK)
+        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+class RegisterView(APIView):
+    parser_classes = [MultiPartParser, FormParser]  # ✅ Explicitly allow file uploads
+
+    def post(self, request):
+        print("📝 Register Endpoint Hit")
+        print("Data:", request.data)
+        
+        name = request.data.get('name')
+        age = request.data.get('age')
+        phone_number = request.data.get('phone_number')
+        email = request.data.get('email')
+        password = request.data.get('password')
+        confirm_password = request.data.get('confirm_password')
+        gender = request.data.get('gender')
+        medical_history = request.FILES.get('medical_history')
+        guardian_name = request.data.get('guardian_name')
+        guardian_relationship = request.data.get('guardian_relationship')
+        guardian_phone_number = request.data.get('guardian_phone_number')
+        guardian_email = request.data.get('guardian_email')
+
+        # Validate required fields
+        required_fields = {
+            'name': name, 'age': age, 'phone_number': phone_number, 'email': email,
+            'password': password, 'confirm_password': confirm_password,
+            'guardian_name': guardian_name, 'guardian_relationship': guardian_relationship,
+            'guardian_phone_number': guardian_phone_number, 'guardian_email': guardian_email
+        }
+        for field_name, field_value in required_fields.items():
+            if not field_value:
+                print(f"❌ Missing field: {field_name}")
+                return Response({'error': f'{field_name.replace("_", " ").title()} is required'}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+
+        if password != confirm_password:
+            return Response({'error': 'Passwords do not match'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Check if email exists
+        if User.objects.filter(email=email).exists():
+            return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validate medical history file
+        if medical_history and not medical_history.name.lower().endswith('.pdf'):
+            return Response({'error': 'Medical history must be a PDF file'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Create user
+            # ✅ FIX: Use email as username to strictly avoid collisions on same-first-name users
+            # Or use a more robust unique generator. Using email is standard safe practice.
+            username = email 
+            
+            # Check if this username/email already exists (safety double check)
+            if User.objects.filter(username=username).exists():
+                 return Response({'error': 'Account with this email already exists'}, status=status.HTTP_400_BAD_REQUEST)
+
+            user = User.objects.create_user(username=username, email=email, password=password)
+
+            # Create user profile
+            user_profile = UserProfile.objects.create(
+                user=user, 
+                name=name, 
+                age=int(age), 
+                phone_number=phone_number, 
+                email=email,
+                gender=gender if gender else None, 
+                medical_history=medical_history
+            )
+
+            # Create guardian
+            Guardian.objects.create(
+                user=user, 
+                name=guardian_name, 
+                relationship=guardian_relationship,
+                phone_number=guardian_phone_number, 
+                email=guardian_email
+            )
+
+            # Generate token
+            refresh = RefreshToken.for_user(user)
+            print(f"✅ User Registered Successfully: {email}")
+            return Response({
+                'access_token': str(refresh.access_token),
+                'refresh_token': str(refresh),
+                'user_id': user.id,
+                'username': user.username,
+                'message': 'Registration successful'
+            }, status=status.HTTP_201_CREATED)
+        
+        except ValueError as e:
+            print(f"❌ Value Error during registration: {str(e)}")
+            return Response({'error': f'Invalid data: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"❌ Critical Error during registration: {str(e)}")
+            return Response({'error': f'Registration failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ResetPasswordView(APIView):
+    def post(self, request):
+        email = request.data.get('email')
+        if not email:
+            return Response({'error': 'Email is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            user = User.objects.get(email=email)
+            token = default_token_generator.make_token(user)
+            uid = urlsafe_base64_encode(force_bytes(user.pk))
+            
+            # Use host from request to make it work on any IP (important for mobile)
+            host = request.get_host()
+            # path should match what's in urls.py
+            reset_link = f"http://{host}/api/auth/reset-confirm/{uid}/{token}/"
+            
+            send_mail(
+                'Password Reset Request',
+                f'Click this link to reset your password or copy the codes below:\n\n'
+                f'Link: {reset_link}\n\n'
+                f'Verification Code (UID): {uid}\n'
+                f'Verification Token: {token}\n\n'
+                f'Paste these into the app if the link doesn\'t open automatically.',
+                settings.EMAIL_HOST_USER,
+                [email],
+                fail_silently=False
+            )
+            return Response({'message': 'Password reset link sent to your email'}, status=status.HTTP_200_OK)
+        except User.DoesNotExist:
+            return Response({'error': 'User with this email does not exist'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': f'Failed to send email: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ResetPasswordConfirmView(APIView):
+    def get(self, request, uidb64, token):
+        try:
+            uid = force_str(urlsafe_base64_decode(uidb64))
+            user = User.objects.get(pk=uid)
+            if default_token_generator.check_token(user, token):
+                return Response({'message': 'Token is valid', 'uid': uidb64}, status=status.HTTP_200_OK)
+            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_400_BAD_REQUEST)
+        except (TypeError, ValueError, User.DoesNotExist):
+            return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
+
+    def post(self, request, uidb64, token):
+        # Prefer values from body if present, else use from URL
+        uid_input = request.data.get('uid', uidb64)
+        new_password = request.data.get('new_password')
+        confirm_password = request.data.get('confirm_password')
+        
+        if not all([new_password, confirm_password]):
+            return Response({'error': 'Passwords are required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if new_password != confirm_password:
+            return Response({'error': 'Passwords do not match'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            uid_int = force_str(urlsafe_base64_decode(uid_input))
+            user = User.objects.get(pk=uid_int)
+            if default_token_generator.check_token(user, token):
+                user.set_password(new_password)
+                user.save()
+                return Response({'message': 'Password reset successful'}, status=status.HTTP_200_OK)
+            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_400_BAD_REQUEST)
+        except (TypeError, ValueError, User.DoesNotExist):
+            return Response({'error': 'Invalid token or user'}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,320 @@
+import random
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from ..models import AffirmationCategory, GenericAffirmation, CustomAffirmation, AffirmationTemplate
+from ..serializers import (
+    AffirmationCategorySerializer, GenericAffirmationSerializer, CustomAffirmationSerializer,
+    AffirmationTemplateSerializer
+)
+
+# ---------------------------
+# AFFIRMATIONS VIEWS (COMPLETE & FIXED)
+# ---------------------------
+
+class AffirmationCategoryView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get all affirmation categories with count of active affirmations"""
+        try:
+            categories = AffirmationCategory.objects.all().prefetch_related('affirmations')
+            serializer = AffirmationCategorySerializer(categories, many=True)
+            print(f"DEBUG: Returning {len(serializer.data)} categories")
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            print(f"ERROR in categories: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def post(self, request):
+        """Admin-only: Create new affirmation category"""
+        try:
+            serializer = AffirmationCategorySerializer(data=request.data)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class GenericAffirmationsView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, category_id=None, **kwargs):  # ✅ FIXED: Accept **kwargs
+        """Get generic affirmations - random or by category"""
+        try:
+            # ✅ category_id comes from URL kwargs OR is None for all
+            if category_id:  # From URL path /affirmations/generic/123/
+                affirmations = GenericAffirmation.objects.filter(
+                    category_id=category_id, 
+                    is_active=True
+                ).order_by('?')[:20]  # Random 20 from category
+                print(f"DEBUG: Category {category_id} has {affirmations.count()} affirmations")
+            else:  # No category_id = /affirmations/generic/ (all categories)
+                # Get 3 random from each category
+                categories = AffirmationCategory.objects.all()
+                all_affirmations = []
+                
+                for category in categories:
+                    cat_affs = GenericAffirmation.objects.filter(
+                        category=category, 
+                        is_active=True
+                    ).order_by('?')[:3]  # 3 random per category
+                    all_affirmations.extend(cat_affs)
+                
+                # Shuffle and limit to 15 total
+                random.shuffle(all_affirmations)
+                affirmations = all_affirmations[:15]
+                print(f"DEBUG: Loaded {len(affirmations)} random affirmations from all categories")
+            
+            if not affirmations:
+                return Response({
+                    'message': 'No affirmations found. Check admin for GenericAffirmations.',
+                    'affirmations': []
+                }, status=status.HTTP_200_OK)
+            
+            serializer = GenericAffirmationSerializer(affirmations, many=True)
+            return Response({
+                'count': len(serializer.data),
+                'affirmations': serializer.data
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            print(f"ERROR in generic affirmations: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def post(self, request):
+        """Admin-only: Create generic affirmation"""
+        try:
+            serializer = GenericAffirmationSerializer(data=request.data)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class CustomAffirmationView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get user's custom affirmations"""
+        try:
+            affirmations = CustomAffirmation.objects.filter(user=request.user).order_by('-created_at')
+            serializer = CustomAffirmationSerializer(affirmations, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def post(self, request):
+        """Create custom affirmation for user - FIXED GENERATION"""
+        try:
+            data = request.data.copy()
+            
+            # ✅ VALIDATE INPUT FIELDS
+            focus_area = data.get('focus_area', '').strip()
+            challenge = data.get('challenge', '').strip()
+            positive_direction = data.get('positive_direction', '').strip()
+            
+            if not all([focus_area, challenge, positive_direction]):
+                return Response({
+                    'error': 'focus_area, challenge, and positive_direction are all required'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # ✅ CHECK IF TEXT ALREADY PROVIDED (AI GENERATED)
+            if data.get('affirmation_text'):
+                 affirmation_text = data.get('affirmation_text')
+            else:
+                # ✅ IMPROVED AFFIRMATION TEMPLATES
+                affirmation_templates = {
+                    'calm': "I am finding {focus_area} within myself, gently releasing {challenge} and embracing {positive_direction}.",
+                    'confidence': "I am building {focus_area} every day. Even when {challenge}, I choose {positive_direction}.",
+                    'self-love': "I deserve {focus_area}. I release {challenge} and welcome {positive_direction} into my heart.",
+                    'motivation': "{focus_area} fuels my journey. I transform {challenge} into {positive_direction}.",
+                    'peace': "I cultivate {focus_area} amidst {challenge}. My path leads to {positive_direction}.",
+                    'strength': "I am strong in {focus_area}. {Challenge} cannot dim my {positive_direction}.",
+                    'joy': "{Focus_area} fills my heart. I let go of {challenge} and embrace {positive_direction}.",
+                }
+                
+                # Use template matching focus_area or fallback
+                template_key = focus_area.lower()
+                template = affirmation_templates.get(template_key)
+                
+                if template:
+                    affirmation_text = template.format(
+                        focus_area=focus_area,
+                        challenge=challenge,
+                        positive_direction=positive_direction
+                    )
+                else:
+                    # Generic fallback with better structure
+                    affirmation_text = (
+                        f"I am cultivating {focus_area.lower()} within myself. "
+                        f"Even when facing {challenge.lower()}, I am moving towards {positive_direction.lower()}. "
+                        f"I am strong, capable, and worthy of this journey."
+                    )
+            
+            # ✅ SET ALL FIELDS PROPERLY
+            data.update({
+                'user': request.user.id,
+                'affirmation_text': affirmation_text,
+                'focus_area': focus_area,
+                'challenge': challenge,
+                'positive_direction': positive_direction,
+            })
+            
+            print(f"DEBUG: Creating affirmation...")
+            print(f"  Focus: {focus_area}")
+            print(f"  Challenge: {challenge}")
+            print(f"  Direction: {positive_direction}")
+            print(f"  Generated: {affirmation_text[:100]}...")
+            
+            serializer = CustomAffirmationSerializer(data=data)
+            if serializer.is_valid():
+                instance = serializer.save()
+                print(f"✅ SUCCESS: Created affirmation ID {instance.id}")
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            else:
+                print(f"❌ SERIALIZER ERRORS: {serializer.errors}")
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                
+        except Exception as e:
+            print(f"❌ ERROR in custom affirmation: {str(e)}")
+            return Response({
+                'error': f'Failed to create affirmation: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def delete(self, request, pk):
+        """Delete user's custom affirmation"""
+        try:
+            affirmation = CustomAffirmation.objects.get(id=pk, user=request.user)
+            affirmation.delete()
+            return Response({'message': 'Affirmation deleted successfully'}, status=status.HTTP_200_OK)
+        except CustomAffirmation.DoesNotExist:
+            return Response({'error': 'Affirmation not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class GenerateAIAffirmationsView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """Generate custom affirmations using AI based on chat context"""
+        try:
+            from mental_health_backend.services.llm_registry import get_llm
+            
+            count = request.data.get('count', 3)
+            chat_history = request.data.get('chat_history', '')
+            user_context = request.data.get('user_context', '') # Fallback if no chat history
+            
+            if not chat_history and not user_context:
+                return Response({'error': 'Context needed. Please provide chat_history or user_context'}, status=400)
+            
+            # Construct Prompt
+            prompt = f"""
+            You are an expert affirmation generator.
+            
+            USER CONTEXT:
+            {chat_history if chat_history else user_context}
+            
+            TASK:
+            Generate {count} specific, powerful, and personalized affirmations for this user based on their context.
+            
+            RULES:
+            1. Return ONLY the affirmations as a numbered list.
+            2. Do not include introductory text like "Here are your affirmations".
+            3. Each affirmation should be positive, present tense, and empowering.
+            4. Keep them concise.
+            """
+            
+            # Shared client for the default model (pooled connections)
+            llm = get_llm(temperature=0.7)
+            
+            response = llm.invoke(prompt)
+            content = response.content.strip()
+            
+            # Parse list
+            affirmations_list = []
+            for line in content.split('\n'):
+                clean_line = line.strip()
+                # Remove numbering like "1. ", "2. "
+                if clean_line and (clean_line[0].isdigit() or clean_line.startswith('-')):
+                    parts = clean_line.split(' ', 1)
+                    if len(parts) > 1:
+                        affirmations_list.append(parts[1].strip('"'))
+                    else:
+                        affirmations_list.append(clean_line)
+                elif clean_line:
+                    affirmations_list.append(clean_line)
+            
+            # Validations
+            if not affirmations_list:
+                affirmations_list = ["I am good enough.", "I believe in myself.", "I am calm and confident."]
+            
+            return Response({
+                'affirmations': affirmations_list[:int(count)]
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            print(f"AI Gen Error: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class RandomCustomAffirmationView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get random custom affirmation for user"""
+        try:
+            affirmations = CustomAffirmation.objects.filter(user=request.user)
+            if affirmations.exists():
+                random_aff = random.choice(list(affirmations))
+                serializer = CustomAffirmationSerializer(random_aff)
+                return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response({
+                'message': 'No custom affirmations created yet. Create some to get personalized affirmations!'
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class RandomAffirmationView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get a completely random affirmation (generic + custom mix)"""
+        try:
+            # Get some generic affirmations
+            generic_affs = list(GenericAffirmation.objects.filter(is_active=True))
+            # Get user's custom affirmations
+            custom_affs = list(CustomAffirmation.objects.filter(user=request.user))
+            
+            all_affs = generic_affs + custom_affs
+            
+            if not all_affs:
+                return Response({
+                    'message': 'No affirmations available. Add some categories and affirmations in admin!'
+                }, status=status.HTTP_200_OK)
+            
+            random_aff = random.choice(all_affs)
+            
+            if isinstance(random_aff, GenericAffirmation):
+                serializer = GenericAffirmationSerializer(random_aff)
+            else:
+                serializer = CustomAffirmationSerializer(random_aff)
+            
+            return Response({
+                'affirmation': serializer.data,
+                'type': 'generic' if isinstance(random_aff, GenericAffirmation) else 'custom'
+            })
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class AffirmationTemplatesView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get affirmation templates for creating custom affirmations"""
+        try:
+            templates = AffirmationTemplate.objects.all()
+            serializer = AffirmationTemplateSerializer(templates, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
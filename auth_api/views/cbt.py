@@ -0,0 +1,188 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from ..models import CBTTopic, CBTSession, Disorder, Article, CopingMethod, RoadmapStep
+from ..serializers import (
+    CBTTopicSerializer, CBTSessionSerializer, DisorderSerializer, ArticleSerializer,
+    CopingMethodSerializer, RoadmapStepSerializer
+)
+
+# CBT THERAPY VIEWS
+class CBTTopicView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            topics = CBTTopic.objects.all()
+            serializer = CBTTopicSerializer(topics, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DisorderListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            disorders = Disorder.objects.all()
+            serializer = DisorderSerializer(disorders, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            print(f"ERROR in DisorderListView: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class DisorderDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            disorder = Disorder.objects.get(pk=pk)
+            serializer = DisorderSerializer(disorder)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Disorder.DoesNotExist:
+            return Response({'error': 'Disorder not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            print(f"ERROR in DisorderDetailView: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ArticleListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, disorder_id):
+        try:
+            articles = Article.objects.filter(disorder_id=disorder_id)
+            serializer = ArticleSerializer(articles, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            print(f"ERROR in ArticleListView: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class CopingMethodListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, disorder_id):
+        try:
+            methods = CopingMethod.objects.filter(disorder_id=disorder_id)
+            serializer = CopingMethodSerializer(methods, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            print(f"ERROR in CopingMethodListView: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class RoadmapView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, disorder_id):
+        try:
+            disorder = Disorder.objects.get(pk=disorder_id)
+            steps = RoadmapStep.objects.filter(disorder_id=disorder_id).order_by('order')
+            
+            steps_serializer = RoadmapStepSerializer(steps, many=True, context={'request': request})
+            
+            roadmap_image_url = None
+            if disorder.roadmap_image:
+                roadmap_image_url = request.build_absolute_uri(disorder.roadmap_image.url)
+
+            return Response({
+                'roadmap_image': roadmap_image_url,
+                'steps': steps_serializer.data
+            }, status=status.HTTP_200_OK)
+        except Disorder.DoesNotExist:
+            return Response({'error': 'Disorder not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            print(f"ERROR in RoadmapView: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class CBTSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            data = request.data
+            user = request.user
+            
+            topic_id = data.get('topic') # Changed from 'topic_id' to 'topic'
+            situation = data.get('situation')
+            automatic_thought = data.get('automatic_thought')
+            emotions = data.get('emotions')
+            evidence_for = data.get('evidence_for')
+            evidence_against = data.get('evidence_against')
+            balanced_thought = data.get('balanced_thought')
+            session_duration = data.get('session_duration', 0)
+            
+            if not all([topic_id, situation, automatic_thought]):
+                 return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
+
+             # Create Session
+            topic = CBTTopic.objects.get(pk=topic_id)
+            session = CBTSession.objects.create(
+                user=user,
+                topic=topic,
+                situation=situation,
+                automatic_thought=automatic_thought,
+                emotions=emotions,
+                evidence_for=evidence_for,
+                evidence_against=evidence_against,
+                balanced_thought=balanced_thought,
+                session_duration=session_duration
+            )
+            
+            # --- AI ANALYSIS ---
+            ai_analysis = ''
+            try:
+                from mental_health_backend.services.llm_registry import get_llm
+                import os
+                
+                settings_api_key = getattr(settings, 'GROQ_API_KEY', None)
+                api_key = settings_api_key or os.getenv('GROQ_API_KEY')
+
+                if api_key:
+                    prompt = f'''
+                    You are an expert, warm, and empathetic CBT Therapist. 
+                    The user has just completed a Thought Record to challenge a negative thought.
+                    
+                    User's Entry:
+                    - Situation: {situation}
+                    - Negative Thought: {automatic_thought}
+                    - Evidence Against: {evidence_against}
+                    - New Balanced Thought: {balanced_thought}
+                    
+                    Your Task:
+                    Write a short, supportive response (3-4 sentences) speaking DIRECTLY to the user.
+                    1. Warmly validate their effort in reframing this thought.
+                    2. Offer a gentle observation on their balanced thought—if it's good, reinforce it; if it could be stronger, gently suggest how.
+                    
+                    CRITICAL: Do NOT use headers like "Validation" or "Analysis". Do NOT use bullet points. Write as a caring human therapist.
+                    '''
+                    
+                    llm = get_llm(temperature=0.7)
+                    
+                    response = llm.invoke(prompt)
+                    ai_analysis = response.content.strip()
+                    
+                    # Store analysis
+                    session.ai_analysis = ai_analysis
+                    session.save()
+            except Exception as e:
+                print(f'CBT AI Error: {e}')
+                ai_analysis = 'AI Analysis unavailable.'
+
+            return Response({
+                'id': session.id,
+                'message': 'CBT Session saved',
+                'ai_analysis': ai_analysis
+            }, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def get(self, request):
+        try:
+            sessions = CBTSession.objects.filter(user=request.user).order_by('-created_at')[:10]
+            serializer = CBTSessionSerializer(sessions, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
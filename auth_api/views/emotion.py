@@ -0,0 +1,128 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from mental_health_backend.services.ml_client import ml_client # ✅ NEW ML CLIENT
+from ..models import EmotionJournal
+from ..emotion_log_buffer import emotion_log_buffer
+
+# ========================
+# VOICE EMOTION
+# ========================
+
+class VoiceEmotionView(APIView):
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        try:
+            audio_file = request.FILES.get('audio')
+            if not audio_file:
+                return Response({'error': 'No audio file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+            emotion, confidence = ml_client.predict_audio(audio_file)
+            
+            emotion_log_buffer.add(modality="voice", emotion=emotion, confidence=confidence)
+            return Response({"emotion": emotion, "confidence": round(confidence, 3)})
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ========================
+# TEXT EMOTION
+# ========================
+
+class TextEmotionView(APIView):
+    def post(self, request):
+        text = request.data.get('text', '').strip()
+        if not text:
+            return Response({"error": "No text sent"}, status=400)
+
+        emotion, confidence = ml_client.predict_text(text)
+
+        emotion_log_buffer.add(modality="text", emotion=emotion, confidence=confidence)
+        return Response({"emotion": emotion, "confidence": round(confidence, 3)})
+
+# ========================
+# FACE EMOTION
+# ========================
+
+class FaceEmotionView(APIView):
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        img_file = request.FILES.get('image')
+        if not img_file:
+             return Response({"error": "No image file"}, status=400)
+
+        emotion, confidence = ml_client.predict_face(img_file)
+
+        emotion_log_buffer.add(modality="face", emotion=emotion, confidence=confidence)
+        return Response({"emotion": emotion, "confidence": round(confidence, 3)})
+class TriModalJournalView(APIView):
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        user = request.user if request.user.is_authenticated else None
+
+        text = request.data.get("text", "")
+        # Frontend sends 'audio' and 'image' keys in saveTriModalJournal
+        voice_file = request.FILES.get("audio") or request.FILES.get("voice")
+        face_file = request.FILES.get("image") or request.FILES.get("face_image")
+
+        print(f"\n🔍 [Backend] Tri-Modal Request Received")
+        print(f"   - Text: {text[:50]}..." if text else "   - Text: None")
+        
+        if voice_file:
+            print(f"   - Voice File: {voice_file.name} ({voice_file.size} bytes)")
+        else:
+            print(f"   - Voice File: None (Check frontend 'audio' or 'voice' key)")
+
+        if face_file:
+            print(f"   - Face File: {face_file.name} ({face_file.size} bytes)")
+        else:
+            print(f"   - Face File: None (Check frontend 'image' or 'face_image' key)")
+        
+        # 1. Call Fusion Server
+        final_emotion, confidence, components = ml_client.predict_multimodal(
+            text=text, 
+            voice_file=voice_file, 
+            face_file=face_file
+        )
+        
+        print(f"   => ML Server Result: {final_emotion} ({confidence})")
+
+        # 2. Extract component results (optional, for logging)
+        voice_emotion = "neutral"
+        if components and components.get('voice'):
+             voice_emotion = components['voice'].get('dominant_emotion', 'neutral')
+
+        text_emotion = "neutral"
+        if components and components.get('text'):
+             text_emotion = components['text'].get('dominant_emotion', 'neutral')
+
+        face_emotion = "neutral"
+        if components and components.get('face'):
+             face_emotion = components['face'].get('dominant_emotion', 'neutral')
+
+        # 3. Save Journal
+        # Note: We need to rewind files before saving if ModelField tries to read them, 
+        # but django Request files usually handle multiple reads if they are InMemory or TempFile.
+        if voice_file: voice_file.seek(0)
+        if face_file: face_file.seek(0)
+
+        journal = EmotionJournal.objects.create(
+            user=user,
+            text=text,
+            voice=voice_file,
+            face_image=face_file,
+            voice_emotion=voice_emotion,
+            text_emotion=text_emotion,
+            face_emotion=face_emotion,
+            final_emotion=final_emotion
+        )
+
+        return Response({
+            "message": "Journal saved", 
+            "emotion": final_emotion,
+            "confidence": confidence,
+            "components": components
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,245 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from ..models import (
+    Category, MeditationSession, YogaSession, UserPreferences, BackgroundMusic,
+    MusicCategory, MusicTrack, MusicSession
+)
+from ..serializers import (
+    MeditationSessionSerializer, YogaSessionSerializer, UserPreferencesSerializer, BackgroundMusicSerializer,
+    MusicCategorySerializer, MusicTrackSerializer, MusicSessionSerializer
+)
+
+# ---------------------------
+# Meditation & Yoga Views
+# ---------------------------
+
+class MeditationListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            meditations = MeditationSession.objects.all().select_related('category')
+            serializer = MeditationSessionSerializer(meditations, many=True)
+            return Response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MeditationDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            meditation = MeditationSession.objects.get(pk=pk)
+            serializer = MeditationSessionSerializer(meditation)
+            return Response(serializer.data)
+        except MeditationSession.DoesNotExist:
+            return Response({'error': 'Meditation not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class YogaListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            yoga_sessions = YogaSession.objects.all().select_related('type')
+            serializer = YogaSessionSerializer(yoga_sessions, many=True)
+            return Response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class YogaDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            yoga = YogaSession.objects.get(pk=pk)
+            serializer = YogaSessionSerializer(yoga)
+            return Response(serializer.data)
+        except YogaSession.DoesNotExist:
+            return Response({'error': 'Yoga session not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ---------------------------
+# Audio Upload & Preferences Views
+# ---------------------------
+
+class UploadAudioView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            audio_file = request.FILES.get('audio_file')
+            audio_type = request.data.get('audio_type', 'meditation')
+            category_id_str = request.data.get('category_id')
+            title = request.data.get('title', f'Untitled {audio_type}')
+            description = request.data.get('description', '')
+            duration_str = request.data.get('duration', '0')
+            emoji = request.data.get('emoji', '')
+
+            if not audio_file:
+                return Response({'error': 'Audio file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Safely convert duration
+            try:
+                duration = int(duration_str) if duration_str else 0
+            except (ValueError, TypeError):
+                duration = 0
+
+            if audio_type == 'meditation':
+                category = None
+                if category_id_str:
+                    try:
+                        category_id = int(category_id_str)
+                        category = Category.objects.get(id=category_id)
+                    except (ValueError, Category.DoesNotExist):
+                        category = None
+                
+                meditation_session = MeditationSession.objects.create(
+                    title=title,
+                    description=description,
+                    duration=duration,
+                    audio_file=audio_file,
+                    category=category,
+                    emoji=emoji
+                )
+                serializer = MeditationSessionSerializer(meditation_session)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+            elif audio_type == 'yoga':
+                yoga_type = None
+                if category_id_str:
+                    try:
+                        category_id = int(category_id_str)
+                        yoga_type = Category.objects.get(id=category_id)
+                    except (ValueError, Category.DoesNotExist):
+                        yoga_type = None
+                
+                yoga_session = YogaSession.objects.create(
+                    title=title,
+                    description=description,
+                    duration=duration,
+                    audio_file=audio_file,
+                    type=yoga_type,
+                    emoji=emoji
+                )
+                serializer = YogaSessionSerializer(yoga_session)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+            elif audio_type == 'background':
+                background_music = BackgroundMusic.objects.create(
+                    title=title,
+                    audio_file=audio_file,
+                    emoji=emoji
+                )
+                serializer = BackgroundMusicSerializer(background_music)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+            return Response({'error': 'Invalid audio type. Use: meditation, yoga, or background'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        except Exception as e:
+            return Response({'error': f'Upload failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class UserPreferencesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            preferences, _ = UserPreferences.objects.get_or_create(user=request.user)
+            serializer = UserPreferencesSerializer(preferences)
+            return Response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def put(self, request):
+        try:
+            preferences, _ = UserPreferences.objects.get_or_create(user=request.user)
+            serializer = UserPreferencesSerializer(preferences, data=request.data, partial=True)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class BackgroundMusicView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            music = BackgroundMusic.objects.all()
+            serializer = BackgroundMusicSerializer(music, many=True)
+            return Response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MusicCategoryView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            categories = MusicCategory.objects.prefetch_related('tracks').all()
+            serializer = MusicCategorySerializer(categories, many=True)
+            return Response({
+                'categories': serializer.data,
+                'total_categories': len(serializer.data)
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MusicTracksView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, category_id):
+        try:
+            category = MusicCategory.objects.get(id=category_id)
+            tracks = MusicTrack.objects.filter(category=category)
+            serializer = MusicTrackSerializer(tracks, many=True)
+            return Response({
+                'tracks': serializer.data,
+                'category': {
+                    'id': category.id,
+                    'name': category.name,
+                    'emoji': category.emoji,
+                    'color': category.color
+                },
+                'total_tracks': len(serializer.data)
+            }, status=status.HTTP_200_OK)
+        except MusicCategory.DoesNotExist:
+            return Response({'error': 'Music category not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MusicSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        try:
+            data = request.data.copy()
+            data['user'] = request.user.id
+            
+            # Validate required fields
+            required_fields = ['category', 'mood_change', 'current_emotion']
+            for field in required_fields:
+                if not data.get(field):
+                    return Response({'error': f'{field} is required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            serializer = MusicSessionSerializer(data=data)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def get(self, request):
+        try:
+            sessions = MusicSession.objects.filter(user=request.user).order_by('-created_at')[:10]
+            serializer = MusicSessionSerializer(sessions, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
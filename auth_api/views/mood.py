@@ -0,0 +1,133 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from django.utils import timezone
+from datetime import timedelta
+from ..models import MoodLog
+
+# ========================
+# MOOD TRACKING VIEWS
+# ========================
+
+class MoodLogView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Return recent logs
+        logs = MoodLog.objects.filter(user=request.user).order_by('-date_time')[:50]
+        # Basic serialization
+        data = []
+        for log in logs:
+            data.append({
+                'id': log.id,
+                'mood_emoji': log.mood_emoji, # ID like 'happy'
+                'mood_label': log.mood_label,
+                'note': log.note,
+                'created_at': log.date_time
+            })
+        return Response(data)
+
+    def post(self, request):
+        try:
+            data = request.data
+            MoodLog.objects.create(
+                user=request.user,
+                mood_emoji=data.get('moodEmoji'),
+                mood_label=data.get('moodLabel'),
+                note=data.get('note'),
+                tag=data.get('tag')
+            )
+            return Response({'message': 'Logged'}, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class MoodSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            # 1. Fetch Logs (Last 14 days)
+            two_weeks_ago = timezone.now() - timedelta(days=14)
+            logs = MoodLog.objects.filter(user=request.user, date_time__gte=two_weeks_ago).order_by('date_time')
+            
+            if not logs.exists():
+                return Response({
+                    'dominant_mood': 'No Data',
+                    'total_entries': 0,
+                    'summary': "Start logging your moods to get AI insights!",
+                    'mood_counts': {},
+                    'suggestions': []
+                })
+
+            # 2. Prepare Data for AI
+            log_strings = []
+            counts = {}
+            for log in logs:
+                # Count
+                lbl = log.mood_label or 'Unknown'
+                counts[lbl] = counts.get(lbl, 0) + 1
+                
+                # String for prompt
+                date_str = log.date_time.strftime("%a %d")
+                note_str = f"({log.note})" if log.note else ""
+                log_strings.append(f"- {date_str}: {lbl} {note_str}")
+            
+            # Dominant Mood
+            dominant_mood = max(counts, key=counts.get) if counts else "Neutral"
+            
+            # 3. Call AI
+            from mental_health_backend.services.llm_registry import get_llm
+            from langchain_core.messages import SystemMessage, HumanMessage
+            import os
+            import json
+            
+            # Simple heuristic backup if AI fails
+            ai_summary = f"You have logged {len(logs)} entries recently. Your dominant mood is {dominant_mood}."
+            ai_suggestions = ["Try a short meditation."]
+            
+            if os.getenv("GROQ_API_KEY"):
+                try:
+                    llm = get_llm("llama-3.3-70b-versatile", temperature=0.7)
+                    
+                    prompt = f"""
+                    You are an empathetic mental health companion. Analyze these mood logs for user '{request.user.username}':
+                    
+                    {chr(10).join(log_strings)}
+                    
+                    Task:
+                    1. Write a warm, friendly summary (max 3 sentences) acknowledging their feelings. Be validating.
+                    2. Suggest 2 specific, actionable activities from our app (Options: '4-7-8 Breathing', '5-4-3-2-1 Grounding', 'Music Therapy', 'Journaling', 'Yoga', 'Meditations').
+
+                    Output JSON ONLY:
+                    {{
+                        "summary": "...",
+                        "suggestions": ["...", "..."]
+                    }}
+                    """
+                    
+                    response = llm.invoke([HumanMessage(content=prompt)])
+                    content = response.content.strip()
+                    # Robust JSON extraction
+                    start = content.find('{')
+                    end = content.rfind('}')
+                    if start != -1 and end != -1:
+                        content = content[start:end+1]
+                    
+                    parsed = json.loads(content, strict=False)
+                    ai_summary = parsed.get('summary', ai_summary)
+                    ai_suggestions = parsed.get('suggestions', ai_suggestions)
+                    
+                except Exception as e:
+                    print(f"AI Generation Failed: {e}")
+            
+            return Response({
+                'dominant_mood': dominant_mood,
+                'total_entries': logs.count(),
+                'summary': ai_summary,
+                'mood_counts': counts,
+                'suggestions': ai_suggestions
+            })
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
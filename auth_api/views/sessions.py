@@ -0,0 +1,208 @@
+import tempfile
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from django.utils import timezone
+from ..serializers import (
+    CalmingSessionSerializer, GroundingSessionSerializer, PanicSessionSerializer, StressBusterSessionSerializer
+)
+
+# ---------------------------
+# Session Logging Views
+# ---------------------------
+
+class CalmingSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            data = request.data.copy()
+            data['user'] = request.user.id
+            data['end_time'] = timezone.now()
+            serializer = CalmingSessionSerializer(data=data)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class GroundingSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            data = request.data.copy()
+            data['user'] = request.user.id
+            data['end_time'] = timezone.now()
+            serializer = GroundingSessionSerializer(data=data)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class PanicSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            data = request.data.copy()
+            data['user'] = request.user.id
+            data['end_time'] = timezone.now()
+            serializer = PanicSessionSerializer(data=data)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class StressBusterSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            from mental_health_backend.services.llm_registry import get_llm
+            
+            data = request.data.copy()
+            data['user'] = request.user.id
+            data['end_time'] = timezone.now()
+            
+            # Handle file upload for voice_file
+            if 'voice_file' in request.FILES:
+                data['voice_file'] = request.FILES['voice_file']
+            
+            serializer = StressBusterSessionSerializer(data=data)
+            if serializer.is_valid():
+                session = serializer.save()
+                
+                # --- AI ANALYSIS START ---
+                try:
+                    transcription = ""
+                    voice_emotion = "unknown"
+                    
+                    # 1. Speech-to-Text (STT)
+                    if session.voice_file:
+                        # Deferred: only voice sessions need the speech recognizer
+                        import speech_recognition as sr
+                        try:
+                            import shutil
+                            import os
+                            
+                            # 0. SETUP ENV BEFORE PYDUB IMPORT
+                            # Add current directory to PATH so pydub finds ffmpeg and ffprobe
+                            cwd = os.getcwd()
+                            if cwd not in os.environ["PATH"]:
+                                os.environ["PATH"] += os.pathsep + cwd
+                                print(f"🔍 DEBUG: Added {cwd} to PATH")
+
+                            local_ffmpeg = os.path.join(cwd, 'ffmpeg.exe')
+                            local_ffprobe = os.path.join(cwd, 'ffprobe.exe')
+
+                            # Verify tools exist
+                            has_ffmpeg = shutil.which("ffmpeg") is not None or os.path.exists(local_ffmpeg)
+                            has_ffprobe = shutil.which("ffprobe") is not None or os.path.exists(local_ffprobe)
+                            
+                            file_size = session.voice_file.size
+                            print(f"🔍 DEBUG: Voice File Size: {file_size}, FFMPEG: {has_ffmpeg}, FFPROBE: {has_ffprobe}")
+
+                            if not has_ffmpeg and not os.path.exists(local_ffmpeg):
+                                error_msg = "FFmpeg not found. Please run the setup script."
+                                print(f"❌ {error_msg}")
+                                raise Exception(error_msg)
+                            
+                            # 1. IMPORT PYDUB (Now search path is set)
+                            from pydub import AudioSegment
+                            if os.path.exists(local_ffmpeg):
+                                AudioSegment.converter = local_ffmpeg
+                                print(f"🔍 DEBUG: Set AudioSegment.converter = {local_ffmpeg}")
+                            if not has_ffprobe:
+                                print("⚠️ WARNING: FFprobe not found. Audio conversion might fail.")
+                            
+                            # Create a recognizer
+                            r = sr.Recognizer()
+                            
+                            # Convert to format SR likes (WAV) using pydub
+                            audio_path = session.voice_file.path
+                            
+                            # Convert to wav in a temp file
+                            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
+                                audio = AudioSegment.from_file(audio_path)
+                                audio.export(temp_wav.name, format="wav")
+                                temp_wav_path = temp_wav.name
+                                print(f"🔍 DEBUG: Converted WAV size: {os.path.getsize(temp_wav_path)}")
+                                
+                            with sr.AudioFile(temp_wav_path) as source:
+                                audio_data = r.record(source)
+                                transcription = r.recognize_google(audio_data)
+                                print(f"🔍 STT Transcript: {transcription}")
+                                
+                            # Cleanup temp file
+                            os.remove(temp_wav_path)
+
+                        except sr.UnknownValueError:
+                            print("❌ STT Error: Google Speech Recognition could not understand audio (UnknownValueError)")
+                            transcription = "[Audio was provided but could not be understood. Maybe too quiet?]"
+                        except sr.RequestError as e:
+                            print(f"❌ STT Error: Could not request results from Google Speech Recognition service; {e}")
+                            transcription = "[STT Service Unreachable]"
+                        except Exception as stt_e:
+                            print(f"❌ STT Error: {repr(stt_e)}") # repr gives type and message
+                            transcription = f"[Audio transcription failed: {str(stt_e)}]"
+                            # FORCE ERROR VISIBILITY FOR DEBUGGING
+                            session.feedback = f"⚠️ Technical Issue: {repr(stt_e)}"
+                            session.save()
+                            return Response({
+                                **serializer.data,
+                                'feedback': session.feedback,
+                                'transcription': transcription
+                            }, status=status.HTTP_201_CREATED)
+
+                    # 2. AI Feedback Generation
+                    note_text = session.note_text or ""
+                    
+                    if note_text or (transcription and not transcription.startswith("[")):
+                        prompt = f"""
+                        You are a compassionate mental health AI (MAA).
+                        
+                        USER SESSION:
+                        - Type: Stress Buster
+                        - User Note: "{note_text}"
+                        - Audio Transcript: "{transcription}"
+                        
+                        TASK:
+                        1. ANALYZE: Briefly explain the user's situation and feelings back to them to show deep understanding and validation.
+                        2. SOLUTION: Provide a specific, actionable, and tailored coping strategy or solution for their specific problem.
+                        
+                        TONE: Compassionate, non-judgmental, and practical.
+                        FORMAT: Use a clear "Analysis" and "Proposed Solution" structure. Keep it concise but meaningful.
+                        """
+                        
+                        llm = get_llm(temperature=0.7)
+                        
+                        response = llm.invoke(prompt)
+                        feedback = response.content.strip()
+                        
+                        # Save feedback
+                        session.feedback = feedback
+                        session.save()
+                        
+                        # Return updated data
+                        return Response({
+                            **serializer.data,
+                            'feedback': feedback,
+                            'transcription': transcription
+                        }, status=status.HTTP_201_CREATED)
+                        
+                except Exception as ai_e:
+                    print(f"❌ AI Analysis Error: {ai_e}")
+                    # Fallback: return created session without feedback
+                    
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
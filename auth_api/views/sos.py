@@ -0,0 +1,165 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.core.mail import send_mail
+from django.utils import timezone
+from ..models import UserProfile, Guardian
+
+# ---------------------------
+# SOS Emergency View
+# ---------------------------
+
+class SOSView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        print("🚨 SOS ENDPOINT TRIGGERED")
+        try:
+            profile = UserProfile.objects.get(user=request.user)
+            print(f"👤 User Profile Found: {profile.name}")
+            
+            guardian = Guardian.objects.filter(user=request.user).first()
+            if not guardian:
+                print("❌ No guardian found for user")
+                return Response({'error': 'No guardian set for this user'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            print(f"🛡️ Guardian Found: {guardian.name} ({guardian.email})")
+
+            location = request.data.get('location', 'Location not provided')
+            print(f"📍 Location: {location}")
+
+            subject = f"🚨 URGENT SOS: {profile.name} needs immediate help!"
+            
+            # HTML Content for a professional, "smooth" emergency email
+            html_message = f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <style>
+                    .container {{
+                        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                        max-width: 600px;
+                        margin: 0 auto;
+                        border: 2px solid #ff4d4d;
+                        border-radius: 12px;
+                        overflow: hidden;
+                        background-color: #ffffff;
+                    }}
+                    .header {{
+                        background-color: #ff4d4d;
+                        color: white;
+                        padding: 20px;
+                        text-align: center;
+                    }}
+                    .content {{
+                        padding: 30px;
+                        color: #333333;
+                        line-height: 1.6;
+                    }}
+                    .alert-box {{
+                        background-color: #fff5f5;
+                        border-left: 5px solid #ff4d4d;
+                        padding: 15px;
+                        margin: 20px 0;
+                        border-radius: 4px;
+                    }}
+                    .button {{
+                        display: inline-block;
+                        padding: 12px 24px;
+                        background-color: #ff4d4d;
+                        color: white !important;
+                        text-decoration: none;
+                        border-radius: 8px;
+                        font-weight: bold;
+                        margin-top: 20px;
+                        text-align: center;
+                    }}
+                    .footer {{
+                        background-color: #f8f9fa;
+                        padding: 15px;
+                        text-align: center;
+                        font-size: 12px;
+                        color: #777777;
+                    }}
+                    .detail-label {{
+                        font-weight: bold;
+                        color: #555555;
+                    }}
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1 style="margin:0;">⚠️ EMERGENCY SOS ⚠️</h1>
+                    </div>
+                    <div class="content">
+                        <p>Dear <strong>{guardian.name}</strong>,</p>
+                        <p>This is an automated emergency alert from the <strong>Mental Health Support App</strong>.</p>
+                        
+                        <div class="alert-box">
+                            <h2 style="color:#d93025; margin-top:0;">{profile.name} needs your help!</h2>
+                            <p>They have triggered a distress signal and may be in immediate danger or experiencing severe emotional crisis.</p>
+                        </div>
+
+                        <p><span class="detail-label">📍 Last Known Location:</span><br>
+                        <a href="{location}" style="color:#1a73e8;">{location}</a></p>
+                        
+                        <p><span class="detail-label">📞 Contact Number:</span><br>
+                        {profile.phone_number}</p>
+                        
+                        <p><span class="detail-label">🕒 Time of Trigger:</span><br>
+                        {timezone.now().strftime('%Y-%m-%d %H:%M:%S')} (Server Time)</p>
+
+                        <a href="tel:{profile.phone_number}" class="button">CALL NOW</a>
+                        <a href="{location}" class="button" style="background-color:#4285f4; margin-left:10px;">TRACK LOCATION</a>
+                    </div>
+                    <div class="footer">
+                        Sent via MAA Mental Health App Security Protocol.<br>
+                        Please do not reply to this automated email.
+                    </div>
+                </div>
+            </body>
+            </html>
+            """
+            
+            # Fallback plain text message
+            plain_message = (
+                f"🚨 URGENT SOS ALERT 🚨\n\n"
+                f"Dear {guardian.name},\n"
+                f"{profile.name} has triggered an SOS and needs immediate help.\n\n"
+                f"📍 Location: {location}\n"
+                f"📞 Phone: {profile.phone_number}\n"
+                f"🕒 Time: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+                f"PLEASE ACTION IMMEDIATELY."
+            )
+            
+            print("📧 Attempting to send high-priority HTML email...")
+            print(f"From: {settings.EMAIL_HOST_USER}")
+            print(f"To: {guardian.email}")
+            
+            send_mail(
+                subject,
+                plain_message,
+                settings.EMAIL_HOST_USER,
+                [guardian.email],
+                fail_silently=False,
+                html_message=html_message
+            )
+            print("✅ HTML Email sent successfully")
+            
+            return Response({
+                'message': f'SOS alert sent successfully to {guardian.name} ({guardian.phone_number})',
+                'guardian_name': guardian.name,
+                'guardian_email': guardian.email
+            }, status=status.HTTP_200_OK)
+        
+        except UserProfile.DoesNotExist:
+            print("❌ User profile not found")
+            return Response({'error': 'User profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            import traceback
+            print("❌ SOS Error Traceback:")
+            traceback.print_exc()
+            return Response({'error': f'Failed to send SOS: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
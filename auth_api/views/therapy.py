@@ -0,0 +1,100 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from ..models import TherapySession, TherapyRecord, ReflectionQuestion, TherapyRecordAnswer
+from ..serializers import TherapySessionSerializer, TherapyRecordSerializer
+
+# ---------------------------
+# THERAPY MODULE VIEWS (Music & Drawing)
+# ---------------------------
+
+class TherapySessionListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            therapy_type = request.query_params.get('type') # 'Music' or 'Drawing'
+            sessions = TherapySession.objects.all()
+            if therapy_type:
+                sessions = sessions.filter(therapy_type=therapy_type)
+            
+            serializer = TherapySessionSerializer(sessions, many=True)
+            return Response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class TherapySessionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            session = TherapySession.objects.get(pk=pk)
+            serializer = TherapySessionSerializer(session)
+            return Response(serializer.data)
+        except TherapySession.DoesNotExist:
+            return Response({'error': 'Therapy session not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class TherapyRecordCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        try:
+            data = request.data.copy()
+            user = request.user
+            
+            # Extract basic fields
+            session_id = data.get('session_id')
+            mood_before = data.get('mood_before')
+            mood_after = data.get('mood_after')
+            reflection_notes = data.get('reflection_notes')
+            drawing_file = request.FILES.get('drawing_file')
+            
+            if not session_id:
+                return Response({'error': 'Session ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+                
+            try:
+                session = TherapySession.objects.get(pk=session_id)
+            except TherapySession.DoesNotExist:
+                return Response({'error': 'Invalid Session ID'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Create Record
+            record = TherapyRecord.objects.create(
+                user=user,
+                session=session,
+                mood_before=mood_before,
+                mood_after=mood_after,
+                reflection_notes=reflection_notes,
+                drawing_file=drawing_file
+            )
+            
+            # Parse Answers 
+            answers_json = data.get('answers')
+            if answers_json:
+                import json
+                try:
+                    answers_list = json.loads(answers_json)
+                    for ans in answers_list:
+                        q_id = ans.get('question_id')
+                        a_text = ans.get('answer_text')
+                        if q_id and a_text:
+                            question = ReflectionQuestion.objects.get(pk=q_id)
+                            TherapyRecordAnswer.objects.create(
+                                record=record,
+                                question=question,
+                                answer_text=a_text
+                            )
+                except Exception as json_error:
+                    print(f"Error parsing answers: {json_error}")
+                    pass
+
+            serializer = TherapyRecordSerializer(record)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+        except Exception as e:
+            print(f"Error creating therapy record: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,101 @@
+"""
+Benchmark: per-row EmotionLog.objects.create vs the buffered writer (auth_api/emotion_log_buffer.py).
+
+Usage:
+    python bench_emotion_log.py              # Uses the configured database (DATABASE_URL / DB_* env)
+    python bench_emotion_log.py --sqlite     # Throwaway SQLite file (no network round trips, so gains look smaller)
+    python bench_emotion_log.py --rows 5000
+
+Reports insert throughput (rows/s) and request-path latency (what a view pays per prediction).
+All benchmark rows use user_id="bench" and are deleted afterwards.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(use_sqlite):
+    if use_sqlite:
+        db_path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mental_health_backend.settings")
+
+    import django
+    django.setup()
+
+    if use_sqlite:
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0, skip_checks=True)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(name, total_seconds, latencies, rows):
+    print(f"{name}")
+    print(f"   Throughput : {rows / total_seconds:,.0f} rows/s ({total_seconds:.3f}s for {rows} rows)")
+    print(f"   Latency    : p50={statistics.median(latencies) * 1000:.3f}ms "
+          f"p95={percentile(latencies, 95) * 1000:.3f}ms max={max(latencies) * 1000:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--buffer-size", type=int, default=50)
+    parser.add_argument("--sqlite", action="store_true")
+    args = parser.parse_args()
+
+    setup_django(args.sqlite)
+
+    from auth_api.models import EmotionLog
+    from auth_api.emotion_log_buffer import EmotionLogBuffer
+
+    EmotionLog.objects.filter(user_id="bench").delete()
+    print(f"--- EmotionLog write benchmark ({args.rows} rows) ---\n")
+
+    # 1. BEFORE: one INSERT per prediction on the request path
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.rows):
+        t0 = time.perf_counter()
+        EmotionLog.objects.create(user_id="bench", modality="text", emotion="sad", confidence=0.9)
+        latencies.append(time.perf_counter() - t0)
+    report("BEFORE  objects.create()", time.perf_counter() - start, latencies, args.rows)
+
+    # 2. AFTER (inline flush): the request that fills the buffer pays for one bulk_create
+    buffer = EmotionLogBuffer(max_size=args.buffer_size, flush_interval=60, background=False)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.rows):
+        t0 = time.perf_counter()
+        buffer.add(modality="text", emotion="sad", confidence=0.9, user_id="bench")
+        latencies.append(time.perf_counter() - t0)
+    buffer.flush()
+    report(f"AFTER   buffer (inline flush, size={args.buffer_size})", time.perf_counter() - start, latencies, args.rows)
+
+    # 3. AFTER (background flush): requests only append to memory
+    buffer = EmotionLogBuffer(max_size=args.buffer_size, flush_interval=60, background=True)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.rows):
+        t0 = time.perf_counter()
+        buffer.add(modality="text", emotion="sad", confidence=0.9, user_id="bench")
+        latencies.append(time.perf_counter() - t0)
+    while buffer.pending():
+        buffer.flush()
+    report(f"AFTER   buffer (background flush, size={args.buffer_size})", time.perf_counter() - start, latencies, args.rows)
+
+    written = EmotionLog.objects.filter(user_id="bench").count()
+    print(f"\nRows written: {written} (expected {args.rows * 3})")
+    EmotionLog.objects.filter(user_id="bench").delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Benchmark: CPU cost of assembling the generation prompt, per call.
+
+Usage:
+    python bench_prompt_assembly.py                # 5k calls per mode
+    python bench_prompt_assembly.py --calls 20000 --rag-chars 4000
+
+"current" is GenerationLayer._build_chain (cached per-(mode, policy) template and chain, per-turn slots only,
+including fitting them to the context token budget and counting the prompt's tokens);
+"legacy" rebuilds the f-string system prompt, ChatPromptTemplate and chain on every call, as before.
+Both then format the messages that would be sent; no LLM is called.
+Also checks that the static prompt prefix is byte-identical across turns.
+"""
+import argparse
+import os
+import sys
+import time
+
+from langchain_core.prompts import ChatPromptTemplate
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+POLICIES = ["SUPPORTIVE", "CBT", "GROUNDING", "PSYCHOEDUCATION", "FRIEND_SUGGEST", "CONCLUSION"]
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mental_health_backend.settings")
+    import django
+    django.setup()
+
+
+class FakeSession:
+    def __init__(self):
+        self.core_context = {"story": "Failed an exam and fears what parents will think.", "trigger_event": "failed test",
+                             "core_fear": "judgment", "primary_emotion": "ANXIOUS"}
+        self.friend_question_cooldown = 0
+
+
+def legacy_build_chain(self, state, policy, rag_context, mode='friend', session=None, history=None):
+    """
+    GenerationLayer._build_chain before templates were cached (f-string prompt rebuilt every call).
+    """
+    # 1. Select the correct System Instruction based on Policy
+    policy_instructions = self._get_policy_instruction(policy)
+
+    # 2. Extract Meaning Context (from Session)
+    context_str = ""
+    if session and hasattr(session, 'core_context'):
+         ctx = session.core_context
+         context_str = f"USER CONTEXT [MEMORY]: Story='{ctx.get('story')}', Trigger='{ctx.get('trigger_event')}', Fear='{ctx.get('core_fear')}', Mood='{ctx.get('primary_emotion')}'"
+
+    # 3. Construct the History String
+    history_str = ""
+    if history:
+        history_str = "\n".join([f"{m['role'].upper()}: {m['content']}" for m in history])
+
+    # 4. Construct the PROMPT
+    if mode == 'normal':
+         # Less constrained, more general assistant prompt
+         system_msg = f"""
+         You are MAA, a comprehensive mental health assistant.
+
+         CURRENT STATE: {state}
+         SELECTED POLICY: {policy}
+
+         CORE INSTRUCTIONS:
+         1. Persona: Knowledgeable, professional, and supportive.
+         2. Goal: Provide accurate information and helpful guidance.
+         3. Flexibility: You are not restricted to short responses, but keep it readable.
+         4. Safety: If risk is detected, provide crisis resources immediately.
+
+         POLICY INSTRUCTIONS ({policy}):
+         {policy_instructions}
+
+         RAG CONTEXT (If any):
+         {rag_context if rag_context else "None available."}
+
+         RECENT CONVERSATION HISTORY:
+         {history_str if history_str else "No previous history."}
+         """
+    else:
+        # FRIEND/GUIDE Mode: Highly constrained, therapeutic persona
+        persona_prompt = ""
+
+        # Question Cooldown Logic (Fix for friend/guide)
+        allow_question = True
+        if session and hasattr(session, 'friend_question_cooldown'):
+            if session.friend_question_cooldown > 0:
+                allow_question = False
+                session.friend_question_cooldown -= 1
+            else:
+                allow_question = True
+                session.friend_question_cooldown = 2 # Ask every 3rd turn
+
+        question_rule = "MANDATORY: Do NOT ask any questions in this response. Just react and provide feedback." if not allow_question else "You may ask ONE helpful question if it moves the conversation forward."
+
+        if mode == 'friend':
+            persona_prompt = f"""
+            You are a warm, real human friend. 
+
+            MANDATORY FRIEND RULES:
+            1. React naturally (surprise, empathy, humor, reassurance).
+            2. Use casual words ("hey", "listen", "damn", "I get you").
+            3. NO therapy language (Avoid: "safe space", "exploring", "process").
+            4. You are allowed to give advice and share opinions like a real friend.
+            5. {question_rule}
+            """
+        else: # guide
+             persona_prompt = f"""
+             You are a calm, skilled CBT guide.
+
+             MANDATORY GUIDE RULES:
+             1. Structured and directional.
+             2. After understanding the issue, teach ONE technique.
+             3. Always move toward action and progress.
+             4. {question_rule}
+             """
+
+        system_msg = f"""
+        {persona_prompt}
+
+        {context_str}
+
+        GLOBAL LAWS:
+        1. Length: Adaptive. Be concise but helpful.
+        2. Internal Reasoning: You MAY reason internally to understand the user's intent.
+        3. Do NOT expose internal reasoning (like 'CURRENT STATE' or 'POLICY') in the final message. 
+        4. NEGATIVE CONSTRAINTS: NO meta-language like "acknowledging your readiness", "let's examine", "before we proceed". Just talk.
+
+        POLICY INSTRUCTIONS ({policy}):
+        {policy_instructions}
+
+        RAG CONTEXT (If any):
+        {rag_context if rag_context else "None available."}
+
+        RECENT CONVERSATION HISTORY:
+        {history_str if history_str else "No previous history."}
+        """
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_msg),
+        ("human", "{text}")
+    ])
+
+    return prompt | self.llm
+
+
+def run(build, layer, calls, mode, rag_context, history):
+    session = FakeSession()
+    start = time.process_time()
+    for i in range(calls):
+        build(layer, "EXPLORATION", POLICIES[i % len(POLICIES)], rag_context, mode, session, history)
+    elapsed = time.process_time() - start
+    return elapsed * 1e6 / calls
+
+
+def current_build(layer, state, policy, rag_context, mode, session, history):
+    chain, inputs = layer._build_chain(state, policy, rag_context, mode, session, history)
+    return chain.first.format_messages(**inputs, text="I keep thinking I'm a failure")
+
+
+def legacy_build(layer, state, policy, rag_context, mode, session, history):
+    chain = legacy_build_chain(layer, state, policy, rag_context, mode, session, history)
+    return chain.first.format_messages(text="I keep thinking I'm a failure")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--rag-chars", type=int, default=2000, help="Size of the RAG context passed in")
+    parser.add_argument("--history", type=int, default=10, help="Messages of conversation history")
+    args = parser.parse_args()
+
+    setup_django()
+    from langchain_core.runnables import RunnableLambda
+    from chatbot.core.generation_layer import GenerationLayer
+
+    class BenchLayer(GenerationLayer):
+        # Stand-in model: the chain is composed as in production, but never invoked
+        llm = RunnableLambda(lambda messages: messages)
+
+    layer = BenchLayer()
+    rag_context = ("Box breathing: inhale for four counts, hold for four, exhale for four. " * 100)[:args.rag_chars]
+    history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} about exams and sleep"}
+               for i in range(args.history)]
+
+    print(f"--- Prompt assembly, {args.calls} calls per mode ---")
+    for mode in ("friend", "guide", "normal"):
+        current = run(current_build, layer, args.calls, mode, rag_context, history)
+        legacy = run(legacy_build, layer, args.calls, mode, rag_context, history)
+        print(f"   {mode:7s} current {current:7.1f} µs CPU/call, legacy {legacy:7.1f} µs CPU/call ({legacy / current:.1f}x)")
+
+    # Same (mode, policy), different turn: everything before the first per-turn slot must match exactly
+    first = current_build(layer, "EXPLORATION", "CBT", "rag one", "friend", FakeSession(), history[:2])[0].content
+    second = current_build(layer, "REFLECTION", "CBT", "rag two", "friend", FakeSession(), history)[0].content
+    prefix = os.path.commonprefix([first, second])
+    print(f"   static prefix shared across turns: {len(prefix)} of {len(first)} system prompt chars")
+
+
+if __name__ == "__main__":
+    main()
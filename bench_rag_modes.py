@@ -0,0 +1,64 @@
+"""
+Benchmark: RAG "retrieve" mode (raw top-k chunks) vs legacy "synthesize" mode (llama-index + Groq answer).
+
+Usage:
+    python bench_rag_modes.py            # Needs GROQ_API_KEY and the data/ folder
+    python bench_rag_modes.py --runs 5
+
+Measures RAGLayer.retrieve latency per mode over a fixed set of CBT/grounding/psychoeducation turns.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mental_health_backend.settings")
+
+import django
+django.setup()
+
+from chatbot.core.rag_layer import RAGLayer
+
+QUERIES = [
+    ("CBT", "I always mess everything up at work"),
+    ("CBT", "It's my fault my friends stopped talking to me"),
+    ("GROUNDING", "I'm panicking and can't breathe"),
+    ("GROUNDING", "my heart is racing and I feel dizzy"),
+    ("PSYCHOEDUCATION", "what is catastrophizing?"),
+    ("PSYCHOEDUCATION", "why do I feel anxious before exams"),
+]
+
+
+def run_mode(mode, runs):
+    latencies = []
+    sizes = []
+    for _ in range(runs):
+        for policy, query in QUERIES:
+            t0 = time.perf_counter()
+            context = RAGLayer.retrieve(policy, query, mode=mode)
+            latencies.append(time.perf_counter() - t0)
+            sizes.append(len(context))
+    return latencies, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    # Warm up the embedder so the first query doesn't skew either mode
+    RAGLayer.retrieve("CBT", "warm up", mode="retrieve")
+
+    print(f"--- RAG mode latency ({len(QUERIES) * args.runs} queries per mode) ---\n")
+    for mode in ["retrieve", "synthesize"]:
+        latencies, sizes = run_mode(mode, args.runs)
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(f"{mode:<11} p50={statistics.median(latencies) * 1000:8.1f}ms  "
+              f"p95={p95 * 1000:8.1f}ms  avg context={statistics.mean(sizes):.0f} chars")
+
+
+if __name__ == "__main__":
+    main()
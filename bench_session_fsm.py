@@ -0,0 +1,81 @@
+"""
+Benchmark: per-turn cost of the session state machine over a long session.
+
+Usage:
+    python bench_session_fsm.py               # 10k turns
+    python bench_session_fsm.py --turns 50000 --window 1000
+
+Each turn does what the orchestrator does to the FSM: record("user_msg"), update_state(), and
+serialize the state for the session backend (to_dict + JSON). "legacy" replays the old list-based
+history (full scan per turn, full list serialized) for comparison.
+Per-turn time should stay flat for the current FSM and grow linearly for legacy.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+SIGNALS = {"emotion": "ANXIETY", "type": "FEELING", "intent": "VENT", "distortion": "none", "text": "i feel stressed"}
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mental_health_backend.settings")
+    import django
+    django.setup()
+
+
+def run_current(turns):
+    from chatbot.core.session_manager import SessionFSM
+    session = SessionFSM("bench")
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        session.record("user_msg")
+        session.update_state(SIGNALS, "LOW")
+        payload = json.dumps(session.to_dict())
+        samples.append(time.perf_counter() - start)
+    return samples, len(payload)
+
+
+def run_legacy(turns):
+    history = []
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        history.append("user_msg")
+        len([m for m in history if m == "user_msg"])
+        len([x for x in history if x == "intervention_step"])
+        payload = json.dumps({"history": history})
+        samples.append(time.perf_counter() - start)
+    return samples, len(payload)
+
+
+def report(name, samples, payload_bytes, buckets):
+    size = max(1, len(samples) // buckets)
+    medians = [statistics.median(samples[i:i + size]) * 1e6 for i in range(0, len(samples), size)]
+    print(f"   {name:8s} µs/turn by segment: " + " ".join(f"{m:7.1f}" for m in medians))
+    print(f"   {name:8s} first/last segment: {medians[0]:.1f} → {medians[-1]:.1f} µs, state size {payload_bytes} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10000)
+    parser.add_argument("--buckets", type=int, default=10, help="Report the median of this many equal segments")
+    parser.add_argument("--window", type=int, help="Override CHAT_SESSION_HISTORY_WINDOW")
+    args = parser.parse_args()
+
+    if args.window:
+        os.environ["CHAT_SESSION_HISTORY_WINDOW"] = str(args.window)
+    setup_django()
+
+    print(f"--- SessionFSM, {args.turns} turns ---")
+    report("current", *run_current(args.turns), args.buckets)
+    report("legacy", *run_legacy(args.turns), args.buckets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: SignalLayer keyword detection over a large message corpus.
+
+Usage:
+    python bench_signal_layer.py                  # 20k messages
+    python bench_signal_layer.py --messages 100000 --seed 7
+
+"current" is SignalLayer's keyword tier (one pass of the compiled keyword matcher);
+"legacy" replays the old per-list substring scans. Also reports how many messages get different
+signals, i.e. the substring false positives the word-boundary matching removes ("end" in "friend"),
+and checks the regression cases: inflected forms whole-word matching must still catch (exit code 1 if one is missed).
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+FRAGMENTS = [
+    "i feel so alone since my friend moved away", "my boss keeps piling on pressure",
+    "what should i do about my exams", "i can't stop worrying about the future",
+    "honestly today was a good day", "everyone at school thinks i'm weird",
+    "i'm so tired of trying", "it's always my fault", "how do i stop overthinking at night?",
+    "i had a weird dream about my grandmother", "the weekend went by too fast",
+    "i want to end it all", "my sister is studying biology", "can you suggest some breathing tips",
+    "i think i need to wrap up for today", "i hate how unfair this feels", "i changed my diet recently",
+    "thanks, that actually helps", "there's no point anymore", "i have been picking up a new skill",
+]
+
+# Inflected forms -> the signals they must give (the substring scans caught these, "worried" aside)
+REGRESSION_CASES = [
+    ("i keep panicking before exams", {"emotion": "ANXIOUS"}),
+    ("i panicked during the presentation", {"emotion": "ANXIOUS"}),
+    ("i'm worried about my mom", {"emotion": "ANXIOUS"}),
+    ("i feel like such a failure", {"emotion": "SAD"}),
+    ("i've been crying all night", {"emotion": "SAD"}),
+    ("he keeps hurting me", {"emotion": "SAD"}),
+    ("i was hating every minute", {"emotion": "ANGRY"}),
+    ("someone got stabbed near my house", {"hopelessness": True}),
+    ("i'm thinking about killing myself", {"hopelessness": True}),
+    ("i feel like i'm dying inside", {"hopelessness": True}),
+    ("i keep having harmful thoughts", {"hopelessness": True}),
+    ("i feel like a murderer", {"hopelessness": True}),
+    ("i stopped taking my meds", {"intent": "CONCLUDE"}),
+]
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mental_health_backend.settings")
+    import django
+    django.setup()
+
+
+def legacy_process(text):
+    text_lower = text.lower()
+    emotion = "NEUTRAL"
+    if any(w in text_lower for w in ["sad", "cry", "tear", "alone", "hurt", "fail", "lost", "grief", "heavy", "pain"]):
+        emotion = "SAD"
+    elif any(w in text_lower for w in ["anxious", "worry", "panic", "scared", "fear", "afraid", "nervous", "future", "what if"]):
+        emotion = "ANXIOUS"
+    elif any(w in text_lower for w in ["angry", "mad", "hate", "furious", "annoyed", "unfair", "rage"]):
+        emotion = "ANGRY"
+    elif any(w in text_lower for w in ["stressed", "tired", "burned out", "busy", "overwhelmed", "pressure"]):
+        emotion = "STRESSED"
+    elif any(w in text_lower for w in ["happy", "good", "great", "joy", "excited", "love", "thanks", "better"]):
+        emotion = "HAPPY"
+    crisis_keywords = [
+        "die", "kill myself", "suicide", "end it all", "no point", "worthless", "give up",
+        "self-harm", "overdose", "end my life", "jump", "hang", "cutting", "better off dead",
+        "don't want to live", "kill all", "hurt them", "harm", "kill everyone", "slash", "stab", "poison",
+        "kill ", "murder", "hurt others", "want to kill", "violence"
+    ]
+    hopelessness = any(w in text_lower for w in crisis_keywords) or bool(re.search(r'\bkill\b', text_lower))
+    intensity = 3
+    if any(w in text_lower for w in ["very", "so", "really", "extremely", "totally", "can't", "never", "always"]):
+        intensity += 2
+    if hopelessness or emotion == "ANGRY" or "panic" in text_lower:
+        intensity += 2
+    distortion = "none"
+    if "always" in text_lower or "never" in text_lower or "everyone" in text_lower:
+        distortion = "all_or_nothing"
+    elif "fault" in text_lower or "blame" in text_lower:
+        distortion = "self_blame"
+    q_type = "FEELING"
+    question_words = ["how", "what", "why", "when", "where", "who", "can you", "could you", "should i", "tell me", "help me"]
+    if "?" in text_lower or any(text_lower.startswith(w) for w in question_words):
+        q_type = "QUESTION"
+    intent = "VENT"
+    solve_keywords = ["what should i do", "how to fix", "advice", "help me with", "solution", "suggest", "tips", "how do i"]
+    if any(kw in text_lower for kw in solve_keywords) or (q_type == "QUESTION" and any(w in text_lower for w in ["how", "should"])):
+        intent = "SOLVE"
+    conclude_keywords = ["solution", "conclusion", "what now", "final", "summary", "done", "wrap up", "stop", "end"]
+    if any(kw in text_lower for kw in conclude_keywords):
+        intent = "CONCLUDE"
+    return {
+        "emotion": emotion, "intensity": intensity, "type": q_type, "distortion": distortion,
+        "hopelessness": hopelessness, "intent": intent, "action_preference": "NONE"
+    }
+
+
+def make_corpus(n, seed):
+    rng = random.Random(seed)
+    return [". ".join(rng.sample(FRAGMENTS, rng.randint(1, 4))) for _ in range(n)]
+
+
+def run(name, process, corpus):
+    start = time.perf_counter()
+    results = [process(text) for text in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"   {name:8s} {elapsed * 1e6 / len(corpus):7.1f} µs/message ({elapsed:.2f}s total)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from chatbot.core.signal_layer import SignalLayer
+    corpus = make_corpus(args.messages, args.seed)
+
+    print(f"--- SignalLayer, {len(corpus)} messages ---")
+    layer = SignalLayer()
+    current = run("current", lambda text: layer.keyword_signals(text)[0], corpus)
+    legacy = run("legacy", legacy_process, corpus)
+
+    changed = {}
+    for new, old in zip(current, legacy):
+        for key in new:
+            if key in old and new[key] != old[key]:
+                changed[key] = changed.get(key, 0) + 1
+    print("   signals that differ from legacy: " + (", ".join(f"{k} {v}" for k, v in sorted(changed.items())) or "none"))
+
+    missed = []
+    for text, expected in REGRESSION_CASES:
+        signals = layer.keyword_signals(text)[0]
+        missed += [f"{text!r}: {key} {signals[key]} != {value}" for key, value in expected.items() if signals[key] != value]
+    print(f"   regression cases: {len(REGRESSION_CASES) - len(missed)}/{len(REGRESSION_CASES)} ok")
+    for line in missed:
+        print(f"      missed {line}")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Benchmark: wall time of manage.py commands, i.e. what every management command, test run
+and worker boot pays before doing any work.
+
+Usage:
+    python bench_startup.py                       # python manage.py check, 5 runs
+    python bench_startup.py --command "showmigrations auth_api" --runs 10
+    python bench_startup.py --warmup              # Same, with CHAT_WARMUP=True (eager RAG/LLM setup)
+
+Run it on two checkouts (or before/after a change) and compare the medians.
+"""
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once(command, env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "manage.py", *shlex.split(command)],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(f"❌ 'manage.py {command}' failed (exit {result.returncode})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--command", default="check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true", help="Set CHAT_WARMUP=True for the runs")
+    args = parser.parse_args()
+
+    env = dict(os.environ, CHAT_WARMUP="True" if args.warmup else os.environ.get("CHAT_WARMUP", "False"))
+
+    print(f"--- manage.py {args.command} startup ({args.runs} runs) ---")
+    run_once(args.command, env)  # Untimed: fills OS file caches / .pyc
+    samples = [run_once(args.command, env) for _ in range(args.runs)]
+    print(f"   min={min(samples):.2f}s median={statistics.median(samples):.2f}s max={max(samples):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
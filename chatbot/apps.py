@@ -0,0 +1,36 @@
+import threading
+import time
+from django.apps import AppConfig
+from django.conf import settings
+
+
+def warm_up():
+    """
+    Loads what the first chat turn would otherwise pay for: the RAG index + embedder
+    and the generation LLM client, and the prompt tokenizer.
+    """
+    start = time.perf_counter()
+    from chatbot import doc_engine
+    from chatbot.orchestrator import _orchestrator
+    from chatbot.core.context_budget import token_counter
+
+    doc_engine.ensure_ready()
+    _orchestrator.generation_layer.llm
+    token_counter.count("warm-up")
+    print(f"🔥 Chatbot warm-up done in {time.perf_counter() - start:.2f}s")
+
+
+class ChatbotConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'chatbot'
+
+    def ready(self):
+        # Keep the RAG index in sync with admin-curated content (Article, CopingMethod, ...)
+        if getattr(settings, 'RAG_SYNC_DB_RECORDS', True):
+            from chatbot.rag_jobs import connect_record_signals
+            connect_record_signals()
+
+        # Heavy components are lazy; serving processes can load them at boot instead of on the first chat.
+        # Off by default so management commands and tests start fast.
+        if getattr(settings, 'CHAT_WARMUP', False):
+            threading.Thread(target=warm_up, daemon=True, name="maa-warmup").start()
@@ -0,0 +1,83 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+# Keeps hyphenated/apostrophe terms whole, so "5-4-3-2-1" and "can't" are single tokens
+_TOKEN = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i i'm in is it its me my of on or so that the "
+    "this to was were what when with you your".split()
+)
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    """
+    In-process Okapi BM25 over the same chunks as the vector index.
+    Inverted index: term -> [(doc position, term frequency)], so a query only touches
+    the postings of its own terms.
+    """
+
+    def __init__(self, nodes, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.nodes = {}  # node_id -> node, to turn hits back into chunks
+        self.node_ids = []
+        self.metadata = []
+        self._postings = defaultdict(list)
+        self._lengths = []
+
+        for position, node in enumerate(nodes):
+            terms = Counter(tokenize(node.get_content()))
+            self.nodes[node.node_id] = node
+            self.node_ids.append(node.node_id)
+            self.metadata.append(node.metadata)
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings[term].append((position, tf))
+
+        count = len(self.node_ids)
+        self._avg_length = (sum(self._lengths) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def search(self, query: str, top_k: int = 10, sources: dict = None) -> list:
+        """
+        [(node_id, score)] best first; only chunks sharing at least one term with the query.
+        sources restricts to chunks whose metadata matches any {key: [values]} entry.
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for position, tf in self._postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / self._avg_length)
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if sources:
+            scores = {p: s for p, s in scores.items() if self._matches(self.metadata[p], sources)}
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.node_ids[p], score) for p, score in ranked]
+
+    @staticmethod
+    def _matches(metadata: dict, sources: dict) -> bool:
+        return any(metadata.get(key) in values for key, values in sources.items())
+
+def reciprocal_rank_fusion(*rankings, k: int = 60) -> list:
+    """
+    Fuses ranked lists of ids: score(id) = sum over lists of 1 / (k + rank).
+    Returns [(id, fused score)] best first.
+    """
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            fused[item_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
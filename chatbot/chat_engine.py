@@ -1,28 +1,16 @@
 import os
 from dotenv import load_dotenv
-from langchain.prompts import (
-    ChatPromptTemplate,
-    MessagesPlaceholder,
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate,
-)
-from langchain_groq import ChatGroq
-from langchain.chains import LLMChain
-from langchain.memory import ConversationBufferMemory
-from django.conf import settings
+from mental_health_backend.services.llm_registry import get_llm as get_shared_llm
 
 load_dotenv()
 
-# Initialize Groq
-try:
-    llm = ChatGroq(
-        api_key=settings.GROQ_API_KEY,
-        model_name=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
-        temperature=0.6  # Slightly lower for more consistent helpfulness
-    )
-except Exception as e:
-    print(f"Error initializing Groq: {e}")
-    llm = None
+def get_llm():
+    # Shared Groq client from the registry (created on first use, so importing this module stays cheap)
+    try:
+        return get_shared_llm(os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"), temperature=0.6)  # Slightly lower for more consistent helpfulness
+    except Exception as e:
+        print(f"Error initializing Groq: {e}")
+        return None
 
 # System Prompt - The Brain of MAA
 MAA_SYSTEM_PROMPT = """
@@ -48,6 +36,16 @@ Name: MAA.
 session_memory_map = {}
 
 def get_response(session_id: str, user_query: str) -> str:
+    from langchain.prompts import (
+        ChatPromptTemplate,
+        MessagesPlaceholder,
+        SystemMessagePromptTemplate,
+        HumanMessagePromptTemplate,
+    )
+    from langchain.chains import LLMChain
+    from langchain.memory import ConversationBufferMemory
+
+    llm = get_llm()
     if not llm:
         return "Error: AI engine not initialized. Check server logs."
         
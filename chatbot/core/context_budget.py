@@ -0,0 +1,202 @@
+import re
+import threading
+from django.conf import settings
+
+# Token budget for the per-turn parts of the generation prompt (memory, RAG context, history).
+# The static instructions and the user's message come on top of this.
+CONTEXT_TOKEN_BUDGET = getattr(settings, 'CHAT_CONTEXT_TOKEN_BUDGET', 3000)
+# Share of the budget each part is guaranteed; whatever a part doesn't use goes to the others
+CONTEXT_SHARES = {"memory": 0.1, "rag": 0.45, "history": 0.45, **getattr(settings, 'CHAT_CONTEXT_SHARES', {})}
+# tiktoken encoding used to count tokens (close enough for Llama models); if tiktoken or its
+# encoding file isn't available, ~4 characters per token is assumed instead
+TOKENIZER = getattr(settings, 'CHAT_TOKENIZER', 'cl100k_base')
+CHARS_PER_TOKEN = 4
+
+# Appended to cut text (counted within the limit)
+TRUNCATION_MARK = " …"
+
+# RAGLayer.format_chunks output: "[1] (from source)\n..." excerpts, best first
+_EXCERPT_START = re.compile(r"\n\n(?=\[\d+\] \(from )")
+
+class TokenCounter:
+    """
+    Local token counting. The tiktoken encoding is loaded on first use (it may need a one-time download),
+    and a failed load falls back to the character heuristic for the life of the process.
+    """
+
+    def __init__(self, encoding_name: str = TOKENIZER):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _get_encoding(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        import tiktoken
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception as e:
+                        print(f"⚠️ Tokenizer '{self.encoding_name}' unavailable, estimating tokens from length: {e}")
+                    self._loaded = True
+        return self._encoding
+
+    @property
+    def name(self) -> str:
+        return f"tiktoken:{self.encoding_name}" if self._get_encoding() else "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self._get_encoding()
+        if encoding:
+            return len(encoding.encode(text, disallowed_special=()))
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        The start of text, cut to at most max_tokens (including the truncation mark).
+        """
+        if max_tokens <= 0:
+            return ""
+        encoding = self._get_encoding()
+        if encoding:
+            tokens = encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            keep = max_tokens - len(encoding.encode(TRUNCATION_MARK))
+            return encoding.decode(tokens[:keep]).rstrip() + TRUNCATION_MARK if keep > 0 else ""
+        limit = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        cut = text[:limit - len(TRUNCATION_MARK)]
+        # Don't end mid-word
+        return (cut.rsplit(None, 1)[0] if " " in cut else cut) + TRUNCATION_MARK
+
+token_counter = TokenCounter()
+
+class ContextBudget:
+    """
+    Fits memory, RAG context and conversation history into the token budget for one turn.
+    History keeps the most recent messages (older ones are already folded into the memory story),
+    RAG keeps the best-ranked excerpts; a part that still doesn't fit is cut.
+    Also aggregates per-turn prompt token counts.
+    """
+
+    def __init__(self, budget: int = CONTEXT_TOKEN_BUDGET, shares: dict = CONTEXT_SHARES, counter: TokenCounter = token_counter):
+        self.budget = budget
+        self.shares = shares
+        self.counter = counter
+        self._lock = threading.Lock()
+
+        self.turns = 0
+        self.trimmed_turns = 0
+        self.totals = {}
+        self.max_prompt_tokens = 0
+
+    def fit(self, memory: str, rag_context: str, history: list):
+        """
+        Returns (memory, rag_context, history, usage); history is a list of {"role", "content"} dicts
+        (oldest first) and usage the token count of each part after fitting.
+        """
+        count = self.counter.count
+        need = {
+            "memory": count(memory),
+            "rag": count(rag_context),
+            "history": sum(count(self._line(m)) for m in history),
+        }
+        allowed = self._allocate(need)
+        usage = {"history_dropped": 0, "trimmed": False}
+
+        if need["memory"] > allowed["memory"]:
+            memory = self.counter.truncate(memory, allowed["memory"])
+        if need["rag"] > allowed["rag"]:
+            rag_context = self._fit_rag(rag_context, allowed["rag"])
+        if need["history"] > allowed["history"]:
+            history, usage["history_dropped"] = self._fit_history(history, allowed["history"])
+
+        usage["trimmed"] = any(need[part] > allowed[part] for part in need)
+        usage["memory"] = count(memory)
+        usage["rag"] = count(rag_context)
+        usage["history"] = sum(count(self._line(m)) for m in history)
+        return memory, rag_context, history, usage
+
+    def _allocate(self, need: dict) -> dict:
+        # Each part first gets up to its share, then the parts that need more split what is left over
+        allowed = {part: min(need[part], int(self.budget * self.shares.get(part, 0))) for part in need}
+        spare = self.budget - sum(allowed.values())
+        for part in sorted(need, key=lambda p: need[p] - allowed[p]):
+            wanting = [p for p in need if need[p] > allowed[p]]
+            if spare <= 0 or not wanting:
+                break
+            if part in wanting:
+                extra = min(need[part] - allowed[part], spare // len(wanting))
+                allowed[part] += extra
+                spare -= extra
+        return allowed
+
+    @staticmethod
+    def _line(message: dict) -> str:
+        # As GenerationLayer renders history
+        return f"{message['role'].upper()}: {message['content']}"
+
+    def _fit_history(self, history: list, max_tokens: int):
+        """
+        Newest messages that fit; the newest one is cut if even it alone doesn't.
+        Returns (kept messages oldest first, number dropped).
+        """
+        kept = []
+        used = 0
+        for message in reversed(history):
+            tokens = self.counter.count(self._line(message))
+            if used + tokens > max_tokens:
+                if not kept:
+                    prefix = self.counter.count(f"{message['role'].upper()}: ")
+                    content = self.counter.truncate(message["content"], max_tokens - prefix)
+                    if content:
+                        kept.append({**message, "content": content})
+                break
+            kept.append(message)
+            used += tokens
+        kept.reverse()
+        return kept, len(history) - len(kept)
+
+    def _fit_rag(self, rag_context: str, max_tokens: int) -> str:
+        excerpts = _EXCERPT_START.split(rag_context)
+        kept = []
+        for excerpt in excerpts:
+            # Counted with the separators, as the excerpts go into the prompt
+            if self.counter.count("\n\n".join(kept + [excerpt])) > max_tokens:
+                if not kept:
+                    kept.append(self.counter.truncate(excerpt, max_tokens))
+                break
+            kept.append(excerpt)
+        return "\n\n".join(kept)
+
+    def record(self, usage: dict):
+        """
+        Adds one turn's prompt token counts (usage from fit() plus "system", "user" and "total").
+        """
+        with self._lock:
+            self.turns += 1
+            if usage.get("trimmed"):
+                self.trimmed_turns += 1
+            for part in ("system", "memory", "rag", "history", "user", "total"):
+                self.totals[part] = self.totals.get(part, 0) + usage.get(part, 0)
+            self.max_prompt_tokens = max(self.max_prompt_tokens, usage.get("total", 0))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tokenizer": self.counter.name,
+                "budget": self.budget,
+                "turns": self.turns,
+                "trimmed_turns": self.trimmed_turns,
+                "avg_prompt_tokens": {
+                    part: round(total / self.turns, 1) for part, total in self.totals.items()
+                } if self.turns else {},
+                "max_prompt_tokens": self.max_prompt_tokens,
+            }
+
+context_budget = ContextBudget()
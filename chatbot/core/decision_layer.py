@@ -1,4 +1,6 @@
 from enum import Enum
+from itertools import product
+from chatbot.core.session_manager import State
 
 class Policy(Enum):
     SUPPORTIVE = "SUPPORTIVE"
@@ -13,91 +15,125 @@ class Policy(Enum):
     FRIEND_SUGGEST = "FRIEND_SUGGEST"
     CONCLUSION = "CONCLUSION"
 
-class DecisionLayer:
-    @staticmethod
-    def select_policy(signals: dict, risk: str, state, mode: str = 'friend', session=None) -> str:
-        """
-        Layer 5: Therapeutic Policy Selection.
-        """
-        intensity = signals.get("intensity", 1)
-        distortion = signals.get("distortion", "none")
-        s_type = signals.get("type", "FEELING")
-        state_str = str(state).split(".")[-1] # Handle Enum output safely
+# Inputs of the policy decision, each reduced to the values the rules tell apart ("other" = anything else)
+DIMENSIONS = {
+    "mode": ("friend", "guide", "normal", "other"),
+    "state": tuple(s.value for s in State) + ("other",),
+    "intent": ("CONCLUDE", "SOLVE", "other"),
+    "intensity": ("<4", "4", "5-7", "8", ">8"),
+    "distortion": ("none", "some"),
+    "risk": ("CRITICAL", "other"),
+    "sticky": ("CBT", "other"),  # Policy of the previous turn
+    "emotion": ("SAD/ANXIOUS", "other"),
+    "type": ("QUESTION", "other"),
+}
+
+def _all_but(dimension: str, *values) -> set:
+    return set(DIMENSIONS[dimension]) - set(values)
+
+HIGH_INTENSITY = {"8", ">8"}
+NOT_MILD = {"4", "5-7", "8"}  # Sticky CBT: below 4 (and no distortion) may exit, above 8 grounds
+
+# Layer 5 rules, first match wins: (name, {dimension: allowed values}, policy, locks help mode).
+# "Locks help mode" keeps the FSM in INTERVENTION until the user concludes or says it helped.
+POLICY_RULES = [
+    # Conclusion mode
+    ("conclude_intent", {"intent": {"CONCLUDE"}}, Policy.CONCLUSION, False),
+    ("conclusion_state", {"state": {"CONCLUSION"}}, Policy.CONCLUSION, False),
+    # Critical safety override (always applies)
+    ("critical_risk", {"risk": {"CRITICAL"}}, Policy.CRISIS, False),
+    # Sticky CBT: stay in it unless panic spikes, or the user is calm with no distortion
+    ("sticky_cbt_panic", {"sticky": {"CBT"}, "intensity": {">8"}}, Policy.GROUNDING, False),
+    ("sticky_cbt_distortion", {"sticky": {"CBT"}, "distortion": {"some"}}, Policy.CBT, True),
+    ("sticky_cbt", {"sticky": {"CBT"}, "intensity": NOT_MILD}, Policy.CBT, True),
+    # Normal mode (standard chatbot)
+    ("normal_mode", {"mode": {"normal"}}, Policy.GENERAL, False),
+    # First aid flow (guide mode only)
+    ("guide_validation", {"mode": {"guide"}, "state": {"VALIDATION"}}, Policy.VALIDATION_FIRST_AID, False),
+    ("guide_choice", {"mode": {"guide"}, "state": {"CHOICE"}}, Policy.CHOICE_OFFER, False),
+    ("guide_reflection", {"mode": {"guide"}, "state": {"REFLECTION"}}, Policy.REFLECTION_CHECK, False),
+    # Continuity: intervention keeps helping
+    ("intervention_distortion", {"state": {"INTERVENTION"}, "distortion": {"some"}}, Policy.CBT, True),
+    ("intervention", {"state": {"INTERVENTION"}}, Policy.GROUNDING, True),
+    # High distress -> grounding (not on check-in; guide's validation/choice already returned above)
+    ("high_distress", {"intensity": HIGH_INTENSITY, "state": _all_but("state", "CHECK_IN")}, Policy.GROUNDING, False),
+    # User asks for a solution
+    ("solve_intent", {"intent": {"SOLVE"}}, Policy.CBT, True),
+    # Friend suggestion mode
+    ("friend_suggest", {"mode": {"friend"}, "emotion": {"SAD/ANXIOUS"}, "intensity": {"5-7", "8", ">8"}},
+     Policy.FRIEND_SUGGEST, True),
+    # Cognitive distortion -> CBT
+    ("distortion", {"distortion": {"some"}}, Policy.CBT, True),
+    # Questions -> psychoeducation
+    ("question", {"type": {"QUESTION"}}, Policy.PSYCHOEDUCATION, False),
+    # Default -> reflexive support
+    ("default", {}, Policy.SUPPORTIVE, False),
+]
 
-        # Step 2: Handle Conclude Intent (Step 3 of Conclusion Mode)
-        if signals.get("intent") == "CONCLUDE" or state_str == "CONCLUSION":
-             return Policy.CONCLUSION.value
+_STATES = set(DIMENSIONS["state"])
 
-        # 1. Critical Safety Override (Always applies)
-        if risk == "CRITICAL":
-            return Policy.CRISIS.value
-            
-        # STICKY POLICY LOGIC
-        # If we have a stored policy in session, prefer it unless major shift
-        current_policy = getattr(session, 'current_policy', None)
-        
-        # Lock CBT/INTERVENTION if already in it, unless panic spikes
-        if current_policy == Policy.CBT.value:
-             if intensity > 8: 
-                 return Policy.GROUNDING.value # Panic override
-             if distortion == "none" and intensity < 4:
-                 pass # Might exit, but usually stay until closure
-             else:
-                 if session: session.locked_help_mode = True
-                 return Policy.CBT.value # STICKY
+def intensity_band(intensity) -> str:
+    if intensity < 4:
+        return "<4"
+    if intensity < 5:
+        return "4"
+    if intensity < 8:
+        return "5-7"
+    if intensity <= 8:
+        return "8"
+    return ">8"
 
-        # --- Normal Mode (Standard Chatbot) ---
-        if mode == 'normal':
-            return Policy.GENERAL.value
+def decision_key(signals: dict, risk: str, state, mode: str = 'friend', current_policy: str = None) -> tuple:
+    """
+    The inputs of a decision as a table key (values in DIMENSIONS order).
+    """
+    state_str = state.value if isinstance(state, State) else str(state).split(".")[-1]
+    intent = signals.get("intent")
+    return (
+        mode if mode in ("friend", "guide", "normal") else "other",
+        state_str if state_str in _STATES else "other",
+        intent if intent in ("CONCLUDE", "SOLVE") else "other",
+        intensity_band(signals.get("intensity", 1)),
+        "none" if signals.get("distortion", "none") == "none" else "some",
+        "CRITICAL" if risk == "CRITICAL" else "other",
+        "CBT" if current_policy == Policy.CBT.value else "other",
+        "SAD/ANXIOUS" if signals.get("emotion") in ("SAD", "ANXIOUS") else "other",
+        "QUESTION" if signals.get("type", "FEELING") == "QUESTION" else "other",
+    )
 
-        # --- First Aid Flow Enforcers (GUIDE MODE ONLY) ---
-        if mode == 'guide':
-            if state_str == "VALIDATION":
-                return Policy.VALIDATION_FIRST_AID.value
-                
-            if state_str == "CHOICE":
-                return Policy.CHOICE_OFFER.value
-                
-            if state_str == "REFLECTION":
-                return Policy.REFLECTION_CHECK.value
+def _compile(rules) -> dict:
+    """
+    Every combination of DIMENSIONS values -> (policy value, locks help mode, rule name).
+    """
+    names = list(DIMENSIONS)
+    conditions = [
+        ([(names.index(dim), allowed) for dim, allowed in when.items()], (policy.value, locks, name))
+        for name, when, policy, locks in rules
+    ]
+    table = {}
+    for key in product(*DIMENSIONS.values()):
+        table[key] = next(
+            outcome for checks, outcome in conditions if all(key[i] in allowed for i, allowed in checks)
+        )
+    return table
 
-        # 1.5 Continuity Check
-        if state_str == "INTERVENTION":
-             if session: session.locked_help_mode = True
-             if distortion != "none":
-                 return Policy.CBT.value
-             return Policy.GROUNDING.value
-            
-        # 2. High Distress -> Grounding
-        # Guide Mode must follow flow (no grounding in Validation/Choice).
-        # Friend Mode can receive immediate grounding.
-        can_ground = True
-        if state_str == "CHECK_IN":
-            can_ground = False
-        if mode == 'guide' and state_str in ["VALIDATION", "CHOICE"]:
-            can_ground = False
-            
-        if intensity >= 8 and can_ground:
-            return Policy.GROUNDING.value
-            
-        # 2.5 Intent: Solve (NEW Fix 3) -> CBT/Action
-        if signals.get("intent") == "SOLVE":
-            if session: session.locked_help_mode = True
-            return Policy.CBT.value # Force to solution-oriented CBT
+DECISION_TABLE = _compile(POLICY_RULES)
 
-        # 2.6 Friend Suggestion Mode (NEW Fix 3)
-        if mode == 'friend' and signals.get("emotion") in ["SAD", "ANXIOUS"] and intensity >= 5:
-            if session: session.locked_help_mode = True
-            return Policy.FRIEND_SUGGEST.value
+class DecisionLayer:
+    @staticmethod
+    def decide(signals: dict, risk: str, state, mode: str = 'friend', current_policy: str = None) -> tuple:
+        """
+        Layer 5: Therapeutic Policy Selection (one DECISION_TABLE lookup).
+        Returns (policy, locks_help_mode, rule name).
+        """
+        return DECISION_TABLE[decision_key(signals, risk, state, mode, current_policy)]
 
-        # 3. Cognitive Distortion -> CBT
-        if distortion != "none":
-            if session: session.locked_help_mode = True
-            return Policy.CBT.value
-            
-        # 4. Questions -> Psychoeducation
-        if s_type == "QUESTION":
-            return Policy.PSYCHOEDUCATION.value
-            
-        # 5. Default -> Reflexive Support (New Default)
-        return Policy.SUPPORTIVE.value
+    @staticmethod
+    def select_policy(signals: dict, risk: str, state, mode: str = 'friend', session=None) -> str:
+        """
+        Policy for this turn; also locks the session's help mode when the rule says so.
+        """
+        policy, locks, _ = DecisionLayer.decide(signals, risk, state, mode, getattr(session, 'current_policy', None))
+        if locks and session:
+            session.locked_help_mode = True
+        return policy
@@ -1,160 +1,251 @@
 import os
-from langchain_groq import ChatGroq
+import textwrap
 from langchain_core.prompts import ChatPromptTemplate
-from django.conf import settings
+from chatbot.core.context_budget import context_budget
+from mental_health_backend.services.llm_registry import get_llm
+
+# --- POST-PROCESSING SAFETY CHECK ---
+# 1. Catch Generic US Refusals (Canned responses)
+US_REFUSAL_TRIGGERS = [
+    "1-800-273-TALK", "National Suicide Prevention Lifeline", "741741", 
+    "cannot provide you with assistance in harming", "I cannot fulfill this request",
+    "abet or mask suicidal thoughts", "crisis hotline", "promotes violence"
+]
+
+# 2. Catch Leaked System Instructions (Model repeating the prompt)
+LEAKAGE_TRIGGERS = [
+    "PROVIDE ONLY these verified", "Do NOT mention US numbers", 
+    "verified 24/7 Indian resources"
+]
+
+SAFETY_TRIGGERS = US_REFUSAL_TRIGGERS + LEAKAGE_TRIGGERS
+
+# While streaming, hold back this many trailing chars so a trigger is always
+# caught before any part of it reaches the user.
+STREAM_HOLDBACK = max(len(t) for t in SAFETY_TRIGGERS) - 1
+
+# Force replace with the clean, user-facing Indian Crisis Message
+SAFE_CRISIS_MESSAGE = """
+It sounds like you're going through a really tough time. I want to help you stay safe. Please reach out to these 24/7 Indian confirmed resources:
+
+- KIRAN: 1800-599-0019
+- Tele-MANAS: 14416
+- Vandrevala Foundation: +91 9999666555
+
+If you are in immediate danger, please call 112.
+""".strip()
+
+GENERATION_ERROR_MESSAGE = "I'm listening, please go on. (Error in generation)"
+
+# System prompt per mode. Everything before the first per-turn slot is fixed for a (mode, policy) pair, so each
+# pair compiles to one template whose prefix is byte-identical on every turn (provider-side prompt caching).
+# {policy} / {policy_instructions} are filled in once when compiling; the {{double-brace}} slots are filled per turn.
+NORMAL_SYSTEM_PROMPT = """You are MAA, a comprehensive mental health assistant.
+
+CORE INSTRUCTIONS:
+1. Persona: Knowledgeable, professional, and supportive.
+2. Goal: Provide accurate information and helpful guidance.
+3. Flexibility: You are not restricted to short responses, but keep it readable.
+4. Safety: If risk is detected, provide crisis resources immediately.
+
+SELECTED POLICY: {policy}
+POLICY INSTRUCTIONS ({policy}):
+{policy_instructions}
+
+CURRENT STATE: {{state}}
+
+RAG CONTEXT (If any):
+{{rag_context}}
+
+RECENT CONVERSATION HISTORY:
+{{history}}"""
+
+FRIEND_PERSONA = """You are a warm, real human friend.
+
+MANDATORY FRIEND RULES:
+1. React naturally (surprise, empathy, humor, reassurance).
+2. Use casual words ("hey", "listen", "damn", "I get you").
+3. NO therapy language (Avoid: "safe space", "exploring", "process").
+4. You are allowed to give advice and share opinions like a real friend."""
+
+GUIDE_PERSONA = """You are a calm, skilled CBT guide.
+
+MANDATORY GUIDE RULES:
+1. Structured and directional.
+2. After understanding the issue, teach ONE technique.
+3. Always move toward action and progress."""
+
+# FRIEND/GUIDE Mode: Highly constrained, therapeutic persona
+PERSONA_SYSTEM_PROMPT = """{persona}
+
+GLOBAL LAWS:
+1. Length: Adaptive. Be concise but helpful.
+2. Internal Reasoning: You MAY reason internally to understand the user's intent.
+3. Do NOT expose internal reasoning (like 'CURRENT STATE' or 'POLICY') in the final message.
+4. NEGATIVE CONSTRAINTS: NO meta-language like "acknowledging your readiness", "let's examine", "before we proceed". Just talk.
+
+POLICY INSTRUCTIONS ({policy}):
+{policy_instructions}
+
+{{memory}}
+
+QUESTION RULE: {{question_rule}}
+
+RAG CONTEXT (If any):
+{{rag_context}}
+
+RECENT CONVERSATION HISTORY:
+{{history}}"""
+
+NO_QUESTION_RULE = "MANDATORY: Do NOT ask any questions in this response. Just react and provide feedback."
+ONE_QUESTION_RULE = "You may ask ONE helpful question if it moves the conversation forward."
+
+def _literal(text: str) -> str:
+    # Static text spliced into a template must not be read as slots
+    return text.replace("{", "{{").replace("}", "}}")
 
 class GenerationLayer:
     def __init__(self):
+        # (mode, policy) -> (prompt | llm, tokens of the fixed instructions), compiled on first use.
+        # One value, so a concurrent request never sees a chain without its token count
+        self._chains = {}
+
+    @property
+    def llm(self):
+        # Shared registry client, created on first use, so building the orchestrator at import is cheap.
         # Using a slightly higher temp for conversational warmth, 
         # but constrained by the strict prompt.
-        self.llm = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model_name=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
-            temperature=0.6
-        )
+        return get_llm(os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"), temperature=0.6)
 
     def generate(self, text: str, state: str, policy: str, signals: dict, rag_context: str, mode: str = 'friend', session=None, history=None) -> str:
         """
         Layer 7: Controlled Response Generation (Intelligence Revamp).
         """
-        
-        # 1. Select the correct System Instruction based on Policy
-        policy_instructions = self._get_policy_instruction(policy)
-        
-        # 2. Extract Meaning Context (from Session)
+        try:
+            chain, inputs = self._build_chain(state, policy, rag_context, mode, session, history, text)
+            response = chain.invoke({**inputs, "text": text})
+            content = response.content
+
+            if self._violates_safety(content):
+                return SAFE_CRISIS_MESSAGE
+
+            return content
+        except Exception:
+            return GENERATION_ERROR_MESSAGE
+
+    def stream(self, text: str, state: str, policy: str, signals: dict, rag_context: str, mode: str = 'friend', session=None, history=None):
+        """
+        Layer 7 (Streaming): Same prompt as generate(), yielded as it is produced.
+        Yields ("token", text) events, or a single ("replace", text) event that supersedes
+        everything sent so far (safety trigger hit or generation error).
+        """
+        content = ""
+        emitted = 0
+        try:
+            chain, inputs = self._build_chain(state, policy, rag_context, mode, session, history, text)
+            for chunk in chain.stream({**inputs, "text": text}):
+                scan_from = max(0, len(content) - STREAM_HOLDBACK)
+                content += chunk.content
+
+                # Incremental safety scan: only the newly completed tail can contain a new trigger
+                if self._violates_safety(content[scan_from:]):
+                    yield ("replace", SAFE_CRISIS_MESSAGE)
+                    return
+
+                safe_upto = len(content) - STREAM_HOLDBACK
+                if safe_upto > emitted:
+                    yield ("token", content[emitted:safe_upto])
+                    emitted = safe_upto
+
+            if len(content) > emitted:
+                yield ("token", content[emitted:])
+        except Exception as e:
+            print(f"❌ Streaming generation error: {e}")
+            yield ("replace", GENERATION_ERROR_MESSAGE)
+
+    @staticmethod
+    def _violates_safety(content: str) -> bool:
+        return any(trigger in content for trigger in SAFETY_TRIGGERS)
+
+    def _build_chain(self, state: str, policy: str, rag_context: str, mode: str = 'friend', session=None, history=None, text: str = ""):
+        """
+        The cached prompt | llm chain for (mode, policy), and this turn's values for its slots,
+        fitted to the context token budget. The prompt's token counts go to session.prompt_tokens.
+        """
+        mode = mode if mode in ("normal", "friend") else "guide"
+        key = (mode, policy)
+        compiled = self._chains.get(key)
+        if compiled is None:
+            chain = self.prompt_template(mode, policy) | self.llm
+            static_tokens = context_budget.counter.count(chain.first.messages[0].prompt.template)
+            compiled = self._chains.setdefault(key, (chain, static_tokens))
+        chain, static_tokens = compiled
+
+        # 1. Extract Meaning Context (from Session)
         context_str = ""
-        if session and hasattr(session, 'core_context'):
+        if session and hasattr(session, 'core_context') and mode != 'normal':
              ctx = session.core_context
              context_str = f"USER CONTEXT [MEMORY]: Story='{ctx.get('story')}', Trigger='{ctx.get('trigger_event')}', Fear='{ctx.get('core_fear')}', Mood='{ctx.get('primary_emotion')}'"
-        
+
+        # 2. Fit memory, RAG and history into the token budget (oldest messages go first)
+        context_str, rag_context, history, usage = context_budget.fit(context_str, rag_context or "", history or [])
+
         # 3. Construct the History String
         history_str = ""
         if history:
             history_str = "\n".join([f"{m['role'].upper()}: {m['content']}" for m in history])
+        if usage["history_dropped"]:
+            omitted = f"({usage['history_dropped']} earlier messages omitted)"
+            history_str = f"{omitted}\n{history_str}"
+            usage["history"] += context_budget.counter.count(omitted)
 
-        # 4. Construct the PROMPT
+        inputs = {
+            "rag_context": rag_context if rag_context else "None available.",
+            "history": history_str if history_str else "No previous history.",
+        }
         if mode == 'normal':
-             # Less constrained, more general assistant prompt
-             system_msg = f"""
-             You are MAA, a comprehensive mental health assistant.
-             
-             CURRENT STATE: {state}
-             SELECTED POLICY: {policy}
-             
-             CORE INSTRUCTIONS:
-             1. Persona: Knowledgeable, professional, and supportive.
-             2. Goal: Provide accurate information and helpful guidance.
-             3. Flexibility: You are not restricted to short responses, but keep it readable.
-             4. Safety: If risk is detected, provide crisis resources immediately.
-             
-             POLICY INSTRUCTIONS ({policy}):
-             {policy_instructions}
-             
-             RAG CONTEXT (If any):
-             {rag_context if rag_context else "None available."}
-
-             RECENT CONVERSATION HISTORY:
-             {history_str if history_str else "No previous history."}
-             """
+            inputs["state"] = state
         else:
-            # FRIEND/GUIDE Mode: Highly constrained, therapeutic persona
-            persona_prompt = ""
-            
-            # Question Cooldown Logic (Fix for friend/guide)
-            allow_question = True
-            if session and hasattr(session, 'friend_question_cooldown'):
-                if session.friend_question_cooldown > 0:
-                    allow_question = False
-                    session.friend_question_cooldown -= 1
-                else:
-                    allow_question = True
-                    session.friend_question_cooldown = 2 # Ask every 3rd turn
-            
-            question_rule = "MANDATORY: Do NOT ask any questions in this response. Just react and provide feedback." if not allow_question else "You may ask ONE helpful question if it moves the conversation forward."
-
-            if mode == 'friend':
-                persona_prompt = f"""
-                You are a warm, real human friend. 
-                
-                MANDATORY FRIEND RULES:
-                1. React naturally (surprise, empathy, humor, reassurance).
-                2. Use casual words ("hey", "listen", "damn", "I get you").
-                3. NO therapy language (Avoid: "safe space", "exploring", "process").
-                4. You are allowed to give advice and share opinions like a real friend.
-                5. {question_rule}
-                """
-            else: # guide
-                 persona_prompt = f"""
-                 You are a calm, skilled CBT guide.
-                 
-                 MANDATORY GUIDE RULES:
-                 1. Structured and directional.
-                 2. After understanding the issue, teach ONE technique.
-                 3. Always move toward action and progress.
-                 4. {question_rule}
-                 """
-
-            system_msg = f"""
-            {persona_prompt}
-            
-            {context_str}
-            
-            GLOBAL LAWS:
-            1. Length: Adaptive. Be concise but helpful.
-            2. Internal Reasoning: You MAY reason internally to understand the user's intent.
-            3. Do NOT expose internal reasoning (like 'CURRENT STATE' or 'POLICY') in the final message. 
-            4. NEGATIVE CONSTRAINTS: NO meta-language like "acknowledging your readiness", "let's examine", "before we proceed". Just talk.
-            
-            POLICY INSTRUCTIONS ({policy}):
-            {policy_instructions}
-            
-            RAG CONTEXT (If any):
-            {rag_context if rag_context else "None available."}
-
-            RECENT CONVERSATION HISTORY:
-            {history_str if history_str else "No previous history."}
-            """
-        
-        prompt = ChatPromptTemplate.from_messages([
+            inputs["memory"] = context_str
+            inputs["question_rule"] = self._question_rule(session)
+
+        usage["system"] = static_tokens
+        usage["user"] = context_budget.counter.count(text)
+        usage["total"] = usage["system"] + usage["memory"] + usage["rag"] + usage["history"] + usage["user"]
+        context_budget.record(usage)
+        if session is not None:
+            session.prompt_tokens = usage
+        return chain, inputs
+
+    def prompt_template(self, mode: str, policy: str) -> ChatPromptTemplate:
+        """
+        The compiled template for (mode, policy): static instructions baked in, per-turn values as slots.
+        """
+        policy_instructions = _literal(textwrap.dedent(self._get_policy_instruction(policy)).strip())
+        if mode == 'normal':
+            system_msg = NORMAL_SYSTEM_PROMPT.format(policy=_literal(policy), policy_instructions=policy_instructions)
+        else:
+            persona = FRIEND_PERSONA if mode == 'friend' else GUIDE_PERSONA
+            system_msg = PERSONA_SYSTEM_PROMPT.format(
+                persona=_literal(persona), policy=_literal(policy), policy_instructions=policy_instructions
+            )
+        return ChatPromptTemplate.from_messages([
             ("system", system_msg),
             ("human", "{text}")
         ])
-        
-        # 3. Render
-        chain = prompt | self.llm
-        try:
-            response = chain.invoke({"text": text})
-            content = response.content
-
-            # --- POST-PROCESSING SAFETY CHECK ---
-            # 1. Catch Generic US Refusals (Canned responses)
-            us_refusal_triggers = [
-                "1-800-273-TALK", "National Suicide Prevention Lifeline", "741741", 
-                "cannot provide you with assistance in harming", "I cannot fulfill this request",
-                "abet or mask suicidal thoughts", "crisis hotline", "promotes violence"
-            ]
-            
-            # 2. Catch Leaked System Instructions (Model repeating the prompt)
-            leakage_triggers = [
-                "PROVIDE ONLY these verified", "Do NOT mention US numbers", 
-                "verified 24/7 Indian resources"
-            ]
-
-            if any(trigger in content for trigger in us_refusal_triggers + leakage_triggers):
-                # Force replace with the clean, user-facing Indian Crisis Message
-                return """
-It sounds like you're going through a really tough time. I want to help you stay safe. Please reach out to these 24/7 Indian confirmed resources:
 
-- KIRAN: 1800-599-0019
-- Tele-MANAS: 14416
-- Vandrevala Foundation: +91 9999666555
-
-If you are in immediate danger, please call 112.
-""".strip()
-
-            return content
-        except Exception as e:
-            return "I'm listening, please go on. (Error in generation)"
+    @staticmethod
+    def _question_rule(session) -> str:
+        # Question Cooldown Logic (Fix for friend/guide)
+        allow_question = True
+        if session and hasattr(session, 'friend_question_cooldown'):
+            if session.friend_question_cooldown > 0:
+                allow_question = False
+                session.friend_question_cooldown -= 1
+            else:
+                allow_question = True
+                session.friend_question_cooldown = 2 # Ask every 3rd turn
+        return ONE_QUESTION_RULE if allow_question else NO_QUESTION_RULE
 
     def _get_policy_instruction(self, policy: str) -> str:
         if policy == "CRISIS":
@@ -0,0 +1,103 @@
+import re
+
+# Endings a keyword also matches with ("kill" -> "kills", "killed", "killing", "killer", "harm" -> "harmful"),
+# so whole-word matching keeps the forms the old substring checks caught, without matching inside other words ("skill")
+INFLECTIONS = ("s", "es", "d", "ed", "ing", "ness", "er", "ful")
+VOWELS = "aeiou"
+
+def inflections(word: str) -> set:
+    """
+    The inflected forms of word: INFLECTIONS appended as is, plus the spelling changes in front of them
+    ("stab" -> "stabbed", "panic" -> "panicking", "worry" -> "worried", "hate" -> "hating", "hate" -> "hater",
+    "die" -> "dying").
+    Irregular forms ("failure") are listed in the lexicon instead.
+    """
+    forms = {word + ending for ending in INFLECTIONS}
+    if word.endswith("c"):
+        forms |= {word + "k" + ending for ending in ("ed", "ing")}
+    elif (len(word) >= 3 and sum(char in VOWELS for char in word) == 1 and word[-2] in VOWELS
+          and word[-1] not in VOWELS + "wxy" and word[-3] not in VOWELS):
+        # One-syllable words ending consonant-vowel-consonant double the consonant
+        forms |= {word + word[-1] + ending for ending in ("ed", "ing", "er")}
+    elif len(word) >= 2 and word[-1] == "y" and word[-2] not in VOWELS:
+        forms |= {word[:-1] + ending for ending in ("ied", "ies", "iness", "ier", "iful")}
+    elif word.endswith("ie"):
+        forms.add(word[:-2] + "ying")
+    elif word.endswith("e"):
+        forms |= {word[:-1] + "ing", word + "r"}
+    return forms
+
+class KeywordMatcher:
+    """
+    All keyword lists of a lexicon ({category: [phrase, ...]}) compiled into one regex,
+    so a single pass over the text finds every category hit.
+    Phrases match as whole words ("end" doesn't fire on "friend"), case-insensitively.
+    The regex is the character trie of every phrase and inflected form, so each position costs one walk
+    down the trie instead of one attempt per phrase.
+    """
+
+    def __init__(self, lexicon: dict):
+        self.categories = {}  # phrase -> categories it counts for
+        for category, phrases in lexicon.items():
+            for phrase in phrases:
+                phrase = " ".join(phrase.lower().split())
+                if phrase:
+                    self.categories.setdefault(phrase, set()).add(category)
+
+        # Matched text -> phrase, for every inflected form (exact phrases win over inflections).
+        # Only phrases ending in a letter are inflected ("can't" and "self-harm" stay as is)
+        self._forms = {}
+        for phrase in sorted(self.categories, key=len, reverse=True):
+            if phrase[-1].isalpha():
+                head, _, word = phrase.rpartition(" ")
+                for form in inflections(word):
+                    self._forms.setdefault(f"{head} {form}" if head else form, phrase)
+        self._forms.update({phrase: phrase for phrase in self.categories})
+
+        # The trie walk is greedy, so a shorter form at the same position is shadowed by the longer one
+        # ("kill" by "kill myself", "ending" by "ending it all"); the longer one also carries its categories
+        for form, phrase in self._forms.items():
+            for i, char in enumerate(form):
+                if char == " " and form[:i] in self._forms:
+                    self.categories[phrase] |= self.categories[self._forms[form[:i]]]
+
+        # Lookahead, so overlapping phrases that start at different positions are all found
+        self._regex = None
+        if self.categories:
+            self._regex = re.compile(rf"\b(?=({self._trie_pattern(self._trie())})(?!\w))")
+
+    def _trie(self) -> dict:
+        root = {}
+        for form in self._forms:
+            node = root
+            for char in form:
+                node = node.setdefault(char, {})
+            node[""] = form
+        return root
+
+    @classmethod
+    def _trie_pattern(cls, node: dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + cls._trie_pattern(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if "" in node:
+            # Longer forms first, then this one (greedy: longest match at each position)
+            return "(?:" + "|".join(branches) + ")?" if branches else ""
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    def scan(self, text: str) -> dict:
+        """
+        {category: [(start, phrase), ...]} for every phrase found in text, in text order.
+        """
+        hits = {}
+        if not self._regex or not text:
+            return hits
+        for match in self._regex.finditer(text.lower()):
+            matched = match.group(1)
+            phrase = self._forms.get(matched) or self._forms.get(" ".join(matched.split()))
+            if phrase is None:
+                continue
+            for category in self.categories[phrase]:
+                hits.setdefault(category, []).append((match.start(), phrase))
+        return hits
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from django.conf import settings
+from chatbot.core.keyword_matcher import KeywordMatcher
+
+# Keyword tables for signal extraction, crisis detection and FSM unlock (versioned JSON).
+# Edits to the file are picked up by running workers within RELOAD_SECONDS, no restart needed.
+LEXICON_PATH = getattr(settings, 'CHAT_LEXICON_PATH', None) or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lexicon.json"
+)
+LEXICON_RELOAD_SECONDS = getattr(settings, 'CHAT_LEXICON_RELOAD_SECONDS', 5.0)
+# A lexicon without these is rejected (a typo must never switch crisis detection off)
+REQUIRED_CATEGORIES = ("crisis",)
+
+def load_lexicon(path: str) -> dict:
+    """
+    Reads and validates a lexicon file: {"version": str, "categories": {name: [phrase, ...]}}.
+    Raises ValueError if it is malformed.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}")
+
+    version = data.get("version") if isinstance(data, dict) else None
+    categories = data.get("categories") if isinstance(data, dict) else None
+    if not version or not isinstance(version, str):
+        raise ValueError(f"{path}: missing \"version\" string")
+    if not isinstance(categories, dict):
+        raise ValueError(f"{path}: missing \"categories\" object")
+    for name, phrases in categories.items():
+        if not isinstance(phrases, list) or not all(isinstance(p, str) and p.strip() for p in phrases):
+            raise ValueError(f"{path}: category \"{name}\" must be a list of non-empty strings")
+    missing = [name for name in REQUIRED_CATEGORIES if not categories.get(name)]
+    if missing:
+        raise ValueError(f"{path}: required categories missing or empty: {', '.join(missing)}")
+
+    return {
+        "version": version,
+        "checksum": hashlib.sha256(raw).hexdigest()[:12],
+        "categories": categories,
+    }
+
+class Lexicon:
+    """
+    The active lexicon file compiled into a KeywordMatcher, recompiled when the file changes.
+    The file's mtime is checked at most every reload_seconds; a changed file that fails validation
+    is reported and the previous version stays active.
+    """
+
+    def __init__(self, path: str = LEXICON_PATH, reload_seconds: float = LEXICON_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._active = None  # (loaded lexicon dict, matcher, file mtime)
+        self._next_check = 0.0
+
+        self.loaded_at = None
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error = None
+
+    def _current(self):
+        now = time.monotonic()
+        if self._active is None or now >= self._next_check:
+            with self._lock:
+                if self._active is None or now >= self._next_check:
+                    self._next_check = now + self.reload_seconds
+                    self._refresh()
+        return self._active
+
+    def _refresh(self):
+        mtime = None
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if self._active is not None and mtime == self._active[2]:
+                return
+            loaded = load_lexicon(self.path)
+        except (OSError, ValueError) as e:
+            if self._active is None:
+                # Nothing to fall back to: signal extraction can't run without a lexicon
+                raise
+            self.reload_errors += 1
+            self.last_error = str(e)
+            if mtime is not None:
+                # Don't re-read the same broken file on every check
+                self._active = (self._active[0], self._active[1], mtime)
+            print(f"⚠️ Lexicon reload failed, keeping version {self._active[0]['version']}: {e}")
+            return
+
+        if self._active is not None and loaded["checksum"] == self._active[0]["checksum"]:
+            # Touched but unchanged: keep the compiled matcher
+            self._active = (self._active[0], self._active[1], mtime)
+            return
+
+        matcher = KeywordMatcher(loaded["categories"])
+        previous = self._active[0]["version"] if self._active else None
+        self._active = (loaded, matcher, mtime)
+        self.loaded_at = time.time()
+        self.last_error = None
+        if previous is not None:
+            self.reloads += 1
+            print(f"✅ Lexicon reloaded: {previous} → {loaded['version']} ({loaded['checksum']})")
+
+    @property
+    def version(self) -> str:
+        return self._current()[0]["version"]
+
+    def scan(self, text: str) -> dict:
+        """
+        {category: [(start, phrase), ...]} from the active lexicon (see KeywordMatcher.scan).
+        """
+        return self._current()[1].scan(text)
+
+    def phrases(self, category: str) -> set:
+        """
+        The active lexicon's phrases for category, normalized the way scan() reports them.
+        """
+        return {" ".join(p.lower().split()) for p in self._current()[0]["categories"].get(category, [])}
+
+    def status(self) -> dict:
+        loaded = self._current()[0]
+        return {
+            "version": loaded["version"],
+            "checksum": loaded["checksum"],
+            "path": self.path,
+            "loaded_at": self.loaded_at,
+            "categories": {name: len(phrases) for name, phrases in loaded["categories"].items()},
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "last_error": self.last_error,
+        }
+
+lexicon = Lexicon()
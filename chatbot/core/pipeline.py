@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from django.conf import settings
+from django.db import connections
+
+# Shared by all requests in this worker. Stages are short I/O waits (DB, Groq, SMTP),
+# so a handful of threads per concurrent chat turn is plenty.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'CHAT_PIPELINE_WORKERS', 16),
+    thread_name_prefix="maa-stage"
+)
+
+class StageGraph:
+    """
+    Runs named stages concurrently on the shared pool.
+    A stage starts once the stages it depends on have finished, and receives their results as kwargs;
+    that wait happens on a separate short-lived thread, so blocked stages never hold pool threads.
+    A stage's timeout counts from add(), so it bounds the turn's latency however late result() is called.
+    Every stage records its wall time in `timings` (seconds, or "timeout"/"error").
+    """
+    def __init__(self):
+        self._futures = {}
+        self._defaults = {}
+        self._timeouts = {}
+        self._deadlines = {}
+        self.timings = {}
+
+    def add(self, name: str, fn, deps=(), timeout: float = None, default=None):
+        dep_futures = {dep: self._futures[dep] for dep in deps}
+
+        def run(**kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(**kwargs)
+                # setdefault: a stage that already timed out stays reported as "timeout"
+                self.timings.setdefault(name, round(time.perf_counter() - start, 3))
+                return result
+            except Exception as e:
+                print(f"❌ Stage '{name}' failed: {e}")
+                self.timings.setdefault(name, "error")
+                return default
+            finally:
+                # Pool threads are reused; don't leave their DB connections open between turns
+                connections.close_all()
+
+        self._defaults[name] = default
+        self._timeouts[name] = timeout
+        self._deadlines[name] = time.monotonic() + timeout if timeout is not None else None
+        if dep_futures:
+            self._futures[name] = self._after(dep_futures, run)
+        else:
+            self._futures[name] = _executor.submit(run)
+        return self
+
+    def _after(self, dep_futures: dict, run) -> Future:
+        # Wait for dependencies (each bounded by its own deadline, falling back to its default),
+        # then submit the stage to the pool
+        future = Future()
+
+        def start():
+            kwargs = {dep: self._wait(dep, dep_future) for dep, dep_future in dep_futures.items()}
+            _executor.submit(run, **kwargs).add_done_callback(lambda done: future.set_result(done.result()))
+
+        threading.Thread(target=start, name="maa-stage-deps", daemon=True).start()
+        return future
+
+    def result(self, name: str):
+        """
+        Blocks until the stage finishes or its deadline (add() time + timeout) passes.
+        A stage that times out keeps running in the background; its default is returned now.
+        """
+        return self._wait(name, self._futures[name])
+
+    def _wait(self, name, future):
+        deadline = self._deadlines[name]
+        try:
+            return future.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            self.timings.setdefault(name, "timeout")
+            print(f"⏱️ Stage '{name}' exceeded {self._timeouts[name]}s, continuing without it")
+            return self._defaults[name]
+        except Exception:
+            return self._defaults[name]
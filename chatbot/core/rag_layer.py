@@ -1,8 +1,50 @@
-from chatbot.doc_engine import query_documents
+import re
+import threading
+from django.conf import settings
+from chatbot import doc_engine
+from chatbot.doc_engine import query_documents, retrieve_chunks
+from chatbot.core.cache import TTLCache
+
+# "retrieve": top-k raw chunks go straight into the generation prompt (one LLM call per turn).
+# "synthesize": legacy path, llama-index answers first and that answer is injected (two LLM calls).
+RAG_MODE = getattr(settings, 'RAG_MODE', 'retrieve')
+RAG_TOP_K = getattr(settings, 'RAG_TOP_K', 3)
+
+# Partition searched for each policy: data/ files by file_name, DB records (chatbot/rag_sources.py) by model.
+# Policies not listed search the whole corpus.
+POLICY_SOURCES = {
+    "CBT": {"file_name": ["cbt_master_guide.txt"], "model": ["auth_api.CopingMethod"]},
+    "GROUNDING": {"file_name": ["grounding_techniques.txt", "coping_strategies.txt"], "model": ["auth_api.CopingMethod"]},
+    "PSYCHOEDUCATION": {"file_name": ["psychoeducation.txt", "stress_management.txt"],
+                        "model": ["auth_api.Disorder", "auth_api.Article", "auth_api.RoadmapStep"]},
+    "REFLECTION_CHECK": {"file_name": ["reflection_journal.txt"]},
+    "FRIEND_SUGGEST": {"file_name": ["coping_strategies.txt", "stress_management.txt", "grounding_techniques.txt"],
+                       "model": ["auth_api.CopingMethod"]},
+}
+RAG_POLICY_SCOPED = getattr(settings, 'RAG_POLICY_SCOPED', True)
+# Below this best-chunk similarity the partition is judged a poor match and the whole corpus is searched
+RAG_PARTITION_MIN_SCORE = getattr(settings, 'RAG_PARTITION_MIN_SCORE', 0.3)
+# If embedding a new query currently takes longer than this (ms), retrieve lexically (BM25) instead
+RAG_DENSE_BUDGET_MS = getattr(settings, 'RAG_DENSE_BUDGET_MS', 200)
+
+# (mode, policy, normalized query, index version) -> injected context.
+# Users repeat short phrases ("I'm anxious", "I can't sleep") and policies are a small fixed set.
+retrieval_cache = TTLCache(
+    max_size=getattr(settings, 'RAG_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'RAG_CACHE_TTL', 600),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """
+    Case, spacing and trailing punctuation don't change what we retrieve.
+    """
+    return _WHITESPACE.sub(" ", query.lower()).strip(" .!?,;:")
 
 class RAGLayer:
     @staticmethod
-    def retrieve(policy: str, query: str) -> str:
+    def retrieve(policy: str, query: str, mode: str = None) -> str:
         """
         Layer 6: RAG Knowledge Injection.
         Fetches context ONLY if Policy requires it.
@@ -10,15 +52,99 @@ class RAGLayer:
         # Rules:
         # - Supportive/Validation/Crisis: NO RAG (rely on empathy/safety protocols).
         # - CBT/Grounding/Psychoeducation: YES RAG (fetch technique).
-        
+
         if policy in ["CRISIS"]:
             return "" # No context needed for immediate crisis protocols
-            
+
         # For CBT/Grounding/Psychoed, we fetch relevant info
         # We append the policy to the query to guide the retrieval (heuristic)
         # e.g. "CBT technique for self-blame"
-        enhanced_query = f"{policy} advice for: {query}"
-        
+        # First RAG turn in this worker sets up the doc engine (index load, embedder)
+        doc_engine.ensure_ready()
+
+        mode = mode or RAG_MODE
+        normalized = normalize_query(query)
+        enhanced_query = f"{policy} advice for: {normalized}"
+
+        # A re-index bumps index_version, so stale entries are simply never looked up again
+        cache_key = (mode, policy, normalized, doc_engine.index_version)
+        context = retrieval_cache.get(cache_key)
+        if context is not None:
+            return context
+
+        degraded = False
+        if mode == "synthesize":
+            context = RAGLayer._synthesize(enhanced_query)
+        else:
+            chunks = RAGLayer._retrieve_scoped(policy, enhanced_query)
+            context = RAGLayer.format_chunks(chunks)
+            # Lexical fast path taken under load: fine for this turn, but don't pin it for the TTL
+            degraded = doc_engine.RETRIEVAL_MODE != "lexical" and all(c["dense_score"] is None for c in chunks)
+
+        # Don't pin failures (engine not ready, errors) for the TTL either
+        if context and not degraded:
+            retrieval_cache.set(cache_key, context)
+        return context
+
+    # How often the policy partition was good enough vs fell back to the global search
+    partition_stats = {"scoped": 0, "fallback": 0}
+    # Retrieval runs on StageGraph worker threads
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def _retrieve_scoped(policy: str, enhanced_query: str) -> list:
+        sources = POLICY_SOURCES.get(policy) if RAG_POLICY_SCOPED else None
+        if not sources:
+            return retrieve_chunks(enhanced_query, top_k=RAG_TOP_K, budget_ms=RAG_DENSE_BUDGET_MS)
+
+        chunks = retrieve_chunks(enhanced_query, top_k=RAG_TOP_K, sources=sources, budget_ms=RAG_DENSE_BUDGET_MS)
+        if RAGLayer._good_match(chunks):
+            RAGLayer._count_partition("scoped")
+            return chunks
+
+        # Poor partition match: search everything (the query embedding is cached, so this is just the scan)
+        RAGLayer._count_partition("fallback")
+        return retrieve_chunks(enhanced_query, top_k=RAG_TOP_K, budget_ms=RAG_DENSE_BUDGET_MS)
+
+    @staticmethod
+    def _count_partition(outcome: str):
+        with RAGLayer._stats_lock:
+            RAGLayer.partition_stats[outcome] += 1
+
+    @staticmethod
+    def _good_match(chunks: list) -> bool:
+        # Judged on cosine similarity (fused RRF scores aren't comparable across queries).
+        # Lexical-only results are a match by construction: they share terms with the query.
+        if not chunks:
+            return False
+        dense = [c["dense_score"] for c in chunks if c["dense_score"] is not None]
+        return not dense or max(dense) >= RAG_PARTITION_MIN_SCORE
+
+    @staticmethod
+    def stats() -> dict:
+        with RAGLayer._stats_lock:
+            partitions = dict(RAGLayer.partition_stats)
+        return {
+            "index_version": doc_engine.index_version,
+            "retrieval": retrieval_cache.stats(),
+            "query_embedding": doc_engine.embedding_cache.stats(),
+            "partitions": partitions,
+            "engine": doc_engine.status(),
+        }
+
+    @staticmethod
+    def format_chunks(chunks: list) -> str:
+        """
+        Renders retrieved chunks as numbered excerpts for the generation prompt.
+        """
+        excerpts = [
+            f"[{i}] (from {c['source']})\n{c['text']}"
+            for i, c in enumerate(chunks, 1) if c.get("text")
+        ]
+        return "\n\n".join(excerpts)
+
+    @staticmethod
+    def _synthesize(enhanced_query: str) -> str:
         try:
             context = query_documents(enhanced_query)
             # Filter error messages or "Empty Response"
@@ -0,0 +1,156 @@
+from django.conf import settings
+
+# Where SessionFSM state lives between turns (chatbot/core/session_manager.py):
+# "db" (SessionState table, shared by all workers), "cache" (Django cache, e.g. Redis) or "local" (this process only)
+SESSION_BACKEND = getattr(settings, 'CHAT_SESSION_BACKEND', 'db')
+# Cache backend entry lifetime (seconds)
+SESSION_STATE_TTL = getattr(settings, 'CHAT_SESSION_STATE_TTL', 7 * 24 * 3600)
+
+class DBSessionBackend:
+    """
+    SessionState rows. Saves are compare-and-swap on version (a single conditional UPDATE),
+    so two workers finishing turns of the same session can't silently overwrite each other.
+    """
+
+    def load(self, session_id: str):
+        """
+        (data, version), or None if the session was never saved.
+        """
+        from chatbot.models import SessionState
+        row = SessionState.objects.filter(session_id=session_id).values_list("data", "version").first()
+        return (row[0], row[1]) if row else None
+
+    def version(self, session_id: str):
+        from chatbot.models import SessionState
+        return SessionState.objects.filter(session_id=session_id).values_list("version", flat=True).first()
+
+    def save(self, session_id: str, data: dict, expected_version: int):
+        """
+        Stores data if the stored version is still expected_version.
+        Returns the new version, or None on a version conflict.
+        """
+        from django.db import IntegrityError, transaction
+        from django.utils import timezone
+        from chatbot.models import SessionState
+
+        if expected_version == 0:
+            try:
+                with transaction.atomic():
+                    SessionState.objects.create(session_id=session_id, data=data, version=1)
+                return 1
+            except IntegrityError:
+                return None  # Another worker created it first
+
+        updated = SessionState.objects.filter(session_id=session_id, version=expected_version).update(
+            data=data, version=expected_version + 1, updated_at=timezone.now()
+        )
+        return expected_version + 1 if updated else None
+
+    def delete(self, session_id: str):
+        from chatbot.models import SessionState
+        SessionState.objects.filter(session_id=session_id).delete()
+
+class CacheSessionBackend:
+    """
+    Django cache framework entries {"v": version, "d": data}. Needs a shared cache (Redis/Memcached)
+    in CACHES to be visible across workers. The version check and the write are two cache calls,
+    so a conflict can slip through in a narrow window; use "db" where that matters.
+    """
+
+    def __init__(self, timeout: float = SESSION_STATE_TTL):
+        self.timeout = timeout
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"chat_fsm:{session_id}"
+
+    def load(self, session_id: str):
+        from django.core.cache import cache
+        entry = cache.get(self._key(session_id))
+        return (entry["d"], entry["v"]) if entry else None
+
+    def version(self, session_id: str):
+        loaded = self.load(session_id)
+        return loaded[1] if loaded else None
+
+    def save(self, session_id: str, data: dict, expected_version: int):
+        from django.core.cache import cache
+        key = self._key(session_id)
+        if expected_version == 0:
+            return 1 if cache.add(key, {"v": 1, "d": data}, self.timeout) else None
+
+        entry = cache.get(key)
+        if not entry or entry["v"] != expected_version:
+            return None
+        cache.set(key, {"v": expected_version + 1, "d": data}, self.timeout)
+        return expected_version + 1
+
+    def delete(self, session_id: str):
+        from django.core.cache import cache
+        cache.delete(self._key(session_id))
+
+def make_backend(name: str = SESSION_BACKEND):
+    """
+    Backend instance for a CHAT_SESSION_BACKEND name; None means in-process only.
+    """
+    if name == "db":
+        return DBSessionBackend()
+    if name == "cache":
+        return CacheSessionBackend()
+    if name == "local":
+        return None
+    raise ValueError(f"Unknown CHAT_SESSION_BACKEND '{name}' (use db, cache or local)")
+
+def merge_state(base: dict, ours: dict, theirs: dict) -> dict:
+    """
+    Three-way merge of SessionFSM.to_dict() snapshots after a version conflict.
+    base: what this turn loaded, ours: what it wants to save, theirs: what another turn saved meanwhile.
+    Fields this turn changed win; event counts add up, and the events it recorded go after theirs.
+    pending_messages is a queue (summaries drop from the head, turns append): both sides' drops apply,
+    and their new messages go after theirs, so messages saved by either worker are kept.
+    """
+    base = base or {}
+    merged = dict(theirs)
+    base_counts = base.get("event_counts", {})
+    our_counts = ours.get("event_counts", {})
+    recorded = sum(our_counts.values()) - sum(base_counts.values())
+    for key, value in ours.items():
+        if key == "event_counts":
+            merged[key] = dict(theirs.get(key, {}))
+            for event, count in value.items():
+                merged[key][event] = merged[key].get(event, 0) + count - base_counts.get(event, 0)
+        elif key == "history":
+            # A bounded window (the FSM trims it back to HISTORY_WINDOW on load)
+            new_events = list(value[max(len(value) - recorded, 0):]) if recorded > 0 else []
+            merged[key] = list(theirs.get(key, [])) + new_events
+        elif key == "pending_messages":
+            merged[key] = merge_queue(base.get(key, []), value, theirs.get(key, []))
+            merged["turns_since_summary"] = len(merged[key])
+        elif key == "turns_since_summary":
+            continue  # Follows the merged pending_messages
+        elif key == "core_context":
+            base_context = base.get(key, {})
+            changed = {k: v for k, v in value.items() if base_context.get(k) != v}
+            merged[key] = {**theirs.get(key, {}), **changed}
+        elif value != base.get(key):
+            merged[key] = value
+    return merged
+
+def _queue_changes(base: list, items: list):
+    """
+    (how many of base's messages were dropped from the head, messages appended) for a queue derived from base.
+    """
+    for dropped in range(len(base) + 1):
+        kept = base[dropped:]
+        if items[:len(kept)] == kept:
+            return dropped, items[len(kept):]
+
+def merge_queue(base: list, ours: list, theirs: list) -> list:
+    """
+    Ordered union of two queues derived from base: what is left of base after both sides' drops,
+    then the messages they appended, then ours.
+    """
+    base = base or []
+    our_dropped, our_added = _queue_changes(base, ours)
+    their_dropped, their_added = _queue_changes(base, theirs)
+    return base[max(our_dropped, their_dropped):] + their_added + our_added
@@ -1,9 +1,23 @@
 import re
-import os
 from enum import Enum
 import time
-from langchain_groq import ChatGroq
+import threading
+from collections import Counter, OrderedDict, deque
 from django.conf import settings
+from mental_health_backend.services.llm_registry import get_llm
+from chatbot.core.session_backends import make_backend, merge_state
+from chatbot.core.summarizer import StorySummarizer
+from chatbot.bm25 import tokenize
+
+# Recent FSM events kept per session (for analytics/debugging); totals live in SessionFSM.event_counts
+HISTORY_WINDOW = getattr(settings, 'CHAT_SESSION_HISTORY_WINDOW', 50)
+
+# Rolling story summary (background, chatbot/core/summarizer.py): refreshed every N messages,
+# or sooner when a message shares less than TOPIC_SHIFT_OVERLAP of its words with the story so far
+SUMMARY_EVERY_N_TURNS = getattr(settings, 'CHAT_SUMMARY_EVERY_N_TURNS', 3)
+TOPIC_SHIFT_OVERLAP = getattr(settings, 'CHAT_SUMMARY_TOPIC_SHIFT_OVERLAP', 0.15)
+# Messages waiting to be folded into the story; the oldest are dropped past this
+MAX_PENDING_MESSAGES = 8
 
 class State(Enum):
     CHECK_IN = "CHECK_IN"
@@ -19,7 +33,8 @@ class SessionFSM:
     def __init__(self, session_id: str):
         self.session_id = session_id
         self.state = State.CHECK_IN
-        self.history = []
+        self.history = deque(maxlen=HISTORY_WINDOW)  # Last HISTORY_WINDOW events ("user_msg", "intervention_step")
+        self.event_counts = Counter()  # Event -> total this session, so counting turns is O(1)
         self.last_updated = time.time()
         self.locked_help_mode = False # Step 1: Lock after advice
         
@@ -32,18 +47,76 @@ class SessionFSM:
             "story": None, # Semantic summary
             "mode": None
         }
-        
-        # Fast summarizer for memory
-        self.llm = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model_name="llama-3.1-8b-instant",
-            temperature=0.1 # Low temp for factual summary
-        )
 
         # FIX: Question cooldown for Friend mode
         self.friend_question_cooldown = 0
         self.explore_count = 0
+
+        # Rolling summary input: user messages not yet folded into core_context["story"]
+        self.pending_messages = []
+        self.turns_since_summary = 0
+
+        # Persistence (SessionStore): backend version this object was loaded/saved at, and that snapshot
+        self.version = 0
+        self._base = None
+        # Guards the fields the background summarizer writes; not persisted
+        self._lock = threading.RLock()
+        self._summarizing = False
+        self._summary_requested = False
         
+    @property
+    def llm(self):
+        # Fast summarizer for memory (shared client: sessions don't each open their own connections)
+        return get_llm("llama-3.1-8b-instant", temperature=0.1)  # Low temp for factual summary
+
+    def record(self, event: str):
+        self.history.append(event)
+        self.event_counts[event] += 1
+
+    def to_dict(self) -> dict:
+        """
+        Compact, JSON-safe state that has to survive between turns (what the session backends store).
+        """
+        previous_state = getattr(self, 'previous_state', None)
+        return {
+            "state": self.state.value,
+            "previous_state": previous_state.value if previous_state else None,
+            "history": list(self.history),
+            "event_counts": dict(self.event_counts),
+            "locked_help_mode": self.locked_help_mode,
+            "core_context": dict(self.core_context),
+            "friend_question_cooldown": self.friend_question_cooldown,
+            "explore_count": self.explore_count,
+            "current_policy": getattr(self, 'current_policy', None),
+            "pending_messages": list(self.pending_messages),
+            "turns_since_summary": self.turns_since_summary,
+        }
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: dict, version: int = 0) -> "SessionFSM":
+        session = cls(session_id)
+        session._load(data)
+        session.version = version
+        session._base = data
+        return session
+
+    def _load(self, data: dict):
+        self.state = State(data["state"])
+        if data.get("previous_state"):
+            self.previous_state = State(data["previous_state"])
+        history = data.get("history", [])
+        self.history = deque(history, maxlen=HISTORY_WINDOW)
+        # States saved before event_counts existed carry the full history instead
+        self.event_counts = Counter(data.get("event_counts") or history)
+        self.locked_help_mode = data.get("locked_help_mode", False)
+        self.core_context.update(data.get("core_context", {}))
+        self.friend_question_cooldown = data.get("friend_question_cooldown", 0)
+        self.explore_count = data.get("explore_count", 0)
+        if data.get("current_policy"):
+            self.current_policy = data["current_policy"]
+        self.pending_messages = list(data.get("pending_messages", []))
+        self.turns_since_summary = data.get("turns_since_summary", 0)
+
     def update_context(self, text: str, signals: dict):
         """
         Extracts and Persists Meaning (Semantic Story, Trigger, Fear, Emotion).
@@ -58,13 +131,9 @@ class SessionFSM:
             return
             
         # 2. Semantic Memory Extraction (NEW: Fixes keyword fragility)
+        # Rolling summary in the background; generation uses the latest finished story
         if not is_short:
-            try:
-                summary_prompt = f"Summarize the user's core psychological issue or event in ONE short sentence: \"{text}\""
-                summary = self.llm.predict(summary_prompt).strip()
-                self.core_context["story"] = summary
-            except Exception as e:
-                print(f"Memory update error: {e}")
+            self._queue_for_summary(text)
 
         # 3. Extract Trigger (Heuristic backup)
         if "when" in text_lower or "because" in text_lower or "after" in text_lower:
@@ -87,6 +156,29 @@ class SessionFSM:
         if signals["emotion"] != "NEUTRAL":
             self.core_context["primary_emotion"] = signals["emotion"]
             
+    def _queue_for_summary(self, text: str):
+        with self._lock:
+            shifted = self._topic_shifted(text)
+            self.pending_messages.append(text)
+            del self.pending_messages[:-MAX_PENDING_MESSAGES]
+            self.turns_since_summary += 1
+            due = shifted or self.turns_since_summary >= SUMMARY_EVERY_N_TURNS or not self.core_context["story"]
+        if due:
+            summarizer.submit(self)
+
+    def _topic_shifted(self, text: str) -> bool:
+        """
+        True if the message shares few words with the story and the messages pending since it.
+        """
+        story = self.core_context["story"]
+        if not story:
+            return False
+        words = set(tokenize(text))
+        if not words:
+            return False
+        known = set(tokenize(" ".join([story, *self.pending_messages])))
+        return len(words & known) / len(words) < TOPIC_SHIFT_OVERLAP
+
     def update_state(self, signals: dict, risk: str, mode: str = 'friend'):
         """
         Layer 4: State Machine Logic.
@@ -99,7 +191,7 @@ class SessionFSM:
         # 2. Turn Count Logic (Fix 1: Stop looping forever)
         # We check the length of history (each pair is 1 turn)
         # We move to intervention if we've been talking too long without action
-        turn_count = len([m for m in self.history if m == "user_msg"]) 
+        turn_count = self.event_counts["user_msg"]
         
         # 3. Intent Logic (Fix 3: Jump to solution if asked)
         user_wants_solution = signals.get("intent") == "SOLVE"
@@ -110,9 +202,8 @@ class SessionFSM:
 
         # Step 3: Respect the Help Lock
         if self.locked_help_mode and signals.get("intent") != "CONCLUDE":
-            # Check for unlock signals (thanks, feeling better)
-            unlock_keywords = ["okay", "thanks", "thank you", "that helped", "feel better", "good", "clear"]
-            if any(kw in str(signals.get("text", "")).lower() for kw in unlock_keywords):
+            # Check for unlock signals (thanks, feeling better; "unlock" lexicon category)
+            if signals.get("unlock"):
                 self.locked_help_mode = False
                 self.state = State.CONCLUSION
                 return self.state
@@ -155,9 +246,9 @@ class SessionFSM:
                 self.state = State.INTERVENTION
             
         elif self.state == State.INTERVENTION:
-            self.history.append("intervention_step")
+            self.record("intervention_step")
             # Always move forward: Intervention -> Reflection
-            if len([x for x in self.history if x == "intervention_step"]) > 2: 
+            if self.event_counts["intervention_step"] > 2: 
                 self.previous_state = self.state
                 self.state = State.REFLECTION
             
@@ -174,11 +265,159 @@ class SessionFSM:
             
         return self.state
 
-# Simple in-memory storage for FSMs
-# In production, use Redis or Django Session
-_sessions = {}
+# Live sessions per worker. Bounded: least recently used sessions are dropped past MAX_SESSIONS,
+# and sessions idle for SESSION_IDLE_TTL seconds expire. With a session backend (CHAT_SESSION_BACKEND)
+# this is only a read-through cache and a dropped session is reloaded; with "local" the user starts a fresh FSM.
+MAX_SESSIONS = getattr(settings, 'CHAT_MAX_SESSIONS', 5000)
+SESSION_IDLE_TTL = getattr(settings, 'CHAT_SESSION_IDLE_TTL', 3600)
+# Merge-and-retry attempts when another worker saved the same session first
+SAVE_RETRIES = 3
+
+class SessionStore:
+    """
+    Thread-safe LRU of SessionFSMs with idle expiry on last_updated.
+    Entries are kept in last-access order, so expired sessions are always at the front.
+    With a backend, get() reads through to it (reusing the cached FSM while its version is current)
+    and save() writes the turn back with optimistic versioning.
+    """
+
+    def __init__(self, max_size: int = MAX_SESSIONS, idle_ttl: float = SESSION_IDLE_TTL, backend=None):
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl
+        self.backend = backend
+        self._sessions = OrderedDict()  # session_id -> SessionFSM
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.created = 0
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        self.loads = 0
+        self.saves = 0
+        self.conflicts = 0
+        self.backend_errors = 0
+
+    def get(self, session_id: str) -> SessionFSM:
+        now = time.time()
+        with self._lock:
+            self._expire_idle(now)
+            cached = self._sessions.get(session_id)
+
+        # Backend I/O happens outside the lock
+        session = self._read_through(session_id, cached) if self.backend else cached
+
+        with self._lock:
+            if session is None:
+                session = SessionFSM(session_id)
+                self.created += 1
+            elif session is cached:
+                self.hits += 1
+            else:
+                self.loads += 1
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+                self.evicted_lru += 1
+            session.last_updated = now
+            return session
+
+    def _read_through(self, session_id: str, cached):
+        """
+        The cached FSM if the backend still has its version, else the stored one (None if never saved).
+        """
+        try:
+            if cached is not None:
+                version = self.backend.version(session_id)
+                if version is None or version == cached.version:
+                    return cached
+            loaded = self.backend.load(session_id)
+        except Exception as e:
+            print(f"⚠️ Session backend read failed ({e}); using in-memory state")
+            self.backend_errors += 1
+            return cached
+        if loaded is None:
+            return cached
+        data, version = loaded
+        return SessionFSM.from_dict(session_id, data, version)
+
+    def save(self, session: SessionFSM):
+        """
+        Writes the session back after a turn. If another worker saved it in the meantime,
+        this turn's changes are merged onto theirs (merge_state) and the save is retried.
+        """
+        if self.backend is None:
+            return
+        # One save at a time per FSM: the turn and the background summarizer both save it
+        with session._lock:
+            self._save(session)
+
+    def _save(self, session: SessionFSM):
+        data = session.to_dict()
+        base = session._base
+        for _ in range(SAVE_RETRIES):
+            try:
+                version = self.backend.save(session.session_id, data, session.version)
+                if version is not None:
+                    session.version = version
+                    session._base = data
+                    self.saves += 1
+                    return
+                self.conflicts += 1
+                loaded = self.backend.load(session.session_id)
+            except Exception as e:
+                print(f"⚠️ Session backend write failed for {session.session_id}: {e}")
+                self.backend_errors += 1
+                return
+            if loaded is None:
+                # Deleted meanwhile: store ours as a new session
+                session.version, base = 0, None
+                continue
+            theirs, session.version = loaded
+            session._load(merge_state(base, data, theirs))
+            data, base = session.to_dict(), theirs
+        print(f"⚠️ Session {session.session_id}: gave up saving after {SAVE_RETRIES} version conflicts")
+
+    def _expire_idle(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_updated < self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted_idle += 1
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire_idle(time.time())
+            return {
+                "size": len(self._sessions),
+                "max_size": self.max_size,
+                "idle_ttl": self.idle_ttl,
+                "hits": self.hits,
+                "created": self.created,
+                "evicted_lru": self.evicted_lru,
+                "evicted_idle": self.evicted_idle,
+                "backend": type(self.backend).__name__ if self.backend else "local",
+                "loads": self.loads,
+                "saves": self.saves,
+                "conflicts": self.conflicts,
+                "backend_errors": self.backend_errors,
+            }
+
+session_store = SessionStore(backend=make_backend())
 
 def get_session(session_id: str) -> SessionFSM:
-    if session_id not in _sessions:
-        _sessions[session_id] = SessionFSM(session_id)
-    return _sessions[session_id]
+    return session_store.get(session_id)
+
+def save_session(session: SessionFSM):
+    session_store.save(session)
+
+# Persists the session again once its story is updated
+summarizer = StorySummarizer(workers=getattr(settings, 'CHAT_SUMMARY_WORKERS', 2), on_done=save_session)
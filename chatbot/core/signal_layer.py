@@ -1,85 +1,248 @@
 import json
-import os
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
+import threading
+import time
 from django.conf import settings
+from chatbot.core.lexicon import lexicon
+from mental_health_backend.services.llm_registry import get_llm
+from mental_health_backend.services.ml_client import ml_client
+
+# Keyword categories come from the versioned lexicon file (chatbot/lexicon.json, hot-reloaded).
+# Emotions, checked in this order:
+EMOTIONS = [
+    ("emotion_sad", "SAD"),
+    ("emotion_anxious", "ANXIOUS"),
+    ("emotion_angry", "ANGRY"),
+    ("emotion_stressed", "STRESSED"),
+    ("emotion_happy", "HAPPY"),
+]
+
+# Tier 2: the ML server's text emotion model (/predict/text), asked only when the keywords find
+# conflicting emotions; it can only pick one of those. The model has no neutral class (anger, fear, joy,
+# sadness, surprise; the server folds surprise into "happy"), so a message the keywords read as NEUTRAL stays NEUTRAL.
+# Its labels -> ours.
+ML_TIER = getattr(settings, 'CHAT_SIGNAL_ML_TIER', False)
+ML_TIMEOUT = getattr(settings, 'CHAT_SIGNAL_ML_TIMEOUT', 0.5)
+ML_MIN_CONFIDENCE = getattr(settings, 'CHAT_SIGNAL_ML_MIN_CONFIDENCE', 0.6)
+# After a failed ML call, skip the tier for this many seconds instead of paying the timeout every turn
+ML_RETRY_SECONDS = 30.0
+ML_EMOTIONS = {"sad": "SAD", "fear": "ANXIOUS", "angry": "ANGRY", "happy": "HAPPY"}
+
+# Tier 3: LLM extraction, only when the local tiers aren't confident on a message of at least
+# ESCALATE_MIN_WORDS words, or every crisis phrase found has common harmless uses ("crisis_ambiguous").
+# For the latter it only refines emotion, intensity and distortion: hopelessness stays as the keywords set it
+LLM_ESCALATION = getattr(settings, 'CHAT_SIGNAL_LLM_ESCALATION', False)
+ESCALATE_MIN_WORDS = getattr(settings, 'CHAT_SIGNAL_ESCALATE_MIN_WORDS', 6)
+LLM_MODEL = getattr(settings, 'CHAT_SIGNAL_LLM_MODEL', "llama-3.1-8b-instant")
+
+SIGNAL_PROMPT = """You are an expert psychological classifier.
+Analyze the user's message and reply with ONLY this JSON object:
+{{"emotion": "SAD" | "ANXIOUS" | "ANGRY" | "STRESSED" | "NEUTRAL" | "HAPPY",
+  "intensity": <int 1-10>,
+  "distortion": "overgeneralization" | "catastrophizing" | "all_or_nothing" | "self_blame" | "none",
+  "hopelessness": <bool>}}
+
+RULES:
+- Intensity 1-3 (Mild), 4-6 (Moderate), 7-10 (Severe).
+- hopelessness is true only if the user talks about giving up on life, worthlessness, suicide, self-harm or harming others;
+  figures of speech ("killing it at work", "hang out", "dying to see it") are not.
+- Default to "none" for distortion if not clear.
+
+Message: {text}"""
+LLM_LABELS = {
+    "emotion": {"SAD", "ANXIOUS", "ANGRY", "STRESSED", "NEUTRAL", "HAPPY"},
+    "distortion": {"overgeneralization", "catastrophizing", "all_or_nothing", "self_blame", "none"},
+}
 
 class SignalLayer:
+    """
+    Layer 2, tiered: keyword matcher (always), then the ML text model when the keywords are unsure,
+    then the LLM only when neither settles it, so most messages cost a keyword scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ml_down_until = 0.0
+        self.messages = 0
+        self.tiers = {tier: {"calls": 0, "total_ms": 0.0, "max_ms": 0.0} for tier in ("keywords", "ml", "llm")}
+        self.escalations = {"low_confidence": 0, "crisis_ambiguous": 0}
+        self.llm_errors = 0
+
     def process(self, text: str) -> dict:
         """
-        Layer 2: Psychological Signal Extraction (Heuristic/Keyword Optimized).
-        Replaced LLM call with fast Keyword Matching to fix 429 Rate Limits.
+        Layer 2: Psychological Signal Extraction.
+        Returns a dict of signals.
+        """
+        start = time.perf_counter()
+        signals, hits = self.keyword_signals(text)
+        self._record("keywords", start)
+        with self._lock:
+            self.messages += 1
+
+        # 1. Emotion: keywords found none, or more than one (only the latter goes to the ML tier)
+        emotion_hits = [label for category, label in EMOTIONS if category in hits]
+        confident = len(emotion_hits) == 1
+        if len(emotion_hits) > 1 and ML_TIER:
+            confident = self._ml_emotion(text, signals, hits, emotion_hits)
+
+        # 2. Decide whether the LLM has to look
+        reason = None
+        if "crisis" in hits and self._crisis_ambiguous(hits):
+            reason = "crisis_ambiguous"
+        elif not confident and len(text.split()) >= ESCALATE_MIN_WORDS:
+            reason = "low_confidence"
+
+        if reason and LLM_ESCALATION:
+            with self._lock:
+                self.escalations[reason] += 1
+            self._llm_signals(text, signals)
+        return signals
+
+    def keyword_signals(self, text: str):
+        """
+        Tier 1: (signals, lexicon hits) from one pass of the compiled keyword matcher.
         """
         text_lower = text.lower()
-        
+        hits = lexicon.scan(text_lower)
+
         # 1. Detect Emotion (Keyword Base)
-        emotion = "NEUTRAL"
-        if any(w in text_lower for w in ["sad", "cry", "tear", "alone", "hurt", "fail", "lost", "grief", "heavy", "pain"]):
-            emotion = "SAD"
-        elif any(w in text_lower for w in ["anxious", "worry", "panic", "scared", "fear", "afraid", "nervous", "future", "what if"]):
-            emotion = "ANXIOUS"
-        elif any(w in text_lower for w in ["angry", "mad", "hate", "furious", "annoyed", "unfair", "rage"]):
-            emotion = "ANGRY"
-        elif any(w in text_lower for w in ["stressed", "tired", "burned out", "busy", "overwhelmed", "pressure"]):
-            emotion = "STRESSED"
-        elif any(w in text_lower for w in ["happy", "good", "great", "joy", "excited", "love", "thanks", "better"]):
-            emotion = "HAPPY"
-            
+        emotion = next((label for category, label in EMOTIONS if category in hits), "NEUTRAL")
+
         # 2. Detect Hopelessness & Crisis (Critical)
-        hopelessness = False
-        crisis_keywords = [
-            "die", "kill myself", "suicide", "end it all", "no point", "worthless", "give up",
-            "self-harm", "overdose", "end my life", "jump", "hang", "cutting", "better off dead",
-            "don't want to live", "kill all", "hurt them", "harm", "kill everyone", "slash", "stab", "poison",
-            "kill ", "murder", "hurt others", "want to kill", "violence"
-        ]
-        
-        # Regex check for standalone "kill" to avoid "skill" but catch "kill him", "kill mouli"
-        import re
-        if any(w in text_lower for w in crisis_keywords) or re.search(r'\bkill\b', text_lower):
-            hopelessness = True
-            
+        # Whole words, so "kill him" counts but "skill" doesn't
+        hopelessness = "crisis" in hits
+
         # 3. Detect Intensity (Keyword Scoring)
-        intensity = 3 # Default Mild
-        # Boosters
-        if any(w in text_lower for w in ["very", "so", "really", "extremely", "totally", "can't", "never", "always"]):
-            intensity += 2
-        # Critical words
-        if hopelessness or emotion == "ANGRY" or "panic" in text_lower:
-            intensity += 2
-            
-        if intensity > 10: intensity = 10
-        
+        intensity = self._intensity(hits, emotion, hopelessness)
+
         # 4. Detect Distortion (Simple checks)
         distortion = "none"
-        if "always" in text_lower or "never" in text_lower or "everyone" in text_lower:
+        if "all_or_nothing" in hits:
             distortion = "all_or_nothing"
-        elif "fault" in text_lower or "blame" in text_lower:
+        elif "self_blame" in hits:
             distortion = "self_blame"
-            
+
         # 5. Detect Query Type (Feeling vs Question)
         q_type = "FEELING"
-        question_words = ["how", "what", "why", "when", "where", "who", "can you", "could you", "should i", "tell me", "help me"]
-        if "?" in text_lower or any(text_lower.startswith(w) for w in question_words):
+        # Question words only count at the start of the message
+        if "?" in text_lower or any(start == 0 for start, _ in hits.get("question", [])):
             q_type = "QUESTION"
-            
+
         # 6. Detect Intent (NEW: VENT vs SOLVE)
         intent = "VENT"
-        solve_keywords = ["what should i do", "how to fix", "advice", "help me with", "solution", "suggest", "tips", "how do i"]
-        if any(kw in text_lower for kw in solve_keywords) or (q_type == "QUESTION" and any(w in text_lower for w in ["how", "should"])):
+        if "solve" in hits or (q_type == "QUESTION" and "solve_question" in hits):
             intent = "SOLVE"
-        
+
         # 7. Detect Conclude Intent (NEW Step 1: Conclusion Mode)
-        conclude_keywords = ["solution", "conclusion", "what now", "final", "summary", "done", "wrap up", "stop", "end"]
-        if any(kw in text_lower for kw in conclude_keywords):
+        if "conclude" in hits:
             intent = "CONCLUDE"
 
-        return {
+        # 8. Detect Unlock (thanks / feeling better): lets the FSM leave the help lock
+        unlock = "unlock" in hits
+
+        signals = {
             "emotion": emotion,
             "intensity": intensity,
             "type": q_type,
             "distortion": distortion,
             "hopelessness": hopelessness,
             "intent": intent,
-            "action_preference": "NONE"
+            "action_preference": "NONE",
+            "unlock": unlock
         }
+        return signals, hits
+
+    @staticmethod
+    def _intensity(hits: dict, emotion: str, hopelessness: bool) -> int:
+        intensity = 3 # Default Mild
+        # Boosters
+        if "booster" in hits:
+            intensity += 2
+        # Critical words
+        if hopelessness or emotion == "ANGRY" or "panic" in hits:
+            intensity += 2
+        return min(intensity, 10)
+
+    @staticmethod
+    def _crisis_ambiguous(hits: dict) -> bool:
+        """
+        True if every crisis phrase found also has harmless uses ("kill" but not "kill myself").
+        """
+        ambiguous = lexicon.phrases("crisis_ambiguous")
+        return all(phrase in ambiguous for _, phrase in hits["crisis"])
+
+    def _ml_emotion(self, text: str, signals: dict, hits: dict, emotion_hits: list) -> bool:
+        """
+        Tier 2: lets the text emotion model pick one of the emotions the keywords found.
+        True if its answer is confident and among them; otherwise the first keyword emotion stands.
+        """
+        with self._lock:
+            if time.monotonic() < self._ml_down_until:
+                return False
+        start = time.perf_counter()
+        label, confidence = ml_client.predict_text(text, timeout=ML_TIMEOUT)
+        self._record("ml", start)
+        if not confidence:
+            # predict_text answers ("neutral", 0.0) when the server is down or slow
+            with self._lock:
+                self._ml_down_until = time.monotonic() + ML_RETRY_SECONDS
+            return False
+
+        emotion = ML_EMOTIONS.get(label)
+        if emotion not in emotion_hits or confidence < ML_MIN_CONFIDENCE:
+            return False
+        signals["emotion"] = emotion
+        signals["intensity"] = self._intensity(hits, emotion, signals["hopelessness"])
+        return True
+
+    def _llm_signals(self, text: str, signals: dict):
+        """
+        Tier 3: LLM extraction of emotion, intensity, distortion and hopelessness.
+        On any failure the local signals stand. Hopelessness can only be raised here, never cleared,
+        so a crisis the keywords flagged stays flagged whatever the model answers.
+        """
+        start = time.perf_counter()
+        try:
+            content = get_llm(LLM_MODEL, temperature=0.0).invoke(SIGNAL_PROMPT.format(text=text)).content
+            result = json.loads(content[content.find("{"):content.rfind("}") + 1])
+
+            if result.get("emotion") in LLM_LABELS["emotion"]:
+                signals["emotion"] = result["emotion"]
+            if result.get("distortion") in LLM_LABELS["distortion"]:
+                signals["distortion"] = result["distortion"]
+            if isinstance(result.get("intensity"), int):
+                signals["intensity"] = max(1, min(10, result["intensity"]))
+            if result.get("hopelessness") is True:
+                signals["hopelessness"] = True
+        except Exception as e:
+            with self._lock:
+                self.llm_errors += 1
+            print(f"Signal Extraction Error (LLM tier): {e}")
+        finally:
+            self._record("llm", start)
+
+    def _record(self, tier: str, start: float):
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stats = self.tiers[tier]
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            escalated = sum(self.escalations.values())
+            return {
+                "messages": self.messages,
+                "escalations": dict(self.escalations),
+                "escalation_rate": round(escalated / self.messages, 4) if self.messages else 0.0,
+                "llm_errors": self.llm_errors,
+                "tiers": {
+                    tier: {
+                        "calls": stats["calls"],
+                        "avg_ms": round(stats["total_ms"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                        "max_ms": round(stats["max_ms"], 3),
+                    }
+                    for tier, stats in self.tiers.items()
+                },
+                "lexicon_version": lexicon.version,
+            }
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+
+# Rolling summary: the previous story plus only the messages since it was written
+ROLLING_SUMMARY_PROMPT = (
+    "You maintain a short memory of a mental health support conversation.\n"
+    "Current summary: {story}\n"
+    "New messages from the user:\n{messages}\n\n"
+    "Update the summary so it captures the user's core psychological issue or event, including anything new. "
+    "Reply with ONE or TWO short sentences and nothing else."
+)
+
+class StorySummarizer:
+    """
+    Folds a session's pending_messages into core_context["story"] on a background pool,
+    so chat turns never wait on the summarization LLM call. At most one run per session at a time;
+    a summary requested during a run makes that run go again with the messages that arrived meanwhile.
+    on_done(session) is called after each update (used to persist the session).
+    """
+
+    def __init__(self, workers: int = 2, on_done=None):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="maa-summary")
+        self._on_done = on_done
+
+        self.runs = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def submit(self, session):
+        with session._lock:
+            if session._summarizing:
+                # Already running for this session: it goes again once done
+                session._summary_requested = True
+                self.coalesced += 1
+                return
+            session._summarizing = True
+        self._executor.submit(self._run, session)
+
+    def _run(self, session):
+        try:
+            while True:
+                self._summarize(session)
+                # Decide under the lock, so a submit() can't slip in between "done" and clearing the flag
+                with session._lock:
+                    if not (session._summary_requested and session.pending_messages):
+                        session._summarizing = False
+                        return
+        except Exception:
+            session._summarizing = False
+            raise
+        finally:
+            # Pool threads are reused; don't leave their DB connections open
+            connections.close_all()
+
+    def _summarize(self, session):
+        """
+        One rolling update of the story from the messages pending now.
+        """
+        start = time.perf_counter()
+        try:
+            with session._lock:
+                session._summary_requested = False
+                messages = list(session.pending_messages)
+                story = session.core_context.get("story")
+            if not messages:
+                return
+
+            prompt = ROLLING_SUMMARY_PROMPT.format(
+                story=story or "(none yet)",
+                messages="\n".join(f"- {m}" for m in messages),
+            )
+            new_story = session.llm.invoke(prompt).content.strip()
+
+            with session._lock:
+                session.core_context["story"] = new_story
+                # Drop the messages just folded in. Only the oldest pending messages are ever trimmed,
+                # so whatever is left of `messages` is at the head of the list.
+                pending = session.pending_messages
+                done = len(messages)
+                while done and pending[:done] != messages[-done:]:
+                    done -= 1
+                del pending[:done]
+                session.turns_since_summary = len(pending)
+            self.runs += 1
+            self.total_ms += (time.perf_counter() - start) * 1000
+
+            if self._on_done:
+                self._on_done(session)
+        except Exception as e:
+            self.errors += 1
+            print(f"Memory update error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.runs, 1) if self.runs else 0.0,
+        }
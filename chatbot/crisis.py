@@ -1,9 +1,7 @@
-from typing import List
+from chatbot.core.lexicon import lexicon
 
-CRISIS_KEYWORDS: List[str] = [
-    "suicidal", "suicide", "kill myself", "want to die", "hopeless", "worthless",
-    "can't go on", "give up", "ending it all", "no reason to live"
-]
+# Crisis phrases are the "crisis" category of the lexicon file (chatbot/lexicon.json, hot-reloaded),
+# shared with SignalLayer's hopelessness signal
 
 SAFETY_MESSAGE = """
 It sounds like you're going through a really tough time. You're not alone—reaching out is a brave first step. Please consider talking to a professional right away.
@@ -18,4 +16,4 @@ If it's an emergency, please call 112 immediately.
 """
 
 def contains_crisis_keywords(text: str) -> bool:
-    return any(keyword.lower() in text.lower() for keyword in CRISIS_KEYWORDS)
+    return "crisis" in lexicon.scan(text)
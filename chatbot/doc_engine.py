@@ -1,8 +1,13 @@
 import os
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, Settings, PromptTemplate
-from llama_index.llms.groq import Groq
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+import threading
+import time
 from dotenv import load_dotenv
+from django.conf import settings
+from chatbot.core.cache import TTLCache
+from chatbot.bm25 import BM25Index, reciprocal_rank_fusion
+
+# Nothing heavy happens at import: llama-index, the embedding model, Groq and the index are set up
+# on first use (ensure_ready), or by the warm-up in ChatbotConfig.ready when CHAT_WARMUP is on.
 
 load_dotenv()
 
@@ -26,7 +31,6 @@ QA_PROMPT_TMPL = (
     "Query: {query_str}\n"
     "MAA's Response:"
 )
-QA_PROMPT = PromptTemplate(QA_PROMPT_TMPL)
 
 # 2. Refine Prompt (For when answer needs to be improved iteratively)
 REFINE_PROMPT_TMPL = (
@@ -41,48 +45,289 @@ REFINE_PROMPT_TMPL = (
     "If the context isn't useful, return the original answer.\n"
     "MAA's Refined Response:"
 )
-REFINE_PROMPT = PromptTemplate(REFINE_PROMPT_TMPL)
-
-try:
-    # 1. Setup LLM (Groq - Llama 3)
-    # Using Llama 3.1 8b Instant for speed and quality
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    if not groq_api_key:
-        raise ValueError("GROQ_API_KEY not found in .env")
+
+# If the persisted index is missing/stale, rebuild it on first use. Off by default: every worker would
+# embed the corpus at once; run 'manage.py build_rag_index' at deploy instead.
+BUILD_ON_STARTUP = getattr(settings, 'RAG_BUILD_ON_STARTUP', False)
+# After a failed setup, wait this long before trying again (instead of disabling RAG for the worker's lifetime)
+INIT_RETRY_SECONDS = getattr(settings, 'RAG_INIT_RETRY_SECONDS', 60.0)
+# While serving queries, check this often whether another process persisted a newer index (build_rag_index,
+# the reindex job, a record sync) or built one this worker didn't have, and reload it in the background.
+# The same check applies queued record syncs (chatbot/rag_jobs.py).
+RELOAD_CHECK_SECONDS = getattr(settings, 'RAG_RELOAD_CHECK_SECONDS', 10.0)
+
+# "hybrid": dense + BM25 fused with reciprocal rank fusion, "dense": vectors only, "lexical": BM25 only
+RETRIEVAL_MODE = getattr(settings, 'RAG_RETRIEVAL_MODE', "hybrid")
+# Each retriever contributes top_k * this many candidates to the fusion
+FUSION_CANDIDATES = getattr(settings, 'RAG_FUSION_CANDIDATES', 4)
+
+index = None
+query_engine = None
+# Lexical index over the same chunks, rebuilt whenever the vector index is swapped
+bm25_index = None
+# Bumped whenever a new index is swapped in; retrieval caches key on it
+index_version = 0
+# False if the embedding model couldn't load: retrieval is then BM25 only
+embedder_available = False
+# Moving average of query embedding time (ms), to decide when dense retrieval doesn't fit the budget
+embed_ms = 0.0
+
+# Held while the live index is searched or changed in place (record syncs swap chunks into it)
+live_index_lock = threading.Lock()
+
+# Lazy setup state
+_init_lock = threading.Lock()
+_ready = False
+_init_error = None
+_init_failed_at = 0.0
+# Index refresh state (RELOAD_CHECK_SECONDS)
+_refresh_lock = threading.Lock()
+_refreshing = False
+_checked_at = 0.0
+
+# Query text -> embedding. Independent of the index, so it survives re-indexing.
+embedding_cache = TTLCache(
+    max_size=getattr(settings, 'RAG_EMBED_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'RAG_EMBED_CACHE_TTL', 3600.0),
+)
+
+def _make_query_engine(vector_index):
+    from llama_index.core import PromptTemplate
+    # Create Query Engine with Custom Persona Prompts
+    return vector_index.as_query_engine(
+        text_qa_template=PromptTemplate(QA_PROMPT_TMPL),
+        refine_template=PromptTemplate(REFINE_PROMPT_TMPL),
+        streaming=False
+    )
+
+def ensure_ready() -> bool:
+    """
+    Sets up the doc engine once per process (thread-safe; concurrent callers wait for the first).
+    Returns True if an index is being served. A failed setup is retried after INIT_RETRY_SECONDS;
+    a missing or outdated index is (re)loaded in the background once one is persisted.
+    """
+    if not _ready:
+        with _init_lock:
+            if not _ready and time.monotonic() - _init_failed_at >= INIT_RETRY_SECONDS:
+                _init()
+    if _ready:
+        _schedule_refresh()
+    return index is not None
+
+def status() -> dict:
+    return {
+        "ready": _ready,
+        "index_loaded": index is not None,
+        "index_generation": getattr(index, "manifest_generation", None),
+        "embedder_available": embedder_available,
+        "error": _init_error,
+    }
+
+def _init():
+    global embedder_available, _ready, _init_error, _init_failed_at
+    from llama_index.core import Settings
+    from llama_index.llms.groq import Groq
+    from chatbot.rag_index import DATA_DIR, EMBED_MODEL_NAME, load_or_build
+    from chatbot.embeddings import make_embed_model
+    from mental_health_backend.services.llm_registry import llm_registry
+
+    start = time.perf_counter()
+    try:
+        # 1. Setup LLM (Groq - Llama 3)
+        # Using Llama 3.1 8b Instant for speed and quality
+        groq_api_key = os.getenv("GROQ_API_KEY")
+        if not groq_api_key:
+            raise ValueError("GROQ_API_KEY not found in .env")
+            
+        # Same pooled HTTP connections as the LangChain clients (mental_health_backend/services/llm_registry.py)
+        llm = Groq(model="llama-3.1-8b-instant", api_key=groq_api_key,
+                   http_client=llm_registry.http_client(), async_http_client=llm_registry.http_async_client())
         
-    llm = Groq(model="llama-3.1-8b-instant", api_key=groq_api_key)
-    
-    # 2. Setup Embeddings (Local HuggingFace - Free/Fast)
-    embed_model = HuggingFaceEmbedding(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    
-    # 3. Configure Global Settings
-    Settings.llm = llm
-    Settings.embed_model = embed_model
-    
-    # 4. Load Data & Create Index
-    if os.path.exists("data"):
-        print("📂 Found 'data' folder. Loading documents... (This may take a moment)")
-        documents = SimpleDirectoryReader("data").load_data()
-        print(f"✅ Loaded {len(documents)} documents. Creating AI Index... (This involves heavy processing)")
-        index = VectorStoreIndex.from_documents(documents)
-        print("✅ AI Index created successfully!")
+        # 2. Setup Embeddings (ML server's shared /embed if EMBEDDING_SERVICE_URL is set, else local HuggingFace)
+        # If the model can't load, the persisted chunks are still searchable lexically (BM25)
+        try:
+            embed_model = make_embed_model()
+            embedder_available = True
+        except Exception as e:
+            print(f"⚠️ Embedding model unavailable ({e}); RAG will use lexical (BM25) search only")
+            embed_model = None  # llama-index substitutes a MockEmbedding
         
-        # 5. Create Query Engine with Custom Persona Prompts
-        query_engine = index.as_query_engine(
-            text_qa_template=QA_PROMPT,
-            refine_template=REFINE_PROMPT,
-            streaming=False
-        )
-    else:
-        print("Data directory not found.")
-        query_engine = None
+        # 3. Configure Global Settings
+        Settings.llm = llm
+        Settings.embed_model = embed_model
         
-except Exception as e:
-    print(f"Error setting up Doc Engine: {e}")
-    query_engine = None
+        # 4. Load the persisted Index (built once from data/, keyed on its content hash)
+        # Never build without a real embedder: the vectors would be meaningless
+        new_index = None
+        if os.path.exists(DATA_DIR):
+            new_index = load_or_build(EMBED_MODEL_NAME, build_if_stale=BUILD_ON_STARTUP and embedder_available)
+
+        if new_index:
+            # 5. Query engine + BM25 over the loaded chunks
+            set_index(new_index)
+            _init_error = None
+        else:
+            # Not fatal: _refresh loads the index once 'manage.py build_rag_index' has persisted one
+            print("RAG index not available (data directory missing or index not built).")
+            _init_error = "RAG index not built"
+
+        _ready = True
+        print(f"✅ Doc Engine ready in {time.perf_counter() - start:.2f}s")
+            
+    except Exception as e:
+        print(f"Error setting up Doc Engine (retrying in {INIT_RETRY_SECONDS:.0f}s): {e}")
+        _init_error = str(e)
+        _init_failed_at = time.monotonic()
+
+def _schedule_refresh():
+    global _refreshing, _checked_at
+    if _refreshing or time.monotonic() - _checked_at < RELOAD_CHECK_SECONDS:
+        return
+    with _refresh_lock:
+        if _refreshing or time.monotonic() - _checked_at < RELOAD_CHECK_SECONDS:
+            return
+        _refreshing = True
+        _checked_at = time.monotonic()
+    threading.Thread(target=_refresh, daemon=True, name="maa-rag-refresh").start()
+
+def _refresh():
+    """
+    Applies queued record syncs, then swaps in the persisted index if it is newer than the one served here
+    (or this worker has none yet). Runs off the request path; queries keep using the current index meanwhile.
+    """
+    global _refreshing, _init_error
+    from chatbot.rag_index import EMBED_MODEL_NAME, INDEX_DIR, load_or_build, read_manifest
+    from chatbot.rag_jobs import record_sync_queue
+
+    try:
+        if index is not None and embedder_available:
+            record_sync_queue.drain()
+
+        manifest = read_manifest(INDEX_DIR)
+        generation = manifest.get("generation")
+        # Nothing built yet, or already serving the latest generation
+        # (an index persisted before generations existed counts as the latest)
+        if not manifest or (index is not None and generation in (None, getattr(index, "manifest_generation", None))):
+            return
+        new_index = load_or_build(EMBED_MODEL_NAME, build_if_stale=BUILD_ON_STARTUP and embedder_available)
+        if new_index is not None:
+            set_index(new_index)
+            _init_error = None
+            print(f"🔁 RAG index reloaded (generation {new_index.manifest_generation})")
+    except Exception as e:
+        print(f"⚠️ RAG index refresh failed: {e}")
+    finally:
+        _refreshing = False
+
+def set_index(new_index):
+    """
+    Swaps in a re-indexed VectorStoreIndex for this worker (used by the reindex job).
+    """
+    global index, query_engine, index_version, bm25_index
+    query_engine = _make_query_engine(new_index) if new_index else None
+    bm25_index = BM25Index(new_index.docstore.docs.values()) if new_index else None
+    index = new_index
+    index_version += 1
+
+def _query_embedding(text: str, budget_ms: float = None):
+    """
+    Cached query embedding, or None when dense retrieval isn't possible/affordable:
+    no embedding model, or embedding is currently slower than budget_ms and the query isn't cached.
+    """
+    global embed_ms
+    embedding = embedding_cache.get(text)
+    if embedding is not None:
+        return embedding
+    if not embedder_available:
+        return None
+    if budget_ms and embed_ms > budget_ms:
+        # Decay so a later query probes the embedder again once the load spike has passed
+        embed_ms *= 0.9
+        return None
+
+    start = time.perf_counter()
+    try:
+        from llama_index.core import Settings
+        embedding = Settings.embed_model.get_query_embedding(text)
+    except Exception as e:
+        # e.g. embedding service down: this query goes lexical
+        print(f"⚠️ Query embedding failed: {e}")
+        return None
+    elapsed = (time.perf_counter() - start) * 1000
+    embed_ms = elapsed if not embed_ms else 0.8 * embed_ms + 0.2 * elapsed
+    embedding_cache.set(text, embedding)
+    return embedding
+
+def _source_filters(sources: dict):
+    from llama_index.core.vector_stores import MetadataFilters, MetadataFilter, FilterOperator, FilterCondition
+    # {"file_name": [...], "model": [...]} -> chunk matches if ANY of the keys is in its list
+    return MetadataFilters(
+        filters=[MetadataFilter(key=key, value=list(values), operator=FilterOperator.IN) for key, values in sources.items()],
+        condition=FilterCondition.OR,
+    )
+
+def retrieve_chunks(user_query: str, top_k: int = 3, sources: dict = None, mode: str = None, budget_ms: float = None) -> list:
+    """
+    Retriever-only lookup: returns the top_k raw chunks, with no LLM synthesis.
+    Each item: {"text", "score", "source", "dense_score", "bm25_score"}.
+    mode: "hybrid" (default, RRF of dense + BM25), "dense" or "lexical".
+    Falls back to lexical when there is no embedder or embedding would exceed budget_ms.
+    sources restricts the search to a partition by metadata, e.g. {"file_name": ["cbt_master_guide.txt"]}.
+    """
+    if not ensure_ready():
+        return []
+
+    try:
+        mode = mode or RETRIEVAL_MODE
+        embedding = None
+        if mode != "lexical":
+            # Repeated queries reuse their cached embedding instead of running MiniLM again
+            embedding = _query_embedding(user_query, budget_ms)
+            if embedding is None:
+                mode = "lexical"  # Fast path
+        candidates = top_k * FUSION_CANDIDATES if mode == "hybrid" else top_k
+
+        # 1. Dense
+        dense = {}
+        if mode != "lexical":
+            from llama_index.core import QueryBundle
+            query = QueryBundle(query_str=user_query, embedding=embedding)
+            filters = _source_filters(sources) if sources else None
+            with live_index_lock:
+                results = index.as_retriever(similarity_top_k=candidates, filters=filters).retrieve(query)
+            for n in results:
+                dense[n.node.node_id] = (n.node, n.score)
+
+        # 2. Lexical
+        lexical = {}
+        if mode != "dense" and bm25_index is not None:
+            for node_id, score in bm25_index.search(user_query, candidates, sources):
+                lexical[node_id] = (bm25_index.nodes[node_id], score)
+
+        # 3. Rank
+        if mode == "hybrid":
+            ranked = reciprocal_rank_fusion(list(dense), list(lexical))
+        else:
+            ranked = [(node_id, score) for node_id, (_, score) in (dense or lexical).items()]
+
+        chunks = []
+        for node_id, score in ranked[:top_k]:
+            node = (dense.get(node_id) or lexical.get(node_id))[0]
+            chunks.append({
+                "text": node.get_content().strip(),
+                "score": score,
+                # data/ files carry file_name; DB records (chatbot/rag_sources.py) carry source
+                "source": node.metadata.get("file_name") or node.metadata.get("source", "unknown"),
+                "dense_score": dense[node_id][1] if node_id in dense else None,
+                "bm25_score": lexical[node_id][1] if node_id in lexical else None,
+            })
+        return chunks
+    except Exception as e:
+        print(f"Error retrieving chunks: {e}")
+        return []
 
 def query_documents(user_query: str) -> str:
-    if not query_engine:
+    if not ensure_ready() or not query_engine:
         return "Error: Document engine not ready. Check logs/data folder."
     
     try:
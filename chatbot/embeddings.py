@@ -0,0 +1,62 @@
+import requests
+from django.conf import settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+from chatbot.rag_index import EMBED_MODEL_NAME
+
+# When set (e.g. http://127.0.0.1:8001), embeddings come from the ML inference server's /embed
+# instead of a MiniLM copy loaded into every Django worker.
+EMBEDDING_SERVICE_URL = getattr(settings, 'EMBEDDING_SERVICE_URL', "")
+
+class RemoteEmbedding(BaseEmbedding):
+    """
+    llama-index embedding backed by the ML server's /embed endpoint
+    (which batches concurrent callers and caches recent texts).
+    """
+    url: str
+    timeout: float = 10.0
+
+    _http: requests.Session = PrivateAttr()
+
+    def __init__(self, url: str, model_name: str = EMBED_MODEL_NAME, **kwargs):
+        super().__init__(url=url.rstrip("/"), model_name=model_name, **kwargs)
+        # Keep-alive connection per worker
+        self._http = requests.Session()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "RemoteEmbedding"
+
+    def _embed(self, texts):
+        response = self._http.post(f"{self.url}/embed", json={"texts": texts}, timeout=self.timeout)
+        response.raise_for_status()
+        result = response.json()
+        if result.get("model") != self.model_name:
+            # Vectors from another model would silently ruin retrieval
+            raise ValueError(f"Embedding service runs {result.get('model')}, index expects {self.model_name}")
+        return result["embeddings"]
+
+    def _get_query_embedding(self, query: str):
+        return self._embed([query])[0]
+
+    def _get_text_embedding(self, text: str):
+        return self._embed([text])[0]
+
+    def _get_text_embeddings(self, texts):
+        return self._embed(texts)
+
+    async def _aget_query_embedding(self, query: str):
+        return self._get_query_embedding(query)
+
+def make_embed_model():
+    """
+    The embedding model for this process: the shared service if EMBEDDING_SERVICE_URL is set,
+    otherwise a local HuggingFace copy of the model.
+    """
+    if EMBEDDING_SERVICE_URL:
+        print(f"🔗 Using embedding service at {EMBEDDING_SERVICE_URL}")
+        return RemoteEmbedding(EMBEDDING_SERVICE_URL)
+
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    return HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME)
@@ -0,0 +1,44 @@
+import os
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from contextlib import contextmanager
+
+# Cross-process locks on small files next to the RAG index (its build lock, the record sync queue).
+# Kept free of llama-index imports, so processes that only enqueue work stay light.
+
+@contextmanager
+def locked_file(path: str):
+    """
+    path opened for reading and appending ("a+b", created if missing), exclusively locked across
+    processes until the block exits. Not re-entrant.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a+b") as f:
+        _lock_file(f)
+        try:
+            yield f
+        finally:
+            _unlock_file(f)
+
+def _lock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK gives up after ~10s; another process is still holding it
+            continue
+
+def _unlock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
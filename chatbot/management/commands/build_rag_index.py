@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from llama_index.core import Settings
+
+from chatbot.rag_index import DATA_DIR, INDEX_DIR, EMBED_MODEL_NAME, build_index, index_lock, update_index, upsert_records, data_hash, read_manifest
+from chatbot.rag_sources import iter_all_records
+from chatbot.embeddings import make_embed_model
+
+
+class Command(BaseCommand):
+    help = ('Embed data/ and the DB content (Disorder/Article/CopingMethod/RoadmapStep) into the persisted RAG index. '
+            'Only new/changed chunks are embedded unless --force is given')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild the whole index from scratch')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report whether the persisted index matches data/ (exit code 1 if stale)')
+        parser.add_argument('--skip-db', action='store_true', help='Only index data/, leave DB records as they are (with --force they are always re-embedded)')
+        parser.add_argument('--batch-size', type=int, default=200, help='DB rows fetched per query when syncing records')
+
+    def handle(self, *args, **options):
+        manifest = read_manifest(INDEX_DIR)
+        current_hash = data_hash(DATA_DIR, known=manifest.get('documents'))
+        up_to_date = (
+            manifest.get('data_hash') == current_hash
+            and manifest.get('embed_model') == EMBED_MODEL_NAME
+        )
+
+        if options['check']:
+            if up_to_date:
+                self.stdout.write(self.style.SUCCESS(f'✅ RAG index is up to date (built {manifest.get("built_at")})'))
+                return
+            raise CommandError('RAG index is missing or stale. Run: python manage.py build_rag_index')
+
+        if up_to_date and options['skip_db'] and not options['force']:
+            self.stdout.write(self.style.SUCCESS('✅ RAG index already up to date, nothing to do (use --force to rebuild)'))
+            return
+
+        start = time.perf_counter()
+        Settings.embed_model = make_embed_model()
+        # One lock for both steps, so a serving worker never loads or syncs into a half-updated index
+        with index_lock(INDEX_DIR):
+            if options['force']:
+                # A from-scratch index has no DB content to keep, so it is always re-embedded
+                self.stdout.write(f'📂 Rebuilding RAG index from {DATA_DIR} and the DB...')
+                index, stats = build_index(EMBED_MODEL_NAME, DATA_DIR, INDEX_DIR, records=iter_all_records(options['batch_size']))
+            else:
+                self.stdout.write(f'📂 Updating RAG index from {DATA_DIR}...')
+                index, stats = update_index(EMBED_MODEL_NAME, DATA_DIR, INDEX_DIR)
+
+            if not options['skip_db'] and not options['force']:
+                self.stdout.write('🗄️ Syncing DB content into the RAG index...')
+                stats['db'] = upsert_records(index, iter_all_records(options['batch_size']), INDEX_DIR, full_sync=True)
+        self.stdout.write(self.style.SUCCESS(f'🎉 RAG index ready in {time.perf_counter() - start:.1f}s -> {INDEX_DIR} {stats}'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot.core.keyword_matcher import KeywordMatcher
+from chatbot.core.lexicon import LEXICON_PATH, load_lexicon
+
+
+class Command(BaseCommand):
+    help = 'Validate a keyword lexicon file before shipping it (defaults to CHAT_LEXICON_PATH)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=LEXICON_PATH, help='Lexicon JSON file to check')
+        parser.add_argument('--text', action='append', default=[], help='Also show the category hits for this text (repeatable)')
+
+    def handle(self, *args, **options):
+        try:
+            loaded = load_lexicon(options['path'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'❌ {e}')
+
+        matcher = KeywordMatcher(loaded['categories'])
+        for name, phrases in loaded['categories'].items():
+            self.stdout.write(f'   {name}: {len(phrases)} phrases')
+        for text in options['text']:
+            hits = matcher.scan(text)
+            found = ', '.join(f'{name} ({", ".join(p for _, p in found)})' for name, found in hits.items()) or 'no hits'
+            self.stdout.write(f'   "{text}" → {found}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Lexicon {loaded["version"]} ({loaded["checksum"]}) is valid'))
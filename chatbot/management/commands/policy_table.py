@@ -0,0 +1,141 @@
+import csv
+import json
+import sys
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot.core.decision_layer import DECISION_TABLE, DIMENSIONS, POLICY_RULES, DecisionLayer, Policy, decision_key
+
+# A representative raw input for each discretized value (for replaying keys through the reference)
+INTENSITY_SAMPLES = {"<4": (1, 3), "4": (4,), "5-7": (5, 7), "8": (8,), ">8": (9, 10)}
+
+
+def reference_select_policy(signals, risk, state_str, mode, current_policy):
+    """
+    DecisionLayer.select_policy as it was before the decision table (imperative version),
+    returning (policy, locks help mode). Kept only to verify DECISION_TABLE against it.
+    """
+    intensity = signals.get("intensity", 1)
+    distortion = signals.get("distortion", "none")
+    s_type = signals.get("type", "FEELING")
+    locks = False
+
+    if signals.get("intent") == "CONCLUDE" or state_str == "CONCLUSION":
+        return Policy.CONCLUSION.value, locks
+    if risk == "CRITICAL":
+        return Policy.CRISIS.value, locks
+    if current_policy == Policy.CBT.value:
+        if intensity > 8:
+            return Policy.GROUNDING.value, locks
+        if distortion == "none" and intensity < 4:
+            pass
+        else:
+            return Policy.CBT.value, True
+    if mode == 'normal':
+        return Policy.GENERAL.value, locks
+    if mode == 'guide':
+        if state_str == "VALIDATION":
+            return Policy.VALIDATION_FIRST_AID.value, locks
+        if state_str == "CHOICE":
+            return Policy.CHOICE_OFFER.value, locks
+        if state_str == "REFLECTION":
+            return Policy.REFLECTION_CHECK.value, locks
+    if state_str == "INTERVENTION":
+        if distortion != "none":
+            return Policy.CBT.value, True
+        return Policy.GROUNDING.value, True
+    can_ground = True
+    if state_str == "CHECK_IN":
+        can_ground = False
+    if mode == 'guide' and state_str in ["VALIDATION", "CHOICE"]:
+        can_ground = False
+    if intensity >= 8 and can_ground:
+        return Policy.GROUNDING.value, locks
+    if signals.get("intent") == "SOLVE":
+        return Policy.CBT.value, True
+    if mode == 'friend' and signals.get("emotion") in ["SAD", "ANXIOUS"] and intensity >= 5:
+        return Policy.FRIEND_SUGGEST.value, True
+    if distortion != "none":
+        return Policy.CBT.value, True
+    if s_type == "QUESTION":
+        return Policy.PSYCHOEDUCATION.value, locks
+    return Policy.SUPPORTIVE.value, locks
+
+
+def raw_inputs(key):
+    """
+    Raw (signals, risk, state, mode, current_policy) combinations that discretize to key.
+    """
+    values = dict(zip(DIMENSIONS, key))
+    for intensity in INTENSITY_SAMPLES[values["intensity"]]:
+        for emotion in (("SAD", "ANXIOUS") if values["emotion"] == "SAD/ANXIOUS" else ("HAPPY",)):
+            signals = {
+                "intensity": intensity,
+                "distortion": "none" if values["distortion"] == "none" else "all_or_nothing",
+                "type": "QUESTION" if values["type"] == "QUESTION" else "FEELING",
+                "intent": values["intent"] if values["intent"] != "other" else "VENT",
+                "emotion": emotion,
+            }
+            yield (
+                signals,
+                "CRITICAL" if values["risk"] == "CRITICAL" else "HIGH",
+                values["state"] if values["state"] != "other" else "UNKNOWN",
+                values["mode"] if values["mode"] != "other" else "unknown",
+                Policy.CBT.value if values["sticky"] == "CBT" else Policy.SUPPORTIVE.value,
+            )
+
+
+class Command(BaseCommand):
+    help = 'Dump the chat policy decision table (DecisionLayer) for review, or verify it against the reference rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'json', 'rules'], default='csv',
+                            help='csv/json: one row per input combination; rules: the ordered rule list')
+        parser.add_argument('--output', help='Write to this file instead of stdout')
+        parser.add_argument('--verify', action='store_true',
+                            help='Replay every combination through the pre-table implementation; exit 1 on any difference')
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            return self.verify()
+
+        out = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            if options['format'] == 'rules':
+                for position, (name, when, policy, locks) in enumerate(POLICY_RULES, 1):
+                    conditions = ' AND '.join(f'{dim} in {sorted(allowed)}' for dim, allowed in when.items()) or 'always'
+                    out.write(f'{position:2d}. {name}: {conditions} -> {policy.value}{" (locks help mode)" if locks else ""}\n')
+            elif options['format'] == 'json':
+                rows = [{**dict(zip(DIMENSIONS, key)), 'policy': policy, 'locks_help_mode': locks, 'rule': rule}
+                        for key, (policy, locks, rule) in DECISION_TABLE.items()]
+                json.dump(rows, out, indent=1)
+                out.write('\n')
+            else:
+                writer = csv.writer(out)
+                writer.writerow([*DIMENSIONS, 'policy', 'locks_help_mode', 'rule'])
+                for key, (policy, locks, rule) in DECISION_TABLE.items():
+                    writer.writerow([*key, policy, locks, rule])
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f'✅ Wrote {len(DECISION_TABLE)} rows to {options["output"]}'))
+
+    def verify(self):
+        checked = 0
+        mismatches = []
+        for key in DECISION_TABLE:
+            for signals, risk, state, mode, current_policy in raw_inputs(key):
+                checked += 1
+                # Through the public entry point, so the discretization is checked too
+                policy, locks, rule = DecisionLayer.decide(signals, risk, state, mode, current_policy)
+                expected = reference_select_policy(signals, risk, state, mode, current_policy)
+                if expected != (policy, locks) or decision_key(signals, risk, state, mode, current_policy) != key:
+                    mismatches.append((key, rule, (policy, locks), expected))
+
+        for key, rule, got, expected in mismatches[:20]:
+            self.stderr.write(f'   {dict(zip(DIMENSIONS, key))}: table {got} via {rule}, reference {expected}')
+        if mismatches:
+            raise CommandError(f'❌ {len(mismatches)} of {checked} input combinations differ from the reference')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Decision table matches the reference on all {checked} input combinations ({len(DECISION_TABLE)} table rows)'
+        ))
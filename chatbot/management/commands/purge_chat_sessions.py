@@ -0,0 +1,17 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chatbot.models import SessionState
+
+
+class Command(BaseCommand):
+    help = 'Delete stored chat FSM state (SessionState rows) not updated for --days days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Keep sessions active within this many days')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = SessionState.objects.filter(updated_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ Deleted {deleted} chat session states older than {options["days"]} days'))
@@ -29,3 +29,16 @@ class ChatMessage(models.Model):
 
     def __str__(self):
         return f"{self.sender}: {self.content[:50]}..."
+
+class SessionState(models.Model):
+    """
+    Serialized SessionFSM (chatbot/core/session_backends.py), shared by all workers.
+    version increases by one on every save; a save only applies if the version it loaded is still current.
+    """
+    session_id = models.CharField(max_length=255, unique=True)
+    data = models.JSONField(default=dict)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.session_id} (v{self.version})"
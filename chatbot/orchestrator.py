@@ -1,90 +1,158 @@
+import time
+from django.conf import settings
 from chatbot.core.input_layer import InputLayer
 from chatbot.core.signal_layer import SignalLayer
 from chatbot.core.safety_layer import SafetyLayer
-from chatbot.core.session_manager import get_session
+from chatbot.core.session_manager import get_session, save_session
 from chatbot.core.decision_layer import DecisionLayer
 from chatbot.core.rag_layer import RAGLayer
 from chatbot.core.generation_layer import GenerationLayer
+from chatbot.core.pipeline import StageGraph
+from chatbot.core.context_budget import context_budget
+
+# Max seconds generation will wait on each concurrent stage before going ahead without it
+STAGE_TIMEOUTS = {
+    "history": 2.0,
+    "rag": 6.0,
+    **getattr(settings, 'CHAT_STAGE_TIMEOUTS', {}),
+}
+# Most recent messages loaded for the prompt; the context token budget decides how many of them fit
+HISTORY_MAX_MESSAGES = getattr(settings, 'CHAT_HISTORY_MAX_MESSAGES', 20)
+
+def _fetch_history(session_id: str) -> list:
+    from chatbot.models import ChatMessage
+    history_msgs = ChatMessage.objects.filter(session__session_id=session_id).order_by('-timestamp')[:HISTORY_MAX_MESSAGES]
+    # Reverse to get chronological order
+    return [
+        {"role": "user" if msg.sender == 'user' else "assistant", "content": msg.content}
+        for msg in reversed(history_msgs)
+    ]
+
+def _send_crisis_alert(session_id: str, text: str):
+    # Retrieve user from DB session if possible
+    from chatbot.models import ChatSession as DBChatSession
+    from chatbot.utils import send_crisis_email
+
+    db_session = DBChatSession.objects.filter(session_id=session_id).first()
+    if db_session and db_session.user:
+        send_crisis_email(db_session.user, text)
 
 class Orchestrator:
     def __init__(self):
         self.signal_layer = SignalLayer()
         self.generation_layer = GenerationLayer()
-        
+
     def process_message(self, session_id: str, text: str, mode: str = 'friend') -> str:
         """
         Executes the 7-Layer Cognitive Architecture.
         """
-        # --- PRE-LAYER: History Retrieval ---
-        from chatbot.models import ChatMessage
-        history_msgs = ChatMessage.objects.filter(session__session_id=session_id).order_by('-timestamp')[:10]
-        # Reverse to get chronological order
-        history_msgs = reversed(history_msgs)
-        formatted_history = [
-            {"role": "user" if msg.sender == 'user' else "assistant", "content": msg.content}
-            for msg in history_msgs
-        ]
+        gen_kwargs, graph = self._prepare(session_id, text, mode)
+        if gen_kwargs is None:
+            return "I'm listening."
+
+        # --- Layer 7: Generation ---
+        # Renders the final response (With Context)
+        gen_start = time.perf_counter()
+        response = self.generation_layer.generate(**gen_kwargs)
+
+        self._finish_turn(graph, gen_kwargs["session"], gen_start)
+        return response
+
+    def stream_message(self, session_id: str, text: str, mode: str = 'friend'):
+        """
+        Streaming variant of process_message.
+        Yields GenerationLayer.stream events: ("token", text) and ("replace", text).
+        """
+        turn_start = time.perf_counter()
+        gen_kwargs, graph = self._prepare(session_id, text, mode)
+        if gen_kwargs is None:
+            yield ("token", "I'm listening.")
+            return
+
+        # --- Layer 7: Generation (Streaming) ---
+        gen_start = time.perf_counter()
+        try:
+            for event in self.generation_layer.stream(**gen_kwargs):
+                # first_token: generation's own latency; ttft: the whole turn's, as the user sees it
+                if "first_token" not in graph.timings:
+                    now = time.perf_counter()
+                    graph.timings["first_token"] = round(now - gen_start, 3)
+                    graph.timings["ttft"] = round(now - turn_start, 3)
+                yield event
+        finally:
+            # Also when the client disconnects mid-stream: the FSM already advanced this turn
+            self._finish_turn(graph, gen_kwargs["session"], gen_start)
 
+    def _prepare(self, session_id: str, text: str, mode: str):
+        """
+        Layers 1-6. The fast layers (1-5) run inline; the slow I/O stages (history fetch,
+        RAG retrieval, crisis alert) run concurrently. Memory summarization runs in the background
+        and never delays the reply.
+        Returns (generation kwargs, StageGraph), or (None, None) if there is nothing to answer.
+        """
         # --- Layer 1: Input ---
         clean_text = InputLayer.process(text)
         if not clean_text:
-            return "I'm listening."
-            
+            return None, None
+
+        graph = StageGraph()
+
+        # --- PRE-LAYER: History Retrieval (concurrent, no dependencies) ---
+        graph.add("history", lambda: _fetch_history(session_id),
+                  timeout=STAGE_TIMEOUTS["history"], default=[])
+
         # --- Layer 2: Signals ---
         # Extracts: Emotion, Intensity, Distortion, etc.
         signals = self.signal_layer.process(clean_text)
-        # Debug log for visibility
-        # print(f"[ORCHESTRATOR] Signals: {signals}")
-        
+
         # --- Layer 3: Risk ---
         # Output: LOW, MEDIUM, HIGH, CRITICAL
         risk_level = SafetyLayer.evaluate(signals)
-        # print(f"[ORCHESTRATOR] Risk: {risk_level}")
-        
+
         # --- Layer 4: FSM State & MEANING MEMORY ---
         # Decides: CHECK_IN vs VALIDATION vs INTERVENTION
         session = get_session(session_id)
-        
-        # 0. Track History (Turn Count for Fix 1)
-        session.history.append("user_msg")
-        
-        # 1. Update Context (Meaning Memory)
-        session.update_context(text, signals)
-        
-        # 2. Update State
-        current_state = session.update_state(signals, risk_level, mode=mode)
-        # print(f"[ORCHESTRATOR] State: {current_state.value}")
-        
-        # --- SAFETY TRIGGER (NEW) ---
-        if risk_level in ["CRITICAL", "HIGH"]:
-             # Retrieve user from DB session if possible
-             try:
-                 from chatbot.models import ChatSession as DBChatSession
-                 from chatbot.utils import send_crisis_email
-                 
-                 db_session = DBChatSession.objects.filter(session_id=session_id).first()
-                 if db_session and db_session.user:
-                     send_crisis_email(db_session.user, text)
-             except Exception as e:
-                 print(f"❌ Error triggering crisis email: {e}")
-
-        # --- Layer 5: Policy ---
-        # Decides: CBT vs SUPPORTIVE vs GROUNDING
-        # Pass SESSION to allow 'Sticky Policy' logic
-        policy = DecisionLayer.select_policy(signals, risk_level, current_state, mode=mode, session=session)
-        
-        # Save Policy for Sticky Logic next return
-        session.current_policy = policy
-        
-        # print(f"[ORCHESTRATOR] Policy: {policy}")
-        
-        # --- Layer 6: RAG ---
+
+        # The background summarizer may save this FSM at any moment; it snapshots under session._lock,
+        # so holding it here means it never persists a half-applied turn
+        with session._lock:
+            # 0. Track History (Turn Count for Fix 1)
+            session.record("user_msg")
+
+            # 1. Update Context (Meaning Memory) - heuristics inline; the story summary is refreshed
+            # in the background (every few turns / on topic shift) and generation uses the latest one.
+            session.update_context(text, signals)
+
+            # 2. Update State
+            current_state = session.update_state(signals, risk_level, mode=mode)
+
+            # --- SAFETY TRIGGER ---
+            # Fire-and-forget: the guardian email must never delay the reply
+            if risk_level in ["CRITICAL", "HIGH"]:
+                graph.add("crisis_alert", lambda: _send_crisis_alert(session_id, text))
+
+            # --- Layer 5: Policy ---
+            # Decides: CBT vs SUPPORTIVE vs GROUNDING
+            # Previous policy drives 'Sticky Policy' logic
+            policy, locks_help_mode, _ = DecisionLayer.decide(
+                signals, risk_level, current_state, mode=mode, current_policy=getattr(session, 'current_policy', None)
+            )
+            if locks_help_mode:
+                session.locked_help_mode = True
+
+            # Save Policy for Sticky Logic next return
+            session.current_policy = policy
+
+        # --- Layer 6: RAG (concurrent) ---
         # Fetches content if policy needs it
-        rag_context = RAGLayer.retrieve(policy, clean_text)
-        
-        # --- Layer 7: Generation ---
-        # Renders the final response (With Context)
-        response = self.generation_layer.generate(
+        graph.add("rag", lambda: RAGLayer.retrieve(policy, clean_text),
+                  timeout=STAGE_TIMEOUTS["rag"], default="")
+
+        # Wait for the concurrent stages (bounded by their timeouts) before generation
+        formatted_history = graph.result("history")
+        rag_context = graph.result("rag")
+
+        gen_kwargs = dict(
             text=clean_text,
             state=current_state.value,
             policy=policy,
@@ -94,11 +162,27 @@ class Orchestrator:
             session=session, # Inject Memory
             history=formatted_history
         )
-        
-        return response
+        return gen_kwargs, graph
+
+    @staticmethod
+    def _finish_turn(graph: StageGraph, session, gen_start: float):
+        graph.timings["generation"] = round(time.perf_counter() - gen_start, 3)
+        # Kept on the session (prompt token counts too, aggregated in context_stats()), not logged per turn
+        session.stage_timings = graph.timings
+        # Persist the FSM so the next turn sees it on any worker
+        save_session(session)
 
 # Global instance
 _orchestrator = Orchestrator()
 
 def process_message(session_id: str, text: str, mode: str = 'friend') -> str:
     return _orchestrator.process_message(session_id, text, mode)
+
+def stream_message(session_id: str, text: str, mode: str = 'friend'):
+    return _orchestrator.stream_message(session_id, text, mode)
+
+def signal_stats() -> dict:
+    return _orchestrator.signal_layer.stats()
+
+def context_stats() -> dict:
+    return context_budget.stats()
@@ -0,0 +1,371 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from django.conf import settings
+from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, StorageContext, Settings, load_index_from_storage
+from llama_index.core.indices.utils import embed_nodes
+from llama_index.core.schema import NodeRelationship
+from chatbot.file_lock import locked_file
+
+# Project root (this file is chatbot/rag_index.py)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA_DIR = getattr(settings, 'RAG_DATA_DIR', os.path.join(BASE_DIR, "data"))
+INDEX_DIR = getattr(settings, 'RAG_INDEX_DIR', os.path.join(BASE_DIR, "rag_index"))
+MANIFEST_FILE = "manifest.json"
+# v2: per-document and per-chunk hashes, needed for incremental updates
+MANIFEST_VERSION = 2
+
+# Part of the index manifest: switching models invalidates the persisted vectors
+EMBED_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Serializes every load-modify-persist cycle in this process (file re-index, DB record sync).
+# index_lock() adds a lock file so other processes (gunicorn workers, manage.py) are serialized too.
+INDEX_LOCK = threading.RLock()
+_file_lock_depth = 0  # index_lock() nesting in the thread holding INDEX_LOCK
+
+@contextmanager
+def index_lock(persist_dir: str = INDEX_DIR):
+    """
+    Exclusive lock for building, persisting, swapping or loading the index at persist_dir,
+    across threads and processes. Re-entrant within the holding thread.
+    """
+    global _file_lock_depth
+    with INDEX_LOCK:
+        if _file_lock_depth:
+            _file_lock_depth += 1
+            try:
+                yield
+            finally:
+                _file_lock_depth -= 1
+            return
+
+        with locked_file(f"{persist_dir}.lock"):
+            _file_lock_depth = 1
+            try:
+                yield
+            finally:
+                _file_lock_depth = 0
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def file_hashes(data_dir: str = DATA_DIR, known: dict = None) -> dict:
+    """
+    {relative path: {"hash", "mtime", "size"}} for every file under data_dir.
+    Files whose mtime and size match `known` (a manifest "documents" map) reuse the stored
+    hash instead of being read again, so a large, mostly unchanged corpus is cheap to check.
+    """
+    known = known or {}
+    result = {}
+    for root, dirs, files in os.walk(data_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            stat = os.stat(path)
+            previous = known.get(rel, {})
+            if previous.get("mtime") == stat.st_mtime and previous.get("size") == stat.st_size:
+                content_hash = previous["hash"]
+            else:
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+                content_hash = digest.hexdigest()
+            result[rel] = {"hash": content_hash, "mtime": stat.st_mtime, "size": stat.st_size}
+    return result
+
+def data_hash(data_dir: str = DATA_DIR, files: dict = None, known: dict = None) -> str:
+    """
+    Content hash of every file under data_dir (paths + bytes).
+    Any added, removed, renamed or edited file changes it.
+    """
+    files = files if files is not None else file_hashes(data_dir, known)
+    return _sha256("".join(f"{rel}\0{info['hash']}\n" for rel, info in sorted(files.items())).encode("utf-8"))
+
+def read_manifest(persist_dir: str = INDEX_DIR) -> dict:
+    try:
+        with open(os.path.join(persist_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def load_index(embed_model_name: str = EMBED_MODEL_NAME, data_dir: str = DATA_DIR, persist_dir: str = INDEX_DIR):
+    """
+    Loads the persisted index if it was built from the current data/ contents with the
+    same embedding model. Returns None if it is missing or stale.
+    """
+    manifest = read_manifest(persist_dir)
+    if not manifest:
+        return None
+    if manifest.get("embed_model") != embed_model_name:
+        print(f"⚠️ RAG index was built with {manifest.get('embed_model')}, expected {embed_model_name}")
+        return None
+    if manifest.get("data_hash") != data_hash(data_dir, known=manifest.get("documents")):
+        print("⚠️ RAG index is stale (data/ changed since it was built)")
+        return None
+
+    return load_persisted_index(persist_dir)
+
+def load_persisted_index(persist_dir: str = INDEX_DIR):
+    """
+    Loads the index at persist_dir as is (no staleness checks), tagged with its manifest generation.
+    """
+    index = load_index_from_storage(StorageContext.from_defaults(persist_dir=persist_dir))
+    index.manifest_generation = read_manifest(persist_dir).get("generation")
+    return index
+
+def is_current(index, persist_dir: str = INDEX_DIR) -> bool:
+    """
+    True if index is the copy last persisted at persist_dir (no other process has written since).
+    """
+    generation = getattr(index, "manifest_generation", None)
+    return generation is not None and generation == read_manifest(persist_dir).get("generation")
+
+def chunk_file(data_dir: str, rel_path: str) -> dict:
+    """
+    Loads and splits one file with the global node parser. See chunk_documents.
+    """
+    documents = SimpleDirectoryReader(input_files=[os.path.join(data_dir, rel_path)]).load_data()
+    return chunk_documents(rel_path, documents)
+
+def chunk_documents(key: str, documents: list) -> dict:
+    """
+    Splits the documents of one source (a file path or a DB record key) with the global node parser.
+    Returns {chunk hash: node}. Node ids are derived from the key and chunk hash, so an
+    unchanged chunk keeps its id (and its stored vector) across re-indexing.
+    """
+    chunks = {}
+    for node in Settings.node_parser.get_nodes_from_documents(documents):
+        chunk_hash = _sha256(node.get_content().encode("utf-8"))
+        if chunk_hash in chunks:
+            continue  # Identical chunk twice in one source adds nothing to retrieval
+        node.id_ = f"{key}#{chunk_hash[:16]}"
+        # Neighbour links point at the splitter's random ids, which no longer exist
+        node.relationships.pop(NodeRelationship.PREVIOUS, None)
+        node.relationships.pop(NodeRelationship.NEXT, None)
+        chunks[chunk_hash] = node
+    return chunks
+
+def build_index(embed_model_name: str = EMBED_MODEL_NAME, data_dir: str = DATA_DIR, persist_dir: str = INDEX_DIR, records=None):
+    """
+    Embeds data/ from scratch and persists the index + manifest, then syncs the DB-backed documents into it
+    (records as for upsert_records; all current DB_SOURCES rows by default), so a rebuild never drops them.
+    Returns (index, stats).
+    """
+    files = file_hashes(data_dir)
+    documents = {}
+    nodes = []
+    for rel_path, info in files.items():
+        chunks = chunk_file(data_dir, rel_path)
+        documents[rel_path] = {**info, "chunks": {h: n.id_ for h, n in chunks.items()}}
+        nodes.extend(chunks.values())
+
+    print(f"✅ Loaded {len(files)} documents ({len(nodes)} chunks). Creating AI Index... (This involves heavy processing)")
+    index = VectorStoreIndex(nodes)
+    with index_lock(persist_dir):
+        _persist(index, {"embed_model": embed_model_name, "documents": documents, "records": {}}, persist_dir)
+        if records is None:
+            from chatbot.rag_sources import iter_all_records
+            records = iter_all_records()
+        db_stats = upsert_records(index, records, persist_dir, full_sync=True)
+    return index, {"mode": "full", "chunks": len(nodes), "db": db_stats}
+
+def update_index(embed_model_name: str = EMBED_MODEL_NAME, data_dir: str = DATA_DIR, persist_dir: str = INDEX_DIR):
+    """
+    Incremental re-index: only new or edited files are re-chunked, only chunks whose hash
+    is not already indexed are embedded, and chunks of removed/edited files that no longer
+    exist are deleted. Falls back to build_index when there is no usable v2 manifest.
+    Returns (index, stats).
+    """
+    with index_lock(persist_dir):
+        manifest = read_manifest(persist_dir)
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("embed_model") != embed_model_name:
+            return build_index(embed_model_name, data_dir, persist_dir)
+
+        old_docs = manifest.get("documents", {})
+        files = file_hashes(data_dir, known=old_docs)
+        changed = [rel for rel, info in files.items() if old_docs.get(rel, {}).get("hash") != info["hash"]]
+        removed = [rel for rel in old_docs if rel not in files]
+        stats = {"mode": "incremental", "changed_documents": len(changed), "removed_documents": len(removed),
+                 "embedded_chunks": 0, "deleted_chunks": 0}
+
+        index = load_persisted_index(persist_dir)
+        if not changed and not removed:
+            if any(old_docs[rel].get("mtime") != files[rel]["mtime"] for rel in files):
+                # Only mtimes moved (e.g. fresh checkout); refresh them so the next check is cheap
+                manifest["documents"] = {rel: {**old_docs[rel], **files[rel]} for rel in files}
+                _persist(index, manifest, persist_dir)
+            return index, stats
+
+        # 1. Removed files: drop all their chunks
+        to_delete = [node_id for rel in removed for node_id in old_docs[rel]["chunks"].values()]
+
+        # 2. New/edited files: embed only chunks we haven't seen, drop chunks that disappeared
+        to_insert = []
+        documents = {rel: old_docs[rel] for rel in files if rel not in changed}
+        for rel in changed:
+            old_chunks = old_docs.get(rel, {}).get("chunks", {})
+            chunks = chunk_file(data_dir, rel)
+            to_insert.extend(node for h, node in chunks.items() if h not in old_chunks)
+            to_delete.extend(node_id for h, node_id in old_chunks.items() if h not in chunks)
+            documents[rel] = {**files[rel], "chunks": {h: n.id_ for h, n in chunks.items()}}
+
+        if to_delete:
+            index.delete_nodes(to_delete, delete_from_docstore=True)
+        if to_insert:
+            index.insert_nodes(to_insert)
+        stats.update(embedded_chunks=len(to_insert), deleted_chunks=len(to_delete))
+
+        manifest["documents"] = documents
+        _persist(index, manifest, persist_dir)
+        print(f"🔁 RAG index updated: {stats}")
+        return index, stats
+
+def upsert_records(index, records: dict, persist_dir: str = INDEX_DIR, full_sync: bool = False, batch_size: int = 64,
+                   write_lock=None):
+    """
+    Applies DB-backed documents to an already loaded index and persists it once.
+    records: {record key: [Document, ...] or None (deleted)}; may be a generator of (key, documents)
+    pairs so large tables are streamed. Only chunks whose hash is new get embedded, in batches of batch_size;
+    a record whose citation ("source" metadata, e.g. its disorder's name) changed is re-embedded whole.
+    full_sync=True also deletes indexed records that are absent from `records`.
+    write_lock: held only while the embedded chunks are swapped into the index, for an index that is
+    being searched at the same time (doc_engine's live index).
+    Returns stats.
+    """
+    with index_lock(persist_dir):
+        manifest = read_manifest(persist_dir)
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise RuntimeError("RAG index has no v2 manifest; run 'manage.py build_rag_index' first")
+
+        old_records = manifest.get("records", {})
+        new_records = {} if full_sync else dict(old_records)
+        stats = {"records": 0, "embedded_chunks": 0, "deleted_chunks": 0}
+        to_delete = []
+        to_insert = []
+        pending = []
+
+        items = records.items() if isinstance(records, dict) else records
+        for key, documents in items:
+            old_record = old_records.get(key, {})
+            old_chunks = old_record.get("chunks", {})
+            if documents is None:
+                to_delete.extend(old_chunks.values())
+                new_records.pop(key, None)
+                continue
+
+            stats["records"] += 1
+            content_hash = _sha256("".join(d.get_content() for d in documents).encode("utf-8"))
+            source = documents[0].metadata.get("source")
+            if old_record.get("hash") == content_hash and old_record.get("source") == source:
+                new_records[key] = old_record
+                continue
+
+            chunks = chunk_documents(key, documents)
+            if old_record.get("source") != source:
+                # Same text, new citation: every chunk (same ids) is replaced
+                old_chunks = {}
+                to_delete.extend(old_record.get("chunks", {}).values())
+            pending.extend(node for h, node in chunks.items() if h not in old_chunks)
+            to_delete.extend(node_id for h, node_id in old_chunks.items() if h not in chunks)
+            new_records[key] = {"hash": content_hash, "source": source, "chunks": {h: n.id_ for h, n in chunks.items()}}
+
+            if len(pending) >= batch_size:
+                to_insert.extend(_embedded(pending))
+                pending = []
+
+        to_insert.extend(_embedded(pending))
+        if full_sync:
+            to_delete.extend(node_id for key in old_records if key not in new_records
+                             for node_id in old_records[key]["chunks"].values())
+
+        # Embedding is done; the index itself changes in one short step (deletes first: replaced chunks keep their ids)
+        with write_lock or nullcontext():
+            if to_delete:
+                index.delete_nodes(to_delete, delete_from_docstore=True)
+            if to_insert:
+                index.insert_nodes(to_insert)
+        stats["embedded_chunks"] = len(to_insert)
+        stats["deleted_chunks"] = len(to_delete)
+
+        # Re-saving rows that didn't change rewrites nothing
+        if to_delete or to_insert or new_records != old_records:
+            manifest["records"] = new_records
+            _persist(index, manifest, persist_dir)
+        return stats
+
+def _embedded(nodes: list) -> list:
+    """
+    nodes with their embeddings filled in (one batched call), so inserting them doesn't embed.
+    """
+    if nodes:
+        embeddings = embed_nodes(nodes, Settings.embed_model)
+        for node in nodes:
+            node.embedding = embeddings[node.node_id]
+    return nodes
+
+def load_or_build(embed_model_name: str = EMBED_MODEL_NAME, data_dir: str = DATA_DIR, persist_dir: str = INDEX_DIR, build_if_stale: bool = True):
+    start = time.perf_counter()
+    # Under the index lock: a worker starting while another process builds or swaps the index waits for it,
+    # then loads the result instead of seeing a missing directory or rebuilding it again
+    with index_lock(persist_dir):
+        try:
+            index = load_index(embed_model_name, data_dir, persist_dir)
+        except Exception as e:
+            print(f"⚠️ Could not load persisted RAG index: {e}")
+            index = None
+
+        if index is not None:
+            print(f"✅ RAG index loaded from disk in {(time.perf_counter() - start) * 1000:.0f}ms")
+            return index
+
+        if not build_if_stale:
+            print("⚠️ No usable RAG index on disk. Run: python manage.py build_rag_index")
+            return None
+
+        print("📂 Updating RAG index from data/ (run 'manage.py build_rag_index' at deploy time to skip this)")
+        try:
+            index, _ = update_index(embed_model_name, data_dir, persist_dir)
+        except Exception as e:
+            print(f"⚠️ Incremental RAG update failed ({e}), rebuilding from scratch")
+            index, _ = build_index(embed_model_name, data_dir, persist_dir)
+        return index
+
+def _persist(index, manifest: dict, persist_dir: str):
+    """
+    Writes the index + manifest to a temp dir and swaps it in,
+    so concurrent readers never see a half-written index.
+    Call with index_lock(persist_dir) held.
+    """
+    manifest = {
+        **manifest,
+        "version": MANIFEST_VERSION,
+        "data_hash": data_hash(files=manifest.get("documents", {})),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        # Lets a process tell whether its in-memory copy is still the latest persisted one (is_current)
+        "generation": uuid.uuid4().hex,
+    }
+
+    tmp_dir = f"{persist_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    index.storage_context.persist(persist_dir=tmp_dir)
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    _swap_dir(tmp_dir, persist_dir)
+    index.manifest_generation = manifest["generation"]
+    print(f"💾 RAG index persisted to {persist_dir}")
+
+def _swap_dir(new_dir: str, target_dir: str):
+    old_dir = f"{target_dir}.old-{os.getpid()}"
+    if os.path.exists(target_dir):
+        os.replace(target_dir, old_dir)
+    os.replace(new_dir, target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
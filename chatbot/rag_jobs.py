@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_delete, post_save
+from chatbot.file_lock import locked_file
+
+# Rows per DB round trip when streaming whole tables into the index
+SYNC_BATCH_SIZE = getattr(settings, 'RAG_SYNC_BATCH_SIZE', 200)
+# Record keys waiting to be embedded, shared by every process (next to the index, like its lock file)
+SYNC_QUEUE_FILE = f"{getattr(settings, 'RAG_INDEX_DIR', os.path.join(settings.BASE_DIR, 'rag_index'))}.pending"
+
+class ReindexJob:
+    """
+    Runs an incremental RAG re-index on a background thread of this worker.
+    One run at a time; status() reports the last/current run for the admin endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.state = "idle"  # idle | running | done | failed
+        self.started_at = None
+        self.finished_at = None
+        self.stats = {}
+        self.error = None
+
+    def start(self, force: bool = False) -> bool:
+        """
+        Returns False if a run is already in progress.
+        """
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self.state = "running"
+            self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.finished_at = None
+            self.stats = {}
+            self.error = None
+            self._thread = threading.Thread(target=self._run, args=(force,), daemon=True, name="maa-rag-reindex")
+            self._thread.start()
+            return True
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stats": self.stats,
+            "error": self.error,
+        }
+
+    def _run(self, force: bool):
+        from chatbot import doc_engine
+        from chatbot.rag_index import EMBED_MODEL_NAME, build_index, index_lock, update_index, upsert_records
+        from chatbot.rag_sources import iter_all_records
+
+        start = time.perf_counter()
+        try:
+            # Configures Settings.embed_model (no-op if this worker already served RAG)
+            doc_engine.ensure_ready()
+            # Held throughout so a record sync (here or in another worker) can't persist in between the two steps
+            with index_lock():
+                # 1. data/ files
+                # 2. DB content: embed new/edited rows, drop deleted ones (a full build re-adds them all)
+                if force:
+                    index, self.stats = build_index(EMBED_MODEL_NAME, records=iter_all_records(SYNC_BATCH_SIZE))
+                else:
+                    index, self.stats = update_index(EMBED_MODEL_NAME)
+                    self.stats["db"] = upsert_records(index, iter_all_records(SYNC_BATCH_SIZE), full_sync=True)
+                # Serve the new index from this worker right away; the others reload it within
+                # doc_engine.RELOAD_CHECK_SECONDS (the manifest generation changed)
+                doc_engine.set_index(index)
+            self.stats["seconds"] = round(time.perf_counter() - start, 2)
+            self.state = "done"
+        except Exception as e:
+            print(f"❌ RAG reindex failed: {e}")
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self.finished_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+            close_old_connections()
+
+
+class RecordSyncQueue:
+    """
+    Incremental upserts of DB-backed RAG documents, fed by post_save/post_delete.
+    A save only appends its record key to a queue file shared by all processes: nothing is embedded or
+    loaded in the process that saved. Workers already serving RAG drain the queue from doc_engine's
+    periodic index check, so edits made within one check interval are embedded and persisted together,
+    and the other workers then reload the new index generation.
+    """
+
+    def __init__(self, path=SYNC_QUEUE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+        self.synced_records = 0
+        self.failed_batches = 0
+
+    def enqueue(self, *keys):
+        with locked_file(self.path) as f:
+            f.write("".join(f"{key}\n" for key in keys).encode("utf-8"))
+
+    def pending(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                return len(set(f.read().decode("utf-8").split()))
+        except FileNotFoundError:
+            return 0
+
+    def _take(self) -> set:
+        with locked_file(self.path) as f:
+            f.seek(0)
+            keys = set(f.read().decode("utf-8").split())
+            f.truncate(0)
+        return keys
+
+    def drain(self):
+        """
+        Embeds every queued record into the index and serves the result from this worker.
+        Needs doc_engine set up with an embedding model, so only serving workers call it.
+        Returns the upsert stats, or None if the queue was empty or the sync failed (keys are re-queued).
+        """
+        keys = self._take()
+        return self.sync(keys) if keys else None
+
+    def sync(self, keys):
+        from chatbot import doc_engine
+        from chatbot.rag_index import INDEX_DIR, index_lock, is_current, load_persisted_index, upsert_records
+        from chatbot.rag_sources import load_records
+
+        try:
+            records = load_records(keys)
+            with index_lock():
+                index = doc_engine.index
+                write_lock = doc_engine.live_index_lock
+                if index is None or not is_current(index):
+                    # Another process persisted since this worker loaded its copy: start from theirs
+                    index = load_persisted_index(INDEX_DIR)
+                    write_lock = None
+                # Only the changed chunks are embedded, and the index is persisted once for the whole batch
+                stats = upsert_records(index, records, write_lock=write_lock)
+                if index is not doc_engine.index or stats["embedded_chunks"] or stats["deleted_chunks"]:
+                    doc_engine.set_index(index)
+            with self._lock:
+                self.synced_records += len(records)
+            print(f"🔁 RAG records synced: {stats}")
+            return stats
+        except Exception as e:
+            # Back in the queue: the next check retries them
+            self.enqueue(*keys)
+            with self._lock:
+                self.failed_batches += 1
+            print(f"❌ RAG record sync failed ({len(keys)} record(s)): {e}")
+            return None
+        finally:
+            close_old_connections()
+
+# Global instances
+reindex_job = ReindexJob()
+record_sync_queue = RecordSyncQueue()
+
+def _on_record_change(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata: the reindex job / build_rag_index will pick these up
+        return
+    from chatbot.rag_sources import child_record_keys, record_key
+    keys = [record_key(sender._meta.label, instance.pk)]
+    if kwargs.get("signal") is post_save:
+        # Children cite their parent by name (e.g. "Article: X (Anxiety)"); unchanged ones are skipped by hash
+        keys.extend(child_record_keys(sender._meta.label, instance.pk))
+    # Enqueue after commit, so the worker reads the saved row (and never a rolled-back one)
+    transaction.on_commit(lambda: record_sync_queue.enqueue(*keys))
+
+def connect_record_signals():
+    from django.apps import apps
+    from chatbot.rag_sources import DB_SOURCES
+
+    for label in DB_SOURCES:
+        model = apps.get_model(label)
+        post_save.connect(_on_record_change, sender=model, dispatch_uid=f"rag_sync_save_{label}")
+        post_delete.connect(_on_record_change, sender=model, dispatch_uid=f"rag_sync_delete_{label}")
@@ -0,0 +1,90 @@
+# Admin-curated content that retrieval should see, next to the data/ text files.
+# model label -> (text field, title field)
+DB_SOURCES = {
+    "auth_api.Disorder": ("summary", "name"),
+    "auth_api.Article": ("content", "title"),
+    "auth_api.CopingMethod": ("instructions", "title"),
+    "auth_api.RoadmapStep": ("description", "title"),
+}
+
+# Identifiers are stored on each chunk but kept out of the embedding and the prompt
+_HIDDEN_METADATA = ["record", "model", "pk"]
+
+def record_key(label: str, pk) -> str:
+    return f"{label.lower()}:{pk}"
+
+def _model(label: str):
+    from django.apps import apps
+    return apps.get_model(label)
+
+def record_documents(label: str, obj) -> list:
+    """
+    One llama-index Document for a DB row, or None if it has no text (treated as a delete).
+    """
+    # Imported here: this module is loaded by ChatbotConfig.ready (DB_SOURCES) and must stay cheap
+    from llama_index.core import Document
+
+    text_field, title_field = DB_SOURCES[label]
+    text = (getattr(obj, text_field) or "").strip()
+    if not text:
+        return None
+
+    title = getattr(obj, title_field)
+    disorder = getattr(obj, "disorder", None)
+    kind = label.split(".")[1]
+    metadata = {
+        "source": f"{kind}: {title}" + (f" ({disorder.name})" if disorder else ""),
+        "record": record_key(label, obj.pk),
+        "model": label,
+        "pk": obj.pk,
+    }
+    return [Document(
+        text=f"{title}\n\n{text}",
+        metadata=metadata,
+        excluded_embed_metadata_keys=_HIDDEN_METADATA,
+        excluded_llm_metadata_keys=_HIDDEN_METADATA,
+    )]
+
+def iter_all_records(batch_size: int = 200):
+    """
+    Streams (record key, documents) for every row of every source, batch_size rows per DB round trip.
+    """
+    for label, (text_field, title_field) in DB_SOURCES.items():
+        model = _model(label)
+        queryset = model.objects.order_by("pk")
+        if label != "auth_api.Disorder":
+            queryset = queryset.select_related("disorder")
+        for obj in queryset.iterator(chunk_size=batch_size):
+            yield record_key(label, obj.pk), record_documents(label, obj)
+
+def child_record_keys(label: str, pk) -> list:
+    """
+    Keys of the rows whose documents mention this row (Articles/CopingMethods/RoadmapSteps of a Disorder).
+    """
+    if label != "auth_api.Disorder":
+        return []
+    return [
+        record_key(child, child_pk)
+        for child in DB_SOURCES if child != label
+        for child_pk in _model(child).objects.filter(disorder_id=pk).values_list("pk", flat=True)
+    ]
+
+def load_records(keys) -> dict:
+    """
+    {record key: documents or None} for specific rows (None when the row is gone or empty).
+    """
+    by_label = {}
+    for key in keys:
+        model_name, pk = key.split(":", 1)
+        by_label.setdefault(model_name, []).append(pk)
+
+    records = {}
+    for label in DB_SOURCES:
+        pks = by_label.get(label.lower())
+        if not pks:
+            continue
+        found = {str(obj.pk): obj for obj in _model(label).objects.filter(pk__in=pks)}
+        for pk in pks:
+            obj = found.get(pk)
+            records[record_key(label, pk)] = record_documents(label, obj) if obj else None
+    return records
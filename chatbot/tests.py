@@ -0,0 +1,317 @@
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+
+from auth_api.models import Article, Disorder
+from chatbot import doc_engine
+from chatbot.models import ChatMessage
+from chatbot.rag_jobs import RecordSyncQueue
+from chatbot.core.context_budget import ContextBudget, TokenCounter
+from chatbot.core.decision_layer import DECISION_TABLE, DecisionLayer, decision_key
+from chatbot.core.keyword_matcher import KeywordMatcher
+from chatbot.core.lexicon import LEXICON_PATH, load_lexicon
+from chatbot.core.pipeline import StageGraph
+from chatbot.core.session_backends import DBSessionBackend, merge_queue
+from chatbot.core.session_manager import SessionFSM, SessionStore, State
+from chatbot.core.signal_layer import SignalLayer
+from chatbot.management.commands.policy_table import raw_inputs, reference_select_policy
+
+
+class RecordSyncSignalTests(TestCase):
+    def test_renaming_a_disorder_resyncs_its_children(self):
+        disorder = Disorder.objects.create(name='Anxiety', summary='Worry that lingers.')
+        article = Article.objects.create(disorder=disorder, title='Breathing', content='Slow breaths help.')
+
+        with mock.patch('chatbot.rag_jobs.record_sync_queue') as queue:
+            with self.captureOnCommitCallbacks(execute=True):
+                disorder.name = 'Generalized anxiety'
+                disorder.save()
+        enqueued = {key for call in queue.enqueue.call_args_list for key in call.args}
+        self.assertEqual(enqueued, {f'auth_api.disorder:{disorder.pk}', f'auth_api.article:{article.pk}'})
+
+
+class RecordSyncQueueTests(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.pending')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def test_queue_is_shared_through_the_file(self):
+        # e.g. the admin's worker enqueues, a worker serving chat drains
+        RecordSyncQueue(self.path).enqueue('auth_api.article:1', 'auth_api.disorder:2')
+        RecordSyncQueue(self.path).enqueue('auth_api.article:1')
+        consumer = RecordSyncQueue(self.path)
+        self.assertEqual(consumer.pending(), 2)
+
+        with mock.patch.object(consumer, 'sync') as sync:
+            consumer.drain()
+        sync.assert_called_once_with({'auth_api.article:1', 'auth_api.disorder:2'})
+        self.assertEqual(consumer.pending(), 0)
+
+    def test_failed_sync_requeues_keys(self):
+        queue = RecordSyncQueue(self.path)
+        queue.enqueue('auth_api.article:1')
+        with mock.patch('chatbot.rag_sources.load_records', side_effect=Exception('db down')), \
+                mock.patch('builtins.print'):
+            self.assertIsNone(queue.drain())
+        self.assertEqual((queue.pending(), queue.failed_batches), (1, 1))
+
+
+class DocEngineRefreshTests(TestCase):
+    def refresh(self, served, manifest):
+        new_index = SimpleNamespace(manifest_generation=manifest.get('generation'))
+        with mock.patch.object(doc_engine, 'index', served), \
+                mock.patch.object(doc_engine, 'embedder_available', False), \
+                mock.patch('chatbot.rag_index.read_manifest', return_value=manifest), \
+                mock.patch('chatbot.rag_index.load_or_build', return_value=new_index), \
+                mock.patch.object(doc_engine, 'set_index') as set_index, \
+                mock.patch('builtins.print'):
+            doc_engine._refresh()
+        return set_index.call_args.args[0] if set_index.called else None
+
+    def test_reloads_a_newer_generation(self):
+        served = SimpleNamespace(manifest_generation='a')
+        self.assertEqual(self.refresh(served, {'generation': 'b'}).manifest_generation, 'b')
+        self.assertIsNone(self.refresh(served, {'generation': 'a'}))
+
+    def test_loads_an_index_built_after_startup(self):
+        self.assertIsNone(self.refresh(None, {}))
+        self.assertEqual(self.refresh(None, {'generation': 'a'}).manifest_generation, 'a')
+
+
+class KeywordMatcherTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.categories = load_lexicon(LEXICON_PATH)['categories']
+        cls.matcher = KeywordMatcher(cls.categories)
+
+    def test_inflected_forms_keep_substring_matches(self):
+        words = [
+            'panicking', 'panicked', 'panics', 'worried', 'worries', 'stabbed', 'stabbing', 'failure', 'failed',
+            'crying', 'cried', 'hurting', 'tears', 'hating', 'dying', 'killed', 'killing', 'hanging', 'jumped',
+            'overdosed', 'murdered', 'heaviness', 'stopped', 'ended', 'blamed', 'suggested', 'helped',
+            'harmful', 'murderer', 'killer', 'painful', 'fearful', 'hateful', 'hater', 'sadder', 'heavier',
+        ]
+        for word in words:
+            # What the old per-list `phrase in text` checks found
+            legacy = {category for category, phrases in self.categories.items() if any(p in word for p in phrases)}
+            with self.subTest(word=word):
+                self.assertTrue(legacy <= set(self.matcher.scan(word)), legacy - set(self.matcher.scan(word)))
+        self.assertIn('emotion_anxious', self.matcher.scan('worried'))
+        self.assertIn('crisis', self.matcher.scan('dying'))
+        self.assertIn('crisis', self.matcher.scan('harmful'))
+        self.assertIn('crisis', self.matcher.scan('murderer'))
+
+    def test_matches_whole_words_only(self):
+        for text in ('skill', 'friend', 'weekend', 'endure', 'cryptic', 'shanghai', 'diet'):
+            with self.subTest(text=text):
+                self.assertEqual(self.matcher.scan(text), {})
+        self.assertEqual(self.matcher.scan('i will kill him'), {'crisis': [(7, 'kill')], 'crisis_ambiguous': [(7, 'kill')]})
+
+
+class HelpLockTests(TestCase):
+    def turn(self, text):
+        fsm = SessionFSM('s')
+        fsm.state, fsm.locked_help_mode = State.INTERVENTION, True
+        state = fsm.update_state(SignalLayer().keyword_signals(text)[0], 'LOW')
+        return state, fsm.locked_help_mode
+
+    def test_explicit_phrases_release_the_lock(self):
+        for text in ('thank you', 'thanks, that helped', "i'm feeling better"):
+            with self.subTest(text=text):
+                self.assertEqual(self.turn(text), (State.CONCLUSION, False))
+
+    def test_common_words_keep_the_lock(self):
+        for text in ('okay', 'good idea but it is not clear to me', 'okay what next'):
+            with self.subTest(text=text):
+                self.assertEqual(self.turn(text), (State.INTERVENTION, True))
+
+
+@mock.patch('chatbot.core.signal_layer.ML_TIER', True)
+@mock.patch('chatbot.core.signal_layer.LLM_ESCALATION', True)
+class SignalLayerCrisisTests(TestCase):
+    def process(self, text, llm_reply, ml_reply=('neutral', 0.0)):
+        with mock.patch('chatbot.core.signal_layer.ml_client') as ml_client, \
+                mock.patch('chatbot.core.signal_layer.get_llm') as get_llm:
+            ml_client.predict_text.return_value = ml_reply
+            get_llm.return_value.invoke.return_value.content = llm_reply
+            return SignalLayer().process(text), get_llm
+
+    def test_llm_cannot_clear_a_keyword_crisis(self):
+        signals, get_llm = self.process('i could kill him right now', '{"emotion": "ANGRY", "hopelessness": false}')
+        self.assertTrue(get_llm.called)
+        self.assertEqual(signals['emotion'], 'ANGRY')
+        self.assertTrue(signals['hopelessness'])
+
+    def test_self_harm_phrases_are_not_ambiguous(self):
+        for text in ('i keep thinking about killing myself', 'i want to hang myself', 'i want to end my life',
+                     "i don't want to live anymore"):
+            with self.subTest(text=text):
+                signals, get_llm = self.process(text, '{"hopelessness": false}')
+                self.assertTrue(signals['hopelessness'])
+                self.assertFalse(SignalLayer._crisis_ambiguous(SignalLayer().keyword_signals(text)[1]))
+
+    def test_ml_tier_only_picks_among_keyword_emotions(self):
+        # Keywords found no emotion: the model's confident "happy" (which includes surprise) is ignored
+        signals, _ = self.process('the bus was late', '{}', ml_reply=('happy', 0.99))
+        self.assertEqual(signals['emotion'], 'NEUTRAL')
+        # Keywords found SAD and HAPPY: the model picks between them, but can't bring in a third emotion
+        signals, _ = self.process('sad but happy', '{}', ml_reply=('happy', 0.9))
+        self.assertEqual(signals['emotion'], 'HAPPY')
+        signals, _ = self.process('sad but happy', '{}', ml_reply=('angry', 0.9))
+        self.assertEqual(signals['emotion'], 'SAD')
+
+    def test_keywords_alone_when_tiers_are_off(self):
+        with mock.patch('chatbot.core.signal_layer.ML_TIER', False), \
+                mock.patch('chatbot.core.signal_layer.LLM_ESCALATION', False):
+            signals, get_llm = self.process('i could kill him right now', '{"emotion": "HAPPY"}', ml_reply=('happy', 0.99))
+        self.assertFalse(get_llm.called)
+        self.assertTrue(signals['hopelessness'])
+
+
+class HeuristicCounter(TokenCounter):
+    # ~4 characters per token whether or not tiktoken's encoding is available
+    def _get_encoding(self):
+        return None
+
+
+class ContextBudgetTests(TestCase):
+    def budget(self, tokens):
+        return ContextBudget(budget=tokens, shares={"memory": 0.1, "rag": 0.45, "history": 0.45},
+                             counter=HeuristicCounter())
+
+    @staticmethod
+    def message(n):
+        # "USER: " + content = 40 characters = 10 tokens
+        return {"role": "user", "content": f"message {n:02d} ".ljust(34, "x")}
+
+    @staticmethod
+    def excerpt(rank):
+        # 40 characters = 10 tokens, in RAGLayer.format_chunks' format
+        return f"[{rank}] (from doc{rank}.txt)\n".ljust(40, "y")
+
+    def test_oldest_history_is_dropped_first(self):
+        history = [self.message(n) for n in range(3)]
+        # Memory and RAG are empty, so history gets the whole budget, not just its share
+        _, _, kept, usage = self.budget(20).fit("", "", history)
+        self.assertEqual(kept, history[1:])
+        self.assertEqual(usage["history_dropped"], 1)
+        self.assertTrue(usage["trimmed"])
+
+    def test_rag_keeps_best_ranked_excerpts(self):
+        excerpts = [self.excerpt(rank) for rank in range(1, 4)]
+        _, rag, _, _ = self.budget(25).fit("", "\n\n".join(excerpts), [])
+        self.assertEqual(rag, "\n\n".join(excerpts[:2]))
+
+    def test_oversized_newest_message_is_cut(self):
+        history = [self.message(0), {"role": "user", "content": "word " * 100}]
+        _, _, kept, usage = self.budget(20).fit("", "", history)
+        self.assertEqual(len(kept), 1)
+        self.assertTrue(kept[0]["content"].startswith("word word") and kept[0]["content"].endswith(" …"))
+        self.assertEqual(usage["history_dropped"], 1)
+        self.assertLessEqual(usage["history"], 20)
+
+    def test_unused_share_goes_to_parts_that_need_more(self):
+        memory = "User is anxious about exams."  # 7 tokens
+        excerpts = [self.excerpt(rank) for rank in range(1, 21)]
+        history = [self.message(0)]
+        fitted_memory, rag, kept, usage = self.budget(100).fit(memory, "\n\n".join(excerpts), history)
+        self.assertEqual((fitted_memory, kept), (memory, history))
+        # RAG's share is 45 tokens; memory and history leave 38 more for it (7 excerpts and separators)
+        self.assertEqual(rag, "\n\n".join(excerpts[:7]))
+        self.assertLessEqual(usage["memory"] + usage["rag"] + usage["history"], 100)
+
+
+class DecisionTableTests(TestCase):
+    def test_table_matches_reference_rules(self):
+        # What `manage.py policy_table --verify` checks: every input combination, through decide()
+        mismatches = []
+        for key in DECISION_TABLE:
+            for inputs in raw_inputs(key):
+                policy, locks, rule = DecisionLayer.decide(*inputs)
+                if (policy, locks) != reference_select_policy(*inputs) or decision_key(*inputs) != key:
+                    mismatches.append((key, rule))
+        self.assertEqual(mismatches, [])
+
+
+class StageGraphTests(TestCase):
+    def test_timeout_counts_from_add(self):
+        graph = StageGraph().add("slow", lambda: time.sleep(0.5) or "late", timeout=0.2, default="default")
+        time.sleep(0.15)  # Inline layers run before generation asks for the result
+        start = time.monotonic()
+        self.assertEqual(graph.result("slow"), "default")
+        self.assertLess(time.monotonic() - start, 0.15)
+        self.assertEqual(graph.timings["slow"], "timeout")
+
+    def test_dependencies_pass_results_or_defaults(self):
+        graph = StageGraph()
+        graph.add("fast", lambda: 1, timeout=1.0)
+        graph.add("slow", lambda: time.sleep(0.5) or 2, timeout=0.1, default=0)
+        graph.add("sum", lambda fast, slow: fast + slow, deps=("fast", "slow"), timeout=1.0)
+        self.assertEqual(graph.result("sum"), 1)
+
+
+class ChatStreamTests(TestCase):
+    def test_disconnect_mid_stream_saves_partial_reply(self):
+        def stream(session_id, query, mode):
+            yield ("token", "It sounds ")
+            yield ("token", "like a lot.")
+            yield ("token", " Want to talk about it?")
+
+        with mock.patch('chatbot.views.stream_message', stream), mock.patch('chatbot.views.log_chat') as log_chat:
+            response = self.client.post('/api/chat/stream/', {'session_id': 's1', 'query': 'exams are too much'},
+                                        content_type='application/json')
+            events = iter(response.streaming_content)
+            next(events)
+            next(events)
+            response.close()  # What the server does when the client goes away
+
+        self.assertEqual(list(ChatMessage.objects.order_by('pk').values_list('sender', 'content')),
+                         [('user', 'exams are too much'), ('ai', 'It sounds like a lot.')])
+        self.assertTrue(log_chat.called)
+
+
+class SessionMergeTests(TestCase):
+    def setUp(self):
+        # Two workers with their own in-memory caches over the same SessionState table
+        self.worker_a = SessionStore(backend=DBSessionBackend())
+        self.worker_b = SessionStore(backend=DBSessionBackend())
+        session = self.worker_a.get('s1')
+        session.pending_messages = ['first message of the session']
+        session.turns_since_summary = 1
+        self.worker_a.save(session)
+
+    def test_conflicting_writers_keep_both_turns(self):
+        a = self.worker_a.get('s1')
+        b = self.worker_b.get('s1')
+
+        # Worker A takes a turn and saves first
+        a.record('user_msg')
+        a.pending_messages.append('message handled by worker a')
+        self.worker_a.save(a)
+
+        # Worker B (same loaded version) folds the first message into the story and takes a turn
+        b.core_context['story'] = 'User is anxious about exams.'
+        del b.pending_messages[:1]
+        b.record('user_msg')
+        b.pending_messages.append('message handled by worker b')
+        self.worker_b.save(b)
+
+        stored = self.worker_a.get('s1')
+        self.assertEqual(stored.version, 3)
+        self.assertEqual(stored.pending_messages, ['message handled by worker a', 'message handled by worker b'])
+        self.assertEqual(stored.turns_since_summary, 2)
+        self.assertEqual(stored.event_counts['user_msg'], 2)
+        self.assertEqual(stored.core_context['story'], 'User is anxious about exams.')
+
+    def test_queue_merge_keeps_repeated_messages(self):
+        base = ['i feel so tired today']
+        ours = base + ['i feel so tired today']
+        theirs = base + ['cannot sleep at all lately']
+        self.assertEqual(merge_queue(base, ours, theirs),
+                         ['i feel so tired today', 'cannot sleep at all lately', 'i feel so tired today'])
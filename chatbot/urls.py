@@ -4,7 +4,15 @@ from . import views
 urlpatterns = [
     path('', views.root, name='root'),
     path('chat/', views.chat_view, name='chat'),
+    path('chat/stream/', views.chat_stream_view, name='chat_stream'),
     path('chat/history/', views.chat_history_view, name='chat_history'),
     path('chat/history/<str:session_id>/', views.session_messages_view, name='session_messages'),
     path('doc-chat/', views.doc_chat_view, name='doc_chat'),
+    path('rag/reindex/', views.rag_reindex_view, name='rag_reindex'),
+    path('rag/stats/', views.rag_stats_view, name='rag_stats'),
+    path('chat/sessions/stats/', views.session_stats_view, name='session_stats'),
+    path('chat/signals/stats/', views.signal_stats_view, name='signal_stats'),
+    path('chat/context/stats/', views.context_stats_view, name='context_stats'),
+    path('chat/lexicon/', views.lexicon_status_view, name='lexicon_status'),
+    path('llm/stats/', views.llm_stats_view, name='llm_stats'),
 ]
@@ -1,12 +1,21 @@
-from rest_framework.decorators import api_view
+import json
+import time
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .serializers import ChatRequestSerializer, ChatResponseSerializer, ChatSessionSerializer, ChatMessageSerializer
+from .serializers import ChatRequestSerializer, ChatSessionSerializer, ChatMessageSerializer
 from .models import ChatSession, ChatMessage
-from .orchestrator import process_message
+from .orchestrator import process_message, stream_message, signal_stats, context_stats
 from .logger import log_chat
 from .doc_engine import query_documents
+from .rag_jobs import reindex_job
+from .core.rag_layer import RAGLayer
+from .core.session_manager import session_store, summarizer
+from .core.lexicon import lexicon
+from mental_health_backend.services.llm_registry import llm_registry
 
 @api_view(['GET'])
 def root(request):
@@ -22,6 +31,72 @@ def chat_view(request):
     query = serializer.validated_data['query']
     mode = serializer.validated_data.get('mode', 'friend')
     
+    chat_session = _save_user_turn(session_id, query, mode)
+
+    # 7-LAYER SYSTEM CALL
+    response_text = process_message(session_id, query, mode=mode)
+    
+    # 3. Save AI Message
+    ChatMessage.objects.create(
+        session=chat_session, 
+        sender='ai', 
+        content=response_text
+    )
+    
+    # Log (legacy redundant but safe to keep)
+    log_chat(session_id, query, response_text, False)
+    
+    return Response({"response": response_text})
+
+@api_view(['POST'])
+def chat_stream_view(request):
+    """
+    Same as chat_view, but streams the reply as Server-Sent Events.
+    Events:
+      token   {"text": "..."}              -> append to the reply
+      replace {"text": "..."}              -> discard what was shown, show this instead
+      done    {"response": "...", "ttft": s} -> final persisted reply
+    """
+    serializer = ChatRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    session_id = serializer.validated_data['session_id']
+    query = serializer.validated_data['query']
+    mode = serializer.validated_data.get('mode', 'friend')
+
+    chat_session = _save_user_turn(session_id, query, mode)
+
+    def event_stream():
+        start = time.perf_counter()
+        ttft = None
+        response_text = ""
+
+        try:
+            # 7-LAYER SYSTEM CALL (Streaming); time to first token is also kept in the session's stage timings
+            for kind, chunk in stream_message(session_id, query, mode=mode):
+                if ttft is None:
+                    ttft = round(time.perf_counter() - start, 3)
+                response_text = response_text + chunk if kind == "token" else chunk
+                yield _sse(kind, {"text": chunk})
+        finally:
+            # 3. Save AI Message, also the partial reply when the client disconnects mid-stream:
+            # the user message is already saved and the FSM has advanced
+            ChatMessage.objects.create(
+                session=chat_session,
+                sender='ai',
+                content=response_text
+            )
+            log_chat(session_id, query, response_text, False)
+
+        yield _sse("done", {"response": response_text, "ttft": ttft})
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx-style proxies from buffering the stream
+    return response
+
+def _save_user_turn(session_id: str, query: str, mode: str) -> ChatSession:
     # --- PERSISTENCE LAYER ---
     # 1. Get or Create Session
     chat_session, created = ChatSession.objects.get_or_create(
@@ -39,21 +114,10 @@ def chat_view(request):
         sender='user', 
         content=query
     )
+    return chat_session
 
-    # 7-LAYER SYSTEM CALL
-    response_text = process_message(session_id, query, mode=mode)
-    
-    # 3. Save AI Message
-    ChatMessage.objects.create(
-        session=chat_session, 
-        sender='ai', 
-        content=response_text
-    )
-    
-    # Log (legacy redundant but safe to keep)
-    log_chat(session_id, query, response_text, False)
-    
-    return Response({"response": response_text})
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @api_view(['GET'])
 def chat_history_view(request):
@@ -91,3 +155,69 @@ def doc_chat_view(request):
     response = query_documents(query)
     log_chat(session_id, query, response, False)
     return Response({"response": response})
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def rag_reindex_view(request):
+    """
+    Staff only. POST starts an incremental re-index of data/ in the background
+    ({"force": true} rebuilds from scratch); GET reports the current/last run.
+    """
+    if request.method == 'GET':
+        return Response(reindex_job.status())
+
+    force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
+    if not reindex_job.start(force=force):
+        return Response(reindex_job.status(), status=status.HTTP_409_CONFLICT)
+    return Response(reindex_job.status(), status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def rag_stats_view(request):
+    """
+    Staff only. Hit rates of the query-embedding and retrieval caches, and of policy-scoped retrieval.
+    """
+    return Response(RAGLayer.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def llm_stats_view(request):
+    """
+    Staff only. Shared Groq clients and per-model request counts / latency.
+    """
+    return Response(llm_registry.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def session_stats_view(request):
+    """
+    Staff only. Live chat sessions in this worker and how many were evicted (LRU cap / idle expiry),
+    plus background story summarization runs.
+    """
+    return Response({**session_store.stats(), "summarizer": summarizer.stats()})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def lexicon_status_view(request):
+    """
+    Staff only. Active keyword lexicon version in this worker, phrases per category and reload errors.
+    """
+    return Response(lexicon.status())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def signal_stats_view(request):
+    """
+    Staff only. Signal extraction per tier (keywords / ML model / LLM): calls and latency,
+    and how often messages were escalated to the LLM and why.
+    """
+    return Response(signal_stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def context_stats_view(request):
+    """
+    Staff only. Prompt size per chat turn in this worker: average tokens per part (instructions, memory,
+    RAG, history, message), the largest prompt, and how many turns had to be trimmed to the budget.
+    """
+    return Response(context_stats())
@@ -0,0 +1,82 @@
+"""
+Import-time regression check: cold-imports the URLconf (django.setup() + mental_health_backend.urls)
+in a fresh interpreter with `python -X importtime` and fails if it gets too slow or pulls in
+modules that only specific requests need (ML / speech / LLM stacks).
+
+Usage:
+    python check_import_budget.py                          # Default budget, exit code 1 on regression
+    python check_import_budget.py --budget-ms 1500 --top 15
+    python check_import_budget.py --settings test_settings # e.g. no Postgres driver installed
+
+Run it in CI or before merging anything that adds a top-level import to a views/urls module.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Must never be imported just to serve the URLconf; import them inside the view that needs them
+FORBIDDEN = [
+    "torch", "transformers", "joblib", "speech_recognition", "pydub",
+    "llama_index", "langchain_groq", "groq",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_import(settings_module):
+    code = "import django; django.setup(); import mental_health_backend.urls"
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, CHAT_WARMUP="False")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit("❌ Importing the URLconf failed")
+
+    # (cumulative us, depth, module) per imported module
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "2000")))
+    parser.add_argument("--settings", default=os.getenv("DJANGO_SETTINGS_MODULE", "mental_health_backend.settings"))
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest top-level imports")
+    args = parser.parse_args()
+
+    rows = profile_import(args.settings)
+    # Top-level rows' cumulative times add up to the whole import
+    top_level = [(us, module) for us, depth, module in rows if depth == 0]
+    total_ms = sum(us for us, _ in top_level) / 1000
+
+    print(f"--- Cold import of the URLconf ({args.settings}) ---")
+    for us, module in sorted(top_level, reverse=True)[:args.top]:
+        print(f"   {us / 1000:8.1f} ms  {module}")
+
+    loaded = {module.split(".")[0] for _, _, module in rows}
+    offenders = [name for name in FORBIDDEN if name in loaded]
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"❌ {total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if offenders:
+        print(f"❌ Heavy modules imported at startup: {', '.join(offenders)}")
+        failed = True
+    if not failed:
+        print(f"✅ {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms), no heavy modules at startup")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
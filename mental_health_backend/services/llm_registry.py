@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from django.conf import settings
+
+# One ChatGroq per (model, temperature), all sharing one pooled HTTP client, so requests reuse
+# TLS connections to api.groq.com instead of each view/session opening its own.
+DEFAULT_MODEL = getattr(settings, 'GROQ_MODEL', None) or os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+# Connection pool shared by every Groq client of this process
+POOL_MAX_CONNECTIONS = getattr(settings, 'LLM_POOL_MAX_CONNECTIONS', 20)
+POOL_KEEPALIVE_SECONDS = getattr(settings, 'LLM_POOL_KEEPALIVE_SECONDS', 60.0)
+LLM_TIMEOUT = getattr(settings, 'LLM_TIMEOUT', 30.0)
+
+class _ModelStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def as_dict(self) -> dict:
+        done = self.requests - self.errors
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_ms / done, 1) if done else 0.0,
+            "max_latency_ms": round(self.max_ms, 1),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+def _make_stats_handler(registry, model: str):
+    """
+    LangChain callback attached to a registry client: times every call (invoke, stream, predict)
+    and records it under the client's model.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class StatsHandler(BaseCallbackHandler):
+        def __init__(self):
+            self._started = {}  # run_id -> perf_counter at start
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            registry._record(model, self._started.pop(run_id, None), usage=usage)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            registry._record(model, self._started.pop(run_id, None), error=True)
+
+    return StatsHandler()
+
+class LLMRegistry:
+    """
+    Process-wide cache of Groq chat clients keyed by (model, temperature).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._stats = {}
+        self._http_client = None
+        self._http_async_client = None
+
+    def http_client(self):
+        """
+        The pooled httpx.Client shared by every client (also usable by non-LangChain Groq wrappers).
+        """
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    import httpx
+                    self._http_client = httpx.Client(limits=self._limits(), timeout=LLM_TIMEOUT)
+        return self._http_client
+
+    def http_async_client(self):
+        if self._http_async_client is None:
+            with self._lock:
+                if self._http_async_client is None:
+                    import httpx
+                    self._http_async_client = httpx.AsyncClient(limits=self._limits(), timeout=LLM_TIMEOUT)
+        return self._http_async_client
+
+    @staticmethod
+    def _limits():
+        import httpx
+        return httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_CONNECTIONS,
+            keepalive_expiry=POOL_KEEPALIVE_SECONDS,
+        )
+
+    def get(self, model: str = None, temperature: float = 0.7):
+        model = model or DEFAULT_MODEL
+        key = (model, round(float(temperature), 3))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        http_client = self.http_client()
+        http_async_client = self.http_async_client()
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                from langchain_groq import ChatGroq
+                client = ChatGroq(
+                    api_key=getattr(settings, 'GROQ_API_KEY', None) or os.getenv("GROQ_API_KEY"),
+                    model_name=model,
+                    temperature=key[1],
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                    callbacks=[_make_stats_handler(self, model)],
+                )
+                self._clients[key] = client
+                self._stats.setdefault(model, _ModelStats())
+        return client
+
+    def _record(self, model: str, started, error: bool = False, usage: dict = None):
+        elapsed = (time.perf_counter() - started) * 1000 if started else 0.0
+        with self._lock:
+            stats = self._stats.setdefault(model, _ModelStats())
+            stats.requests += 1
+            if error:
+                stats.errors += 1
+                return
+            stats.total_ms += elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+            if usage:
+                stats.prompt_tokens += usage.get("prompt_tokens", 0)
+                stats.completion_tokens += usage.get("completion_tokens", 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "clients": [{"model": model, "temperature": temp} for model, temp in self._clients],
+                "models": {model: stats.as_dict() for model, stats in self._stats.items()},
+            }
+
+llm_registry = LLMRegistry()
+
+def get_llm(model: str = None, temperature: float = 0.7):
+    """
+    Shared ChatGroq for (model, temperature); model defaults to GROQ_MODEL.
+    """
+    return llm_registry.get(model, temperature)
@@ -1,12 +1,16 @@
 
 import requests
 import json
+from itertools import islice
 from django.conf import settings
 
 # Configuration for ML Server URL
 # Ideally this should be in settings.py, but for now we default to localhost
 ML_SERVER_URL = getattr(settings, 'ML_SERVER_URL', 'http://127.0.0.1:8001')
 
+# Texts sent per /predict/text/batch request (server caps this at TEXT_BATCH_MAX_ITEMS)
+TEXT_BATCH_CHUNK_SIZE = getattr(settings, 'ML_TEXT_BATCH_CHUNK_SIZE', 64)
+
 class MLClient:
     
     @staticmethod
@@ -53,13 +57,13 @@ class MLClient:
             return "neutral", 0.0
 
     @staticmethod
-    def predict_text(text):
+    def predict_text(text, timeout=3):
         """
         Sends text to /predict/text
         """
         try:
             data = {'text': text}
-            response = requests.post(f"{ML_SERVER_URL}/predict/text", data=data, timeout=3)
+            response = requests.post(f"{ML_SERVER_URL}/predict/text", data=data, timeout=timeout)
             if response.status_code == 200:
                 result = response.json()
                 return result.get('dominant_emotion', 'neutral'), result.get('confidence', 0.0)
@@ -68,6 +72,42 @@ class MLClient:
             print(f"ML Client Error (Text): {e}")
             return "neutral", 0.0
 
+    @staticmethod
+    def predict_text_batch(texts, chunk_size=TEXT_BATCH_CHUNK_SIZE):
+        """
+        Sends texts to /predict/text/batch, chunk_size texts per request.
+        texts: any iterable of strings (consumed lazily, so querysets/generators are fine)
+        Yields (emotion, confidence) per input text, in order, as each chunk comes back.
+        Texts that could not be scored (failed chunk or per-item error) yield None, so callers stay aligned
+        with their inputs and can tell a failure from a real low-confidence prediction.
+        """
+        iterator = iter(texts)
+        # One session for the whole run so chunks reuse the same connection
+        with requests.Session() as http:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+
+                results = []
+                try:
+                    response = http.post(f"{ML_SERVER_URL}/predict/text/batch", json={'texts': chunk}, timeout=30)
+                    if response.status_code == 200:
+                        results = response.json().get('results', [])
+                    else:
+                        print(f"ML Client Error (Text Batch): HTTP {response.status_code}")
+                except Exception as e:
+                    print(f"ML Client Error (Text Batch): {e}")
+
+                if len(results) != len(chunk):
+                    results = [None] * len(chunk)
+
+                for result in results:
+                    if result is None or "error" in result:
+                        yield None
+                    else:
+                        yield result.get('dominant_emotion', 'neutral'), result.get('confidence', 0.0)
+
     @staticmethod
     def predict_multimodal(text=None, voice_file=None, face_file=None):
         """
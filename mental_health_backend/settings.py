@@ -146,8 +146,101 @@ DEFAULT_FROM_EMAIL = os.getenv('EMAIL_HOST_USER', 'shahithu2004@gmail.com')
 # MAA Chatbot Settings
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 GROQ_MODEL = os.getenv('GROQ_MODEL', "llama-3.1-8b-instant")
+# Groq clients are shared per (model, temperature) and use one connection pool (mental_health_backend/services/llm_registry.py)
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv('LLM_POOL_MAX_CONNECTIONS', '20'))
+LLM_POOL_KEEPALIVE_SECONDS = float(os.getenv('LLM_POOL_KEEPALIVE_SECONDS', '60'))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))
+
+# RAG index (chatbot/rag_index.py). Off: workers only load the persisted index, and a missing/stale one is
+# built once at deploy with 'manage.py build_rag_index'. On (single-process dev): rebuild it on first use.
+RAG_BUILD_ON_STARTUP = os.getenv('RAG_BUILD_ON_STARTUP', 'False') == 'True'
+RAG_DATA_DIR = os.getenv('RAG_DATA_DIR', str(BASE_DIR / 'data'))
+RAG_INDEX_DIR = os.getenv('RAG_INDEX_DIR', str(BASE_DIR / 'rag_index'))
+# After a failed doc engine setup (chatbot/doc_engine.py), wait this many seconds before trying again
+RAG_INIT_RETRY_SECONDS = float(os.getenv('RAG_INIT_RETRY_SECONDS', '60'))
+# Workers check this often whether a newer index was persisted (by any process) and reload it
+RAG_RELOAD_CHECK_SECONDS = float(os.getenv('RAG_RELOAD_CHECK_SECONDS', '10'))
+# Embeddings from the ML server's /embed (e.g. http://127.0.0.1:8001) instead of a MiniLM copy per worker.
+# Off by default (''): every worker loads its own model until this is set for the deployment.
+EMBEDDING_SERVICE_URL = os.getenv('EMBEDDING_SERVICE_URL', '')
+
+# RAG (chatbot/core/rag_layer.py)
+# 'retrieve' = inject top-k raw chunks (no extra LLM call), 'synthesize' = legacy llama-index answer
+RAG_MODE = os.getenv('RAG_MODE', 'retrieve')
+RAG_TOP_K = int(os.getenv('RAG_TOP_K', '3'))
+# Retrieval result cache (RAGLayer) and query-embedding cache (doc_engine)
+RAG_CACHE_SIZE = int(os.getenv('RAG_CACHE_SIZE', '1024'))
+RAG_CACHE_TTL = float(os.getenv('RAG_CACHE_TTL', '600'))
+RAG_EMBED_CACHE_SIZE = int(os.getenv('RAG_EMBED_CACHE_SIZE', '2048'))
+RAG_EMBED_CACHE_TTL = float(os.getenv('RAG_EMBED_CACHE_TTL', '3600'))
+# Search only the policy's documents (RAGLayer.POLICY_SOURCES), falling back to the whole corpus below this score
+RAG_POLICY_SCOPED = os.getenv('RAG_POLICY_SCOPED', 'True') == 'True'
+RAG_PARTITION_MIN_SCORE = float(os.getenv('RAG_PARTITION_MIN_SCORE', '0.3'))
+# Retrieval engine: hybrid (dense + BM25, fused) | dense | lexical; each retriever feeds top_k * N candidates to the fusion.
+# New queries are matched lexically (BM25) while embedding one takes longer than this many ms.
+RAG_RETRIEVAL_MODE = os.getenv('RAG_RETRIEVAL_MODE', 'hybrid')
+RAG_FUSION_CANDIDATES = int(os.getenv('RAG_FUSION_CANDIDATES', '4'))
+RAG_DENSE_BUDGET_MS = float(os.getenv('RAG_DENSE_BUDGET_MS', '200'))
+# Queue Article/CopingMethod/RoadmapStep/Disorder rows for re-embedding when they are saved or deleted;
+# a worker serving RAG embeds the queue on its next index check (RAG_RELOAD_CHECK_SECONDS)
+RAG_SYNC_DB_RECORDS = os.getenv('RAG_SYNC_DB_RECORDS', 'True') == 'True'
+RAG_SYNC_BATCH_SIZE = int(os.getenv('RAG_SYNC_BATCH_SIZE', '200'))
+
+# Load the RAG index/embedder and Groq clients at process start (chatbot/apps.py) instead of on the first chat.
+# Enable for web servers (gunicorn/runserver); leave off for management commands and tests.
+CHAT_WARMUP = os.getenv('CHAT_WARMUP', 'False') == 'True'
+
+# Live chat sessions per worker (chatbot/core/session_manager.py): LRU cap and idle expiry in seconds
+CHAT_MAX_SESSIONS = int(os.getenv('CHAT_MAX_SESSIONS', '5000'))
+CHAT_SESSION_IDLE_TTL = float(os.getenv('CHAT_SESSION_IDLE_TTL', '3600'))
+# Where FSM state lives between turns: 'db' (SessionState table, shared by all workers, no sticky sessions needed),
+# 'cache' (Django CACHES, e.g. Redis) or 'local' (per process). With db/cache the store above is a read-through cache.
+CHAT_SESSION_BACKEND = os.getenv('CHAT_SESSION_BACKEND', 'db')
+CHAT_SESSION_STATE_TTL = float(os.getenv('CHAT_SESSION_STATE_TTL', str(7 * 24 * 3600)))
+# Recent FSM events kept per session; turn/intervention totals are counters, so per-turn cost doesn't grow
+CHAT_SESSION_HISTORY_WINDOW = int(os.getenv('CHAT_SESSION_HISTORY_WINDOW', '50'))
+# Background rolling summary of the conversation (chatbot/core/summarizer.py): every N user messages,
+# or sooner on a topic shift (new message shares < this fraction of its words with the story so far)
+CHAT_SUMMARY_EVERY_N_TURNS = int(os.getenv('CHAT_SUMMARY_EVERY_N_TURNS', '3'))
+CHAT_SUMMARY_TOPIC_SHIFT_OVERLAP = float(os.getenv('CHAT_SUMMARY_TOPIC_SHIFT_OVERLAP', '0.15'))
+CHAT_SUMMARY_WORKERS = int(os.getenv('CHAT_SUMMARY_WORKERS', '2'))
+
+# Keyword lexicon for chat signals, crisis phrases and FSM unlock (versioned JSON, see chatbot/core/lexicon.py).
+# Point this at a file outside the deploy to ship new phrases without a release; workers re-check it every N seconds.
+CHAT_LEXICON_PATH = os.getenv('CHAT_LEXICON_PATH', str(BASE_DIR / 'chatbot' / 'lexicon.json'))
+CHAT_LEXICON_RELOAD_SECONDS = float(os.getenv('CHAT_LEXICON_RELOAD_SECONDS', '5'))
+
+# Tiered signal extraction (chatbot/core/signal_layer.py): keywords, then the ML server's text emotion model
+# when they find conflicting emotions, then the LLM only if still unsure on a message of >= N words or on an
+# ambiguous crisis phrase. Both extra tiers are off by default (keywords only)
+CHAT_SIGNAL_ML_TIER = os.getenv('CHAT_SIGNAL_ML_TIER', 'False') == 'True'
+CHAT_SIGNAL_ML_TIMEOUT = float(os.getenv('CHAT_SIGNAL_ML_TIMEOUT', '0.5'))
+CHAT_SIGNAL_ML_MIN_CONFIDENCE = float(os.getenv('CHAT_SIGNAL_ML_MIN_CONFIDENCE', '0.6'))
+CHAT_SIGNAL_LLM_ESCALATION = os.getenv('CHAT_SIGNAL_LLM_ESCALATION', 'False') == 'True'
+CHAT_SIGNAL_ESCALATE_MIN_WORDS = int(os.getenv('CHAT_SIGNAL_ESCALATE_MIN_WORDS', '6'))
+
+# Generation prompt size (chatbot/core/context_budget.py): token budget for memory + RAG context + history,
+# how many recent messages are loaded, and the tiktoken encoding used to count (falls back to ~4 chars/token)
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv('CHAT_CONTEXT_TOKEN_BUDGET', '3000'))
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv('CHAT_HISTORY_MAX_MESSAGES', '20'))
+CHAT_TOKENIZER = os.getenv('CHAT_TOKENIZER', 'cl100k_base')
+
+# Chat pipeline: max seconds generation waits on each concurrent stage (chatbot/orchestrator.py)
+CHAT_STAGE_TIMEOUTS = {
+    'history': float(os.getenv('CHAT_HISTORY_TIMEOUT', '2')),
+    'rag': float(os.getenv('CHAT_RAG_TIMEOUT', '6')),
+}
 
 # ML Server Connection
 # In production (Railway/Render), this will be the URL of your deployed ML Service.
 # IN DEVELOPMENT: Run uvicorn on port 8001: uvicorn ml_inference_server.main:app --reload --port 8001
 ML_SERVER_URL = os.getenv('ML_SERVER_URL', 'http://127.0.0.1:8001')
+
+# EmotionLog write buffering (auth_api/emotion_log_buffer.py)
+# Rows are bulk-inserted once BUFFER_SIZE are pending or the oldest is FLUSH_INTERVAL seconds old.
+# Pending rows are written on normal worker shutdown only: a SIGKILLed or OOM-killed worker loses
+# up to BUFFER_SIZE rows (FLUSH_INTERVAL seconds' worth). BUFFER_SIZE=1 with BACKGROUND_FLUSH=False
+# writes every row in its request instead.
+EMOTION_LOG_BUFFER_SIZE = int(os.getenv('EMOTION_LOG_BUFFER_SIZE', '50'))
+EMOTION_LOG_FLUSH_INTERVAL = float(os.getenv('EMOTION_LOG_FLUSH_INTERVAL', '5'))
+EMOTION_LOG_BACKGROUND_FLUSH = os.getenv('EMOTION_LOG_BACKGROUND_FLUSH', 'True') == 'True'
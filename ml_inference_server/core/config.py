@@ -76,6 +76,18 @@ class Settings:
         "surprise": "happy"
     }
 
+    # Batch text scoring (/predict/text/batch)
+    TEXT_BATCH_SIZE = int(os.getenv("TEXT_BATCH_SIZE", "16"))  # Texts per forward pass
+    TEXT_BATCH_MAX_ITEMS = int(os.getenv("TEXT_BATCH_MAX_ITEMS", "256"))  # Max texts per request
+
+    # Sentence embeddings for the chatbot's RAG (/embed). Must match chatbot/rag_index.py EMBED_MODEL_NAME.
+    EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+    EMBED_MAX_LENGTH = 256  # all-MiniLM-L6-v2's max_seq_length
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))  # Texts per forward pass
+    EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "5"))  # How long to gather concurrent requests
+    EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "10000"))  # Recent text -> vector entries
+    EMBED_MAX_ITEMS = int(os.getenv("EMBED_MAX_ITEMS", "256"))  # Max texts per request
+
     # Thresholds for Fusion
     CONFIDENCE_THRESHOLD = 0.4  # If below this, we might ignore the prediction
 
@@ -5,7 +5,8 @@ os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 import asyncio # Added for parallelism
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Optional, List
+from pydantic import BaseModel
 import json
 
 import time
@@ -13,6 +14,7 @@ from core.config import settings
 from services.model_loader import model_loader
 from services.inference import inference_service
 from services.fusion import fusion_service
+from services.embedding import embedding_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -28,7 +30,8 @@ def health_check():
     return {"status": "ok", "models_loaded": {
         "face": model_loader.face_model is not None,
         "voice": model_loader.voice_model is not None,
-        "text": model_loader.text_model is not None
+        "text": model_loader.text_model is not None,
+        "embedding": model_loader.embed_model is not None
     }}
 
 @app.post("/predict/face")
@@ -55,6 +58,41 @@ async def predict_text(text: str = Form(...)):
         raise HTTPException(status_code=500, detail=result["error"])
     return result
 
+class TextBatchRequest(BaseModel):
+    texts: List[str]
+
+@app.post("/predict/text/batch")
+async def predict_text_batch(payload: TextBatchRequest):
+    if len(payload.texts) > settings.TEXT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many texts ({len(payload.texts)}). Max per request: {settings.TEXT_BATCH_MAX_ITEMS}"
+        )
+    results = await asyncio.to_thread(inference_service.predict_text_batch, payload.texts)
+    # Per-item errors are returned inline so one bad row doesn't fail the whole batch
+    return {"results": results}
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+@app.post("/embed")
+async def embed(payload: EmbedRequest):
+    if len(payload.texts) > settings.EMBED_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many texts ({len(payload.texts)}). Max per request: {settings.EMBED_MAX_ITEMS}"
+        )
+    try:
+        # Concurrent callers are batched together inside the service
+        embeddings = await embedding_service.embed(payload.texts)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"model": settings.EMBED_MODEL_NAME, "embeddings": embeddings}
+
+@app.get("/embed/stats")
+def embed_stats():
+    return embedding_service.stats()
+
 @app.post("/predict/multimodal")
 async def predict_multimodal(
     face_file: Optional[UploadFile] = File(None),
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import List
+
+import torch
+from core.config import settings
+from services.model_loader import model_loader
+
+class EmbeddingService:
+    """
+    Sentence embeddings (all-MiniLM-L6-v2: mean pooling + L2 norm, same vectors as
+    llama-index's HuggingFaceEmbedding) for every Django worker, so the model is loaded once per node.
+    Concurrent /embed calls are gathered into one forward pass, and recent texts are served from an LRU.
+    """
+
+    def __init__(self):
+        self._cache = OrderedDict()  # text -> vector
+        self._cache_lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._from_cache(texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            computed = await self._enqueue(missing)
+            by_text = dict(zip(missing, computed))
+            vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+        return vectors
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "batches": self.batches,
+            }
+
+    def _from_cache(self, texts):
+        with self._cache_lock:
+            vectors = []
+            for text in texts:
+                vector = self._cache.get(text)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self._cache.move_to_end(text)
+                    self.hits += 1
+                vectors.append(vector)
+            return vectors
+
+    def _store(self, texts, vectors):
+        with self._cache_lock:
+            for text, vector in zip(texts, vectors):
+                self._cache[text] = vector
+                self._cache.move_to_end(text)
+            while len(self._cache) > settings.EMBED_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    async def _enqueue(self, texts):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._batch_worker())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _batch_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # 1. Wait for a request, then gather whatever else arrives within EMBED_BATCH_WAIT_MS
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + settings.EMBED_BATCH_WAIT_MS / 1000
+            while size < settings.EMBED_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            # 2. One forward pass (per EMBED_BATCH_SIZE texts) for all gathered requests
+            texts = list(dict.fromkeys(t for request_texts, _ in pending for t in request_texts))
+            try:
+                vectors = await asyncio.to_thread(self._forward, texts)
+                self._store(texts, vectors)
+                by_text = dict(zip(texts, vectors))
+                for request_texts, future in pending:
+                    if not future.done():
+                        future.set_result([by_text[t] for t in request_texts])
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _forward(self, texts: List[str]) -> List[List[float]]:
+        if not model_loader.embed_model or not model_loader.embed_tokenizer:
+            raise RuntimeError("Embedding model not loaded")
+
+        vectors = []
+        for start in range(0, len(texts), settings.EMBED_BATCH_SIZE):
+            chunk = texts[start:start + settings.EMBED_BATCH_SIZE]
+            inputs = model_loader.embed_tokenizer(
+                chunk,
+                return_tensors="pt",
+                truncation=True,
+                padding=True,
+                max_length=settings.EMBED_MAX_LENGTH
+            ).to(model_loader.device)
+
+            with torch.no_grad():
+                token_embeddings = model_loader.embed_model(**inputs).last_hidden_state
+                # Mean pooling over real tokens, then L2-normalize (sentence-transformers config for this model)
+                mask = inputs["attention_mask"].unsqueeze(-1).to(token_embeddings.dtype)
+                pooled = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+            vectors.extend(pooled.tolist())
+            with self._cache_lock:
+                self.batches += 1
+        return vectors
+
+embedding_service = EmbeddingService()
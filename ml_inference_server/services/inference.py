@@ -16,7 +16,7 @@ class InferenceService:
         if not model_loader.face_model:
             model_loader.load_models()
 
-    def _normalize_prediction(self, probs: List[float], labels: List[str], mapping: Dict[str, str]) -> Dict[str, float]:
+    def _normalize_prediction(self, probs: List[float], labels: List[str], mapping: Dict[str, str], debug: bool = True) -> Dict[str, float]:
         """
         Converts raw model probabilities into the Final Emotion Set.
         
@@ -24,6 +24,7 @@ class InferenceService:
             probs: List of probabilities from softmax.
             labels: List of label names corresponding to probs indices.
             mapping: Dictionary mapping specific labels to Final Emotions.
+            debug: Print raw/normalized scores (disabled for batch scoring).
             
         Returns:
             Dict[str, float]: Normalized dictionary { 'happy': 0.8, 'sad': 0.1, ... }
@@ -31,8 +32,9 @@ class InferenceService:
         # Initialize final scores
         final_scores = {e: 0.0 for e in settings.FINAL_EMOTIONS}
         
-        print(f"DEBUG: Raw Probs: {probs}")
-        print(f"DEBUG: Labels: {labels}")
+        if debug:
+            print(f"DEBUG: Raw Probs: {probs}")
+            print(f"DEBUG: Labels: {labels}")
 
         for prob, label in zip(probs, labels):
             target_emotion = mapping.get(label)
@@ -41,7 +43,8 @@ class InferenceService:
                 # (e.g. Joy(0.4) + Surprise(0.2) -> Happy(0.6))
                 final_scores[target_emotion] += prob
         
-        print(f"DEBUG: Normalized Scores: {final_scores}")
+        if debug:
+            print(f"DEBUG: Normalized Scores: {final_scores}")
         return final_scores
 
     def predict_face(self, image_bytes: bytes):
@@ -125,6 +128,54 @@ class InferenceService:
         except Exception as e:
             return {"error": str(e)}
 
+    def predict_text_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Scores many texts with one forward pass per micro-batch.
+        Returns one result dict per input text, in input order (same shape as predict_text).
+        """
+        if not model_loader.text_model or not model_loader.tokenizer:
+            return [{"error": "Text model not loaded"} for _ in texts]
+
+        results = []
+        batch_size = settings.TEXT_BATCH_SIZE
+
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            try:
+                # Same preprocessing as predict_text; the traced model expects fixed 128-token inputs
+                inputs = model_loader.tokenizer(
+                    chunk,
+                    return_tensors="pt",
+                    truncation=True,
+                    padding="max_length",
+                    max_length=128
+                )
+
+                with torch.no_grad():
+                    output = model_loader.text_model(inputs["input_ids"], inputs["attention_mask"])
+                    batch_probs = torch.softmax(output, dim=1).tolist()
+
+                for probs in batch_probs:
+                    normalized = self._normalize_prediction(
+                        probs,
+                        settings.TEXT_LABELS,
+                        settings.TEXT_MAPPING,
+                        debug=False
+                    )
+                    dominant = max(normalized, key=normalized.get)
+                    results.append({
+                        "modality": "text",
+                        "raw_probs": dict(zip(settings.TEXT_LABELS, probs)),
+                        "normalized_probs": normalized,
+                        "dominant_emotion": dominant,
+                        "confidence": normalized[dominant]
+                    })
+
+            except Exception as e:
+                results.extend({"error": str(e)} for _ in chunk)
+
+        return results
+
     def predict_audio(self, audio_bytes: bytes):
         if not model_loader.voice_model or not model_loader.processor:
             return {"error": "Voice model not loaded"}
@@ -1,7 +1,7 @@
 
 import torch
 import os
-from transformers import AutoTokenizer, Wav2Vec2Processor
+from transformers import AutoModel, AutoTokenizer, Wav2Vec2Processor
 from core.config import settings
 
 class ModelLoader:
@@ -15,6 +15,8 @@ class ModelLoader:
             cls._instance.text_model = None
             cls._instance.tokenizer = None
             cls._instance.processor = None
+            cls._instance.embed_model = None
+            cls._instance.embed_tokenizer = None
             cls._instance.device = torch.device("cpu") # Default to CPU for safety, can upgrade to cuda
         return cls._instance
 
@@ -56,6 +58,15 @@ class ModelLoader:
                 print(f"⚠️ Voice model not found at {settings.VOICE_MODEL_PATH}")
         except Exception as e:
             print(f"❌ Failed to load Voice components: {e}")
+
+        # 4. Load Sentence Embedding Model (shared by every Django worker via /embed)
+        try:
+            self.embed_tokenizer = AutoTokenizer.from_pretrained(settings.EMBED_MODEL_NAME)
+            self.embed_model = AutoModel.from_pretrained(settings.EMBED_MODEL_NAME).to(self.device)
+            self.embed_model.eval()
+            print(f"✅ Embedding model loaded: {settings.EMBED_MODEL_NAME}")
+        except Exception as e:
+            print(f"❌ Failed to load Embedding model: {e}")
             
         print("🚀 Model loading complete.")
 
@@ -39,8 +39,8 @@ except Exception as e:
 print("\n--- Testing RAG (Vector Store) ---")
 try:
     # This triggers the loading of 'data' folder
-    from chatbot.doc_engine import query_engine
-    if query_engine:
+    from chatbot import doc_engine
+    if doc_engine.ensure_ready() and doc_engine.query_engine:
         print("✅ RAG Engine Loaded & Index Created (data folder found)")
     else:
         print("⚠️ RAG Engine did not initialize (check 'data' folder presence/content)")